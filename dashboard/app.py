@@ -1,15 +1,22 @@
 import streamlit as st
+import pandas as pd
 import plotly.express as px
-from utils import load_csv, apply_responsive, get_base64
+from utils import load_summary, apply_responsive, plotly_chart, get_base64
 from sidebar import show_sidebar
 
 show_sidebar()
 
+def top_counts(summary, label, value="Nombre", exclude=None, n=3):
+    """Top N d'un résumé pré-calculé (les effectifs sont déjà triés par ordre décroissant)."""
+    rows = [(k, v) for k, v in summary["counts"].items() if k != exclude]
+    return pd.DataFrame(rows[:n], columns=[label, value])
+
 def show():
-    df_traffic = load_csv("../data/cleaned/usa_accidents_traffic_cleaned.csv")
-    df_airline = load_csv("../data/cleaned/airline_delay_cause_cleaned.csv")
-    df_railroad = load_csv("../data/cleaned/railroad_accident_cleaned.csv")
-    df_shipping = load_csv("../data/cleaned/shipping_accidents_cleaned.csv")
+    # Résumés écrits par les notebooks : aucun dataset complet n'est chargé sur l'accueil
+    traffic_summary = load_summary("usa_accidents_traffic_cleaned")
+    airline_summary = load_summary("airline_delay_cause_cleaned")
+    railroad_summary = load_summary("railroad_accident_cleaned")
+    shipping_summary = load_summary("shipping_accidents_cleaned")
 
     st.title('Analyse de Risque - Résilience Chaîne Logistique')
     st.markdown("""
@@ -27,10 +34,10 @@ def show():
 
     col_kpi1, col_kpi2, col_kpi3, col_kpi4 = st.columns(4)
 
-    col_kpi1.metric("🚗 Accidents Routiers", f"{len(df_traffic):,}")
-    col_kpi2.metric("✈️ Retards Aériens", f"{int(df_airline['arr_del15'].sum()):,}")
-    col_kpi3.metric("🚆 Accidents Ferroviaires", f"{len(df_railroad):,}")
-    col_kpi4.metric("🚢 Accidents Maritimes", f"{len(df_shipping):,}")
+    col_kpi1.metric("🚗 Accidents Routiers", f"{traffic_summary['kpi']:,}")
+    col_kpi2.metric("✈️ Retards Aériens", f"{airline_summary['kpi']:,}")
+    col_kpi3.metric("🚆 Accidents Ferroviaires", f"{railroad_summary['kpi']:,}")
+    col_kpi4.metric("🚢 Accidents Maritimes", f"{shipping_summary['kpi']:,}")
 
     st.markdown("---")
 
@@ -39,12 +46,7 @@ def show():
 
     with col1:
         st.markdown("### Transport Routier")
-        top_traffic = (
-            df_traffic[df_traffic["Risk_Category"] != "Low Impact"]
-            .value_counts(subset=["Risk_Category"])
-            .reset_index(name="Nombre")
-            .head(3)
-        )
+        top_traffic = top_counts(traffic_summary, "Risk_Category", exclude="Low Impact")
         fig_traf = px.bar(
             top_traffic,
             x="Nombre",
@@ -54,17 +56,10 @@ def show():
             title="Top 3 des catégories de risque",
             color_discrete_sequence=px.colors.qualitative.Set2
         )
-        st.plotly_chart(apply_responsive(fig_traf), use_container_width=True)
+        plotly_chart(apply_responsive(fig_traf), use_container_width=True)
 
     with col2:
         st.markdown("### Transport Aérien")
-        delay_cols_count = [
-            'carrier_ct',
-            'weather_ct',
-            'nas_ct',
-            'security_ct',
-            'late_aircraft_ct'
-        ]
         readable_labels_count = {
             'carrier_ct': 'Retard compagnie aérienne',
             'weather_ct': 'Retard météo',
@@ -72,10 +67,8 @@ def show():
             'security_ct': 'Retard sécurité',
             'late_aircraft_ct': 'Retard avion précédent'
         }
-        delay_counts = df_airline[delay_cols_count].sum().astype(int).reset_index()
-        delay_counts.columns = ['Cause', 'Nombre de retards']
-        delay_counts['Cause'] = delay_counts['Cause'].map(readable_labels_count)
-        top_airline = delay_counts.sort_values("Nombre de retards", ascending=False).head(3)
+        top_airline = top_counts(airline_summary, "Cause", value="Nombre de retards")
+        top_airline['Cause'] = top_airline['Cause'].map(readable_labels_count)
         fig_air = px.bar(
             top_airline,
             x="Nombre de retards",
@@ -86,19 +79,14 @@ def show():
             title="Top 3 des causes de retard",
             color_discrete_sequence=px.colors.qualitative.Set1
         )
-        st.plotly_chart(apply_responsive(fig_air), use_container_width=True)
+        plotly_chart(apply_responsive(fig_air), use_container_width=True)
 
     # Top Ferroviaire & Maritime
     col3, col4 = st.columns(2)
 
     with col3:
         st.markdown("### Transport Ferroviaire")
-        top_rail = (
-            df_railroad[df_railroad["Accident Type"] != "Autre"]
-            .value_counts(subset=["Accident Type"])
-            .reset_index(name="Nombre")
-            .head(3)
-        )
+        top_rail = top_counts(railroad_summary, "Accident Type", exclude="Autre")
         fig_rail = px.bar(
             top_rail,
             x="Nombre",
@@ -108,16 +96,11 @@ def show():
             title="Top 3 des types d'accident",
             color_discrete_sequence=px.colors.qualitative.Set3
         )
-        st.plotly_chart(apply_responsive(fig_rail), use_container_width=True)
+        plotly_chart(apply_responsive(fig_rail), use_container_width=True)
 
     with col4:
         st.markdown("### Transport Maritime")
-        top_ship = (
-            df_shipping[df_shipping["Acc_Type"] != "Autre"]
-            .value_counts(subset=["Acc_Type"])
-            .reset_index(name="Nombre")
-            .head(3)
-        )
+        top_ship = top_counts(shipping_summary, "Acc_Type", exclude="Autre")
         fig_ship = px.bar(
             top_ship,
             x="Nombre",
@@ -127,7 +110,7 @@ def show():
             title="Top 3 des types d'accident",
             color_discrete_sequence=px.colors.qualitative.Set2
         )
-        st.plotly_chart(apply_responsive(fig_ship), use_container_width=True)
+        plotly_chart(apply_responsive(fig_ship), use_container_width=True)
 
     st.markdown("---")
     st.info(f"""
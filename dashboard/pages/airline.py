@@ -1,11 +1,44 @@
-from utils import load_csv, apply_responsive
+from utils import load_dataset, load_statistic, apply_responsive, plotly_chart, show_tabs
 import streamlit as st
 import plotly.express as px
-import pandas as pd
 from sidebar import show_sidebar
 
 show_sidebar()
 
+# Contrat de projection : colonnes lues par la page
+COLUMNS = {
+    'year': 'int16',
+    'carrier_name': 'category',
+    'airport_name': 'category',
+    'arr_flights': 'float64',
+    'arr_del15': 'float64',
+    'carrier_ct': 'float64',
+    'weather_ct': 'float64',
+    'nas_ct': 'float64',
+    'security_ct': 'float64',
+    'late_aircraft_ct': 'float64',
+    'arr_cancelled': 'float64',
+    'arr_diverted': 'float64',
+    'arr_delay': 'float64',
+    'carrier_delay': 'float64',
+    'weather_delay': 'float64',
+    'nas_delay': 'float64',
+    'security_delay': 'float64',
+    'late_aircraft_delay': 'float64'
+}
+
+# Séries annuelles de l'onglet temporel, écrites par le pipeline à côté du dataset
+YEARLY_CAUSE_COLUMNS = {
+    'year': 'int16',
+    'cause': 'category',
+    'minutes': 'float64'
+}
+
+YEARLY_RATE_COLUMNS = {
+    'year': 'int16',
+    'delay_rate': 'float64'
+}
+
 color_map = {
     'Retard compagnie aérienne': '#636EFA',
     'Retard météo': '#EF553B',
@@ -54,7 +87,7 @@ def show_tab1(df):
             template='plotly_white'
         )
 
-        st.plotly_chart(fig, use_container_width=True)
+        plotly_chart(fig, use_container_width=True)
     else:
         st.warning("Certaines colonnes de retard sont manquantes dans le fichier.")
 
@@ -94,7 +127,7 @@ def show_tab1(df):
             color_discrete_map=color_map,
             template='plotly_white'
         )
-        st.plotly_chart(fig_time, use_container_width=True)
+        plotly_chart(fig_time, use_container_width=True)
     else:
         st.warning("Les colonnes de temps de retard par cause sont manquantes.")
 
@@ -104,7 +137,7 @@ def show_tab1(df):
 
     if {'airport_name', 'arr_del15', 'arr_flights'}.issubset(df.columns):
         airport_stats = (
-            df.groupby('airport_name', as_index=False)[['arr_del15', 'arr_flights']]
+            df.groupby('airport_name', as_index=False, observed=True)[['arr_del15', 'arr_flights']]
             .sum()
         )
 
@@ -140,7 +173,7 @@ def show_tab1(df):
 
     if {'carrier_name', 'arr_del15', 'arr_flights'}.issubset(df.columns):
         airport_stats = (
-            df.groupby('carrier_name', as_index=False)[['arr_del15', 'arr_flights']]
+            df.groupby('carrier_name', as_index=False, observed=True)[['arr_del15', 'arr_flights']]
             .sum()
         )
 
@@ -170,7 +203,7 @@ def show_tab1(df):
     else:
         st.warning("Les colonnes nécessaires ('carrier_name', 'arr_del15', 'arr_flights') sont manquantes.")
 
-def show_tab2(df):
+def show_tab2(causes, rates):
     st.subheader("Temps moyen de retard par vol retardé, selon la catégorie (par an)")
 
     delay_time_cols = {
@@ -181,79 +214,48 @@ def show_tab2(df):
         'late_aircraft_delay': 'Retard avion précédent'
     }
 
-    if 'arr_del15' in df.columns and 'year' in df.columns and all(col in df.columns for col in delay_time_cols):
-        df_valid = df[df['arr_del15'] > 0].copy()
-
-        # Calculer pour chaque cause la colonne "minutes par vol retardé"
-        for col in delay_time_cols:
-            df_valid[f'{col}_per_delayed_flight'] = df_valid[col] / df_valid['arr_del15']
-
-        # Préparer les données pour animation : moyenne par année
-        result_frames = []
-        for year, group in df_valid.groupby('year'):
-            averages = {
-                'year': year
-            }
-            for col, label in delay_time_cols.items():
-                mean_val = group[f'{col}_per_delayed_flight'].mean()
-                averages['Cause'] = label
-                averages['Temps moyen (min)'] = round(mean_val, 2)
-                result_frames.append(averages.copy())
-
-        animated_df = pd.DataFrame(result_frames)
-        animated_df['Texte'] = animated_df['Temps moyen (min)'].apply(lambda x: f"{x:.2f}")
-        animated_df_sorted = animated_df.sort_values(by='Temps moyen (min)', ascending=False)
+    # Moyennes par an et par cause précalculées par le pipeline (pipeline.airline.yearly_delays)
+    animated_df = causes.rename(columns={'minutes': 'Temps moyen (min)'})
+    animated_df['Cause'] = animated_df['cause'].map(delay_time_cols)
+    animated_df['Texte'] = animated_df['Temps moyen (min)'].map("{:.2f}".format)
+    animated_df_sorted = animated_df.sort_values(by='Temps moyen (min)', ascending=False)
+
+    fig = px.bar(
+        animated_df_sorted,
+        y='Cause',
+        x='Temps moyen (min)',
+        animation_frame='year',
+        orientation='h',
+        color='Cause',
+        color_discrete_map=color_map,
+        text='Texte',
+        template='plotly_white',
+        range_x=[0,30]
+    )
 
-        fig = px.bar(
-            animated_df_sorted,
-            y='Cause',
-            x='Temps moyen (min)',
-            animation_frame='year',
-            orientation='h',
-            color='Cause',
-            color_discrete_map=color_map,
-            text='Texte',
-            template='plotly_white',
-            range_x=[0,30]
-        )
+    fig.update_traces(textposition='outside')
+    fig.update_layout(yaxis_title='', xaxis_title='Minutes')
 
-        fig.update_traces(textposition='outside')
-        fig.update_layout(yaxis_title='', xaxis_title='Minutes')
-
-        st.plotly_chart(fig, use_container_width=True)
-    else:
-        st.warning("Certaines colonnes nécessaires sont manquantes.")
+    plotly_chart(fig, use_container_width=True)
 
     st.markdown("---")
 
     st.subheader("Évolution du taux de retard dans le temps")
 
-    if 'arr_del15' in df.columns and 'arr_flights' in df.columns and 'year' in df.columns:
-        # Aggrégation par année
-        delay_rate_df = (
-            df.groupby('year')[['arr_del15', 'arr_flights']]
-            .sum()
-            .reset_index()
-        )
-
-        delay_rate_df['Taux de retard (%)'] = (delay_rate_df['arr_del15'] / delay_rate_df['arr_flights']) * 100
-        delay_rate_df['Taux de retard (%)'] = delay_rate_df['Taux de retard (%)'].round(2)
+    delay_rate_df = rates.rename(columns={'delay_rate': 'Taux de retard (%)'})
 
-        fig_delay_rate = px.line(
-            delay_rate_df,
-            x='year',
-            y='Taux de retard (%)',
-            markers=True,
-            title='Taux de retard (%) par an',
-            labels={'year': 'Année', 'Taux de retard (%)': 'Taux de retard (%)'},
-            template='plotly_white'
-        )
-
-        fig_delay_rate.update_layout(xaxis=dict(dtick=1))
-        st.plotly_chart(fig_delay_rate, use_container_width=True)
+    fig_delay_rate = px.line(
+        delay_rate_df,
+        x='year',
+        y='Taux de retard (%)',
+        markers=True,
+        title='Taux de retard (%) par an',
+        labels={'year': 'Année', 'Taux de retard (%)': 'Taux de retard (%)'},
+        template='plotly_white'
+    )
 
-    else:
-        st.warning("Colonnes 'arr_del15', 'arr_flights' ou 'year' manquantes.")
+    fig_delay_rate.update_layout(xaxis=dict(dtick=1))
+    plotly_chart(fig_delay_rate, use_container_width=True)
 
 def show_tab3(df):
     st.subheader("Corrélation entre les durées de retard (en minutes)")
@@ -267,7 +269,7 @@ def show_tab3(df):
     }
 
     if all(col in df.columns for col in delay_time_cols):
-        corr_df = df[list(delay_time_cols)].corr()
+        corr_df = load_statistic('airline_delay_cause_cleaned', COLUMNS, 'corr', columns=list(delay_time_cols))
         corr_df.columns = [delay_time_cols[c] for c in corr_df.columns]
         corr_df.index = [delay_time_cols[c] for c in corr_df.index]
 
@@ -279,7 +281,7 @@ def show_tab3(df):
             labels=dict(color="Corrélation"),
             aspect="auto"
         )
-        st.plotly_chart(fig_corr1, use_container_width=True)
+        plotly_chart(fig_corr1, use_container_width=True)
     else:
         st.warning("Colonnes de durée de retard manquantes.")
 
@@ -295,7 +297,7 @@ def show_tab3(df):
     }
 
     if all(col in df.columns for col in delay_count_cols):
-        corr_df2 = df[list(delay_count_cols)].corr()
+        corr_df2 = load_statistic('airline_delay_cause_cleaned', COLUMNS, 'corr', columns=list(delay_count_cols))
         corr_df2.columns = [delay_count_cols[c] for c in corr_df2.columns]
         corr_df2.index = [delay_count_cols[c] for c in corr_df2.index]
 
@@ -307,7 +309,7 @@ def show_tab3(df):
             labels=dict(color="Corrélation"),
             aspect="auto"
         )
-        st.plotly_chart(fig_corr2, use_container_width=True)
+        plotly_chart(fig_corr2, use_container_width=True)
     else:
         st.warning("Colonnes de comptage de retard manquantes.")
 
@@ -336,7 +338,7 @@ def show():
     - **Pourquoi ce choix ? :** Permet d'identifier les causes principales de retard dans les opérations aériennes domestiques.
     """)
 
-    df = load_csv('../data/cleaned/airline_delay_cause_cleaned.csv')
+    df = load_dataset('airline_delay_cause_cleaned', COLUMNS)
 
     # Aperçu du CSV
     with st.expander('Voir un aperçu du dataset (1000 lignes)'):
@@ -352,15 +354,15 @@ def show():
     col2.metric('Nombre de Vols Dérouté', f'{int(df['arr_diverted'].sum()):,}')
     col3.metric('Plage Temporelle', f'{df['year'].min().astype(int)} - {df['year'].max().astype(int)}')
 
-    tab1, tab2, tab3 = st.tabs(['Vue Globale', 'Analyses Temporelle', 'Heatmap'])
-    with tab1:
-        show_tab1(df)
-
-    with tab2:
-        show_tab2(df)
-
-    with tab3:
-        show_tab3(df)
+    # Onglets paresseux : seul l'onglet ouvert est calculé (voir utils.show_tabs)
+    show_tabs({
+        'Vue Globale': lambda: show_tab1(df),
+        'Analyses Temporelle': lambda: show_tab2(
+            load_dataset('airline_delay_cause_yearly', YEARLY_CAUSE_COLUMNS),
+            load_dataset('airline_delay_rate_yearly', YEARLY_RATE_COLUMNS)
+        ),
+        'Heatmap': lambda: show_tab3(df)
+    }, key='airline_tabs')
 
     st.markdown("---")
 
@@ -1,25 +1,40 @@
 import streamlit as st
-import pandas as pd
 import base64
-from utils import load_csv, apply_responsive
+from utils import load_dataset, load_statistic, apply_responsive, histogram, box, plotly_chart, show_tabs
 import plotly.express as px
 from sidebar import show_sidebar
 
 show_sidebar()
 
+# Contrat de projection : colonnes lues par la page
+COLUMNS = {
+    "Order_Date": "datetime64[ns]",
+    "Order_Hour": "Int8",
+    "Order_Weekday": "category",
+    "Order_Period": "category",
+    "Weather": "category",
+    "Traffic": "category",
+    "Area": "category",
+    "Delivery_Time": "int64",
+    "Category": "category",
+    "delivery_risk": "int8",
+    "weather_traffic_resilience_score": "float64",
+    "area_risk_score": "float64"
+}
+
 def show_tab1(df):
     # Histogramme des temps de livraison
     st.markdown("### Distribution des Temps de Livraison (en minutes)")
-    fig_hist = px.histogram(df, x="Delivery_Time", nbins=50, color_discrete_sequence=["#1f77b4"])
+    fig_hist = histogram(df, x="Delivery_Time", nbins=50, color_discrete_sequence=["#1f77b4"])
     apply_responsive(fig_hist)
-    st.plotly_chart(fig_hist, use_container_width=True)
+    plotly_chart(fig_hist, use_container_width=True)
 
     st.markdown("---")
 
     # Top contextes à risque (Weather x Traffic)
     st.markdown("### Contextes les Plus à Risque (Météo & Trafic)")
     top_risks = (
-        df.groupby(['Weather', 'Traffic'])['delivery_risk']
+        df.groupby(['Weather', 'Traffic'], observed=True)['delivery_risk']
         .mean()
         .sort_values(ascending=False)
         .head(5)
@@ -32,7 +47,7 @@ def show_tab1(df):
     # Zones géographiques avec le plus de risques
     st.markdown("### Zones Géographiques à Risque")
     area_risks = (
-        df.groupby('Area', as_index=False)['area_risk_score']
+        df.groupby('Area', as_index=False, observed=True)['area_risk_score']
         .mean()
         .sort_values(by="area_risk_score", ascending=False)
     )
@@ -50,94 +65,87 @@ def show_tab1(df):
     st.dataframe(top_categories, hide_index=True, use_container_width=True)
 
 def show_tab2(df):
-    df_time = df.copy()
-    df_time["Order_Date"] = pd.to_datetime(df_time["Order_Date"], errors="coerce")
-    df_time["Order_Hour"] = pd.to_datetime(df_time["Order_Time"], format="%H:%M:%S", errors="coerce").dt.hour
-    df_time["Pickup_Hour"] = pd.to_datetime(df_time["Pickup_Time"], format="%H:%M:%S", errors="coerce").dt.hour
-    df_time["DayOfWeek"] = df_time["Order_Date"].dt.day_name()
+    # Colonnes calendaires précalculées au nettoyage (Order_Hour, Order_Weekday, Order_Period)
 
     # Bloc 1 — Volume global par heure
     st.subheader("Volume de Commandes par Heure de la Journée")
-    fig_orders = px.histogram(df_time, x="Order_Hour", nbins=24, labels={"Order_Hour": "Heure"},
-                              title="Nombre de commandes passées par heure",
-                              color_discrete_sequence=["#006eff"])
+    fig_orders = histogram(df, x="Order_Hour", nbins=24, labels={"Order_Hour": "Heure"},
+                           title="Nombre de commandes passées par heure",
+                           color_discrete_sequence=["#006eff"])
     fig_orders.update_layout(margin=dict(l=0, r=0, t=40, b=0))
     apply_responsive(fig_orders)
-    st.plotly_chart(fig_orders, use_container_width=True)
+    plotly_chart(fig_orders, use_container_width=True)
 
     st.markdown("---")
 
     # Bloc 2 — Temps de livraison moyen par heure
     st.subheader("Temps de Livraison selon l'Heure de Commande")
-    fig_box = px.box(df_time, x="Order_Hour", y="Delivery_Time",
-                     labels={"Order_Hour": "Heure", "Delivery_Time": "Temps de livraison (min)"},
-                     title="Distribution des délais selon l'heure de la commande",
-                     color_discrete_sequence=["#9b59b6"])
+    fig_box = box(df, x="Order_Hour", y="Delivery_Time",
+                  labels={"Order_Hour": "Heure", "Delivery_Time": "Temps de livraison (min)"},
+                  title="Distribution des délais selon l'heure de la commande",
+                  color_discrete_sequence=["#9b59b6"])
     fig_box.update_layout(margin=dict(l=0, r=0, t=40, b=0))
     apply_responsive(fig_box)
-    st.plotly_chart(fig_box, use_container_width=True)
+    plotly_chart(fig_box, use_container_width=True)
 
     st.markdown("---")
 
     # Bloc 3 — Risque de retard par heure
     st.subheader("Taux de Retard (>120min) par Heure")
-    risk_by_hour = df_time.groupby("Order_Hour")["delivery_risk"].mean().reset_index()
+    risk_by_hour = df.groupby("Order_Hour")["delivery_risk"].mean().reset_index()
     fig_risk_hour = px.line(risk_by_hour, x="Order_Hour", y="delivery_risk", markers=True,
                             labels={"delivery_risk": "Taux de retard"},
                             title="Proportion de retards selon l'heure de la commande",
                             color_discrete_sequence=["#e74c3c"])
     fig_risk_hour.update_layout(yaxis_tickformat=".0%", margin=dict(l=0, r=0, t=40, b=0))
     apply_responsive(fig_risk_hour)
-    st.plotly_chart(fig_risk_hour, use_container_width=True)
+    plotly_chart(fig_risk_hour, use_container_width=True)
 
     st.markdown("---")
 
     # Bloc 4 — Risque de retard par jour de la semaine
     st.subheader("Taux de Retard selon le Jour de la Semaine")
-    risk_by_day = df_time.groupby("DayOfWeek")["delivery_risk"].mean().reindex([
+    risk_by_day = df.groupby("Order_Weekday", observed=False)["delivery_risk"].mean().reindex([
         "Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]).reset_index()
-    fig_risk_day = px.bar(risk_by_day, x="DayOfWeek", y="delivery_risk",
-                          labels={"delivery_risk": "Taux de retard"},
+    fig_risk_day = px.bar(risk_by_day, x="Order_Weekday", y="delivery_risk",
+                          labels={"delivery_risk": "Taux de retard", "Order_Weekday": "DayOfWeek"},
                           title="Retards moyens par jour de la semaine",
                           color_discrete_sequence=["#f39c12"])
     fig_risk_day.update_layout(yaxis_tickformat=".0%", margin=dict(l=0, r=0, t=40, b=0))
     apply_responsive(fig_risk_day)
-    st.plotly_chart(fig_risk_day, use_container_width=True)
+    plotly_chart(fig_risk_day, use_container_width=True)
 
     st.markdown("---")
 
     # Bloc 5 — Comparaison matin vs soir
     st.subheader("Matin vs Soir : Comparaison du Taux de Retard")
-    df_time["Period"] = df_time["Order_Hour"].apply(lambda h: "Matin (6h-12h)" if 6 <= h < 12 else
-                                                              "Après-midi (12h-18h)" if 12 <= h < 18 else
-                                                              "Soir/Nuit (18h-6h)")
-    risk_by_period = df_time.groupby("Period")["delivery_risk"].mean().reindex([
+    risk_by_period = df.groupby("Order_Period", observed=False)["delivery_risk"].mean().reindex([
         "Matin (6h-12h)", "Après-midi (12h-18h)", "Soir/Nuit (18h-6h)"]).reset_index()
-    fig_risk_period = px.bar(risk_by_period, x="Period", y="delivery_risk",
-                             labels={"delivery_risk": "Taux de retard"},
+    fig_risk_period = px.bar(risk_by_period, x="Order_Period", y="delivery_risk",
+                             labels={"delivery_risk": "Taux de retard", "Order_Period": "Period"},
                              title="Taux de retard en fonction du moment de la journée",
                              color_discrete_sequence=["#1abc9c"])
     fig_risk_period.update_layout(yaxis_tickformat=".0%", margin=dict(l=0, r=0, t=40, b=0))
     apply_responsive(fig_risk_period)
-    st.plotly_chart(fig_risk_period, use_container_width=True)
+    plotly_chart(fig_risk_period, use_container_width=True)
 
     st.markdown("---")
 
     # Bloc 6 — Évolution temporelle globale (par date)
     st.subheader("Évolution Globale du Taux de Retard")
-    risk_by_date = df_time.groupby("Order_Date")["delivery_risk"].mean().reset_index()
+    risk_by_date = df.groupby("Order_Date")["delivery_risk"].mean().reset_index()
     fig_date = px.line(risk_by_date, x="Order_Date", y="delivery_risk", markers=True,
                        labels={"delivery_risk": "Taux de retard"},
                        title="Évolution du risque de retard sur la période analysée",
                        color_discrete_sequence=["#2980b9"])
     fig_date.update_layout(yaxis_tickformat=".0%", margin=dict(l=0, r=0, t=40, b=0))
     apply_responsive(fig_date)
-    st.plotly_chart(fig_date, use_container_width=True)
+    plotly_chart(fig_date, use_container_width=True)
 
 def show_tab3(df):
     # Météo × Trafic
     st.subheader("Carte des Risques — Météo x Trafic")
-    risk_weather_traffic = df.pivot_table(index="Weather", columns="Traffic", values="delivery_risk", aggfunc="mean")
+    risk_weather_traffic = load_statistic("amazon_delivery_cleaned", COLUMNS, "pivot_mean", index="Weather", columns="Traffic", values="delivery_risk")
     fig1 = px.imshow(
         risk_weather_traffic,
         text_auto=".2f",
@@ -146,14 +154,14 @@ def show_tab3(df):
         labels=dict(color="Taux de retard"),
         title="Taux de retard (>120min) selon Météo et Trafic"
     )
-    st.plotly_chart(fig1, use_container_width=True)
+    plotly_chart(fig1, use_container_width=True)
     apply_responsive(fig1)
 
     st.markdown("---")
 
     # Zone x Météo
     st.subheader("Carte des Risques — Zone x Météo")
-    risk_area_weather = df.pivot_table(index="Weather", columns="Area", values="delivery_risk", aggfunc="mean")
+    risk_area_weather = load_statistic("amazon_delivery_cleaned", COLUMNS, "pivot_mean", index="Weather", columns="Area", values="delivery_risk")
     fig2 = px.imshow(
         risk_area_weather,
         text_auto=".2f",
@@ -162,17 +170,15 @@ def show_tab3(df):
         labels=dict(color="Taux de retard"),
         title="Taux de retard selon Zone et Météo"
     )
-    st.plotly_chart(fig2, use_container_width=True)
+    plotly_chart(fig2, use_container_width=True)
     apply_responsive(fig2)
 
     st.markdown("---")
 
     # Jour x Heure
     st.subheader("Carte des Risques — Jour x Heure de Commande")
-    df["Order_Hour"] = pd.to_datetime(df["Order_Time"], format="%H:%M:%S", errors="coerce").dt.hour
-    df["DayOfWeek"] = pd.to_datetime(df["Order_Date"], format="%Y-%m-%d", errors="coerce").dt.day_name()
     ordered_days = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
-    risk_day_hour = df.pivot_table(index="DayOfWeek", columns="Order_Hour", values="delivery_risk", aggfunc="mean")
+    risk_day_hour = load_statistic("amazon_delivery_cleaned", COLUMNS, "pivot_mean", index="Order_Weekday", columns="Order_Hour", values="delivery_risk")
     risk_day_hour = risk_day_hour.reindex(ordered_days)
     fig3 = px.imshow(
         risk_day_hour,
@@ -182,7 +188,7 @@ def show_tab3(df):
         labels=dict(color="Taux de retard"),
         title="Retards selon le Jour et l'Heure de Commande"
     )
-    st.plotly_chart(fig3, use_container_width=True)
+    plotly_chart(fig3, use_container_width=True)
     apply_responsive(fig3)
 
 def show():
@@ -231,7 +237,7 @@ def show():
     """)
 
     # Charger les données nettoyées
-    df = load_csv("../data/cleaned/amazon_delivery_cleaned.csv")
+    df = load_dataset("amazon_delivery_cleaned", COLUMNS)
 
     # Aperçu dans un expander
     with st.expander("Voir un aperçu du dataset (1000 lignes)"):
@@ -246,16 +252,12 @@ def show():
     col3.metric("Délai Moyen", f"{df['Delivery_Time'].mean():.1f} min")
     col4.metric("Résilience Moyenne", f"{df['weather_traffic_resilience_score'].mean():.2f}")
 
-    tab1, tab2, tab3 = st.tabs(["Vue Globale", "Analyse Temporelle", "Heatmap"])
-
-    with tab1:
-        show_tab1(df)
-
-    with tab2:
-        show_tab2(df)
-
-    with tab3:
-        show_tab3(df)
+    # Onglets paresseux : seul l'onglet ouvert est calculé (voir utils.show_tabs)
+    show_tabs({
+        "Vue Globale": lambda: show_tab1(df),
+        "Analyse Temporelle": lambda: show_tab2(df),
+        "Heatmap": lambda: show_tab3(df)
+    }, key="amazon_tabs")
 
     st.markdown("---")
 
@@ -267,9 +269,9 @@ def show():
     - **Taux global de retard (>120 min) :** {df['delivery_risk'].mean():.2%}
     - **Plages horaires critiques :**
         - Heure de commande avec le plus fort taux de retard : `{df.groupby('Order_Hour')['delivery_risk'].mean().idxmax()}h`
-        - Moment de la journée le plus risqué : `{df.groupby(df['Order_Hour'].apply(lambda h: 'Matin' if 6 <= h < 12 else 'Après-midi' if 12 <= h < 18 else 'Soir/Nuit'))['delivery_risk'].mean().idxmax()}`
-    - **Contexte météo-trafic le plus critique :** `{df.groupby(['Weather', 'Traffic'])['delivery_risk'].mean().idxmax()}`
-    - **Zone géographique la plus à risque :** `{df.groupby('Area')['area_risk_score'].mean().idxmax()}`
+        - Moment de la journée le plus risqué : `{df.groupby('Order_Period', observed=True)['delivery_risk'].mean().idxmax()}`
+    - **Contexte météo-trafic le plus critique :** `{df.groupby(['Weather', 'Traffic'], observed=True)['delivery_risk'].mean().idxmax()}`
+    - **Zone géographique la plus à risque :** `{df.groupby('Area', observed=True)['area_risk_score'].mean().idxmax()}`
     - **Catégorie la plus fréquemment commandée :** `{df['Category'].mode()[0]}`
     """)
 
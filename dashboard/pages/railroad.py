@@ -1,30 +1,111 @@
 import streamlit as st
 import base64
-import pandas as pd
 import base64
-from utils import load_csv, apply_responsive
+from utils import load_dataset, load_statistic, apply_responsive, histogram, plotly_chart, show_tabs
 import plotly.express as px
 from sidebar import show_sidebar
 
 show_sidebar()
 
-def show_tab1(df):
-
-    st.subheader("Répartition par Type d'Accident")
-    type_counts = df["Accident Type"].value_counts().reset_index()
-    type_counts.columns = ["Accident Type", "Count"]
-    fig_type = px.bar(
-        type_counts,
-        x="Accident Type",
-        y="Count",
-        color="Accident Type",
-        title="Nombre d'incidents par type",
-        color_discrete_sequence=px.colors.qualitative.Set3
-    )
-    st.plotly_chart(apply_responsive(fig_type), use_container_width=True)
-
-    st.markdown("---")
-
+# Contrat de projection : colonnes lues par la page
+COLUMNS = {
+    "Accident Month": "int8",
+    "Day": "int8",
+    "Report Year": "int16",
+    "Accident Type": "category",
+    "State Name": "category",
+    "County Name": "category",
+    "Latitude": "float64",
+    "Longitude": "float64",
+    "TimeOfDay": "category",
+    "Accident_Date": "datetime64[ns]",
+    "Total Damage Cost": "float64",
+    "Total Persons Killed": "int64",
+    "Total Persons Injured": "int64",
+    "Hazmat Cars": "int64",
+    "Hazmat Cars Damaged": "int64",
+    "Persons Evacuated": "int64",
+    "Risque_composite": "float64",
+    "Niveau_criticité": "category"
+}
+
+# Grille de la carte écrite par le pipeline (pipeline.railroad.map_grid)
+GRID_COLUMNS = {
+    "Step": "float64",
+    "Latitude": "float64",
+    "Longitude": "float64",
+    "Count": "int32",
+    "Niveau_criticité": "category"
+}
+
+# Niveaux de détail de la carte : cellules agrégées (pas en degrés), puis incidents d'un seul État
+MAP_LEVELS = {
+    "National (cellules de 1°)": 1.0,
+    "Régional (cellules de 0,25°)": 0.25,
+    "Incidents d'un État": None
+}
+
+CRITICITY_COLORS = {
+    "Low": "#2ecc71",
+    "Medium": "#f1c40f",
+    "High": "#e74c3c"
+}
+
+# Fragment : changer de niveau de détail ne relance que la carte
+@st.fragment
+def show_incident_map(df):
+    level = st.radio("Niveau de détail", list(MAP_LEVELS), horizontal=True)
+    step = MAP_LEVELS[level]
+
+    if step is not None:
+        grid = load_dataset("railroad_accident_grid", GRID_COLUMNS)
+        cells = grid[grid["Step"] == step]
+        fig_map = px.scatter_map(
+            cells,
+            lat="Latitude",
+            lon="Longitude",
+            color="Niveau_criticité",
+            size="Count",
+            size_max=20 if step >= 1 else 10,
+            zoom=3.2,
+            center={"lat": 37.5, "lon": -95},
+            height=600,
+            map_style="carto-positron",
+            color_discrete_map=CRITICITY_COLORS,
+            hover_data={"Count": True, "Latitude": False, "Longitude": False},
+            labels={"Count": "Incidents", "Niveau_criticité": "Criticité dominante"}
+        )
+    else:
+        states = df["State Name"].value_counts().loc[lambda counts: counts > 0].index.tolist()
+        state = st.selectbox("État", states)
+        # Nettoyage des coordonnées (USA continentaux)
+        df_map = df[df["State Name"] == state].dropna(subset=["Latitude", "Longitude"])
+        df_map = df_map[
+            (df_map["Latitude"].between(24.5, 49.5)) &
+            (df_map["Longitude"].between(-125, -66))
+        ]
+        if df_map.empty:
+            st.info("Aucun incident géolocalisé pour cet État.")
+            return
+        fig_map = px.scatter_map(
+            df_map,
+            lat="Latitude",
+            lon="Longitude",
+            color="Niveau_criticité",
+            zoom=5,
+            center={"lat": df_map["Latitude"].median(), "lon": df_map["Longitude"].median()},
+            height=600,
+            map_style="carto-positron",
+            color_discrete_map=CRITICITY_COLORS,
+            hover_data=["State Name", "County Name", "Accident Type", "Total Damage Cost", "Total Persons Killed"],
+        )
+
+    fig_map.update_layout(margin={"r":0, "t":0, "l":0, "b":0})
+    plotly_chart(apply_responsive(fig_map), use_container_width=True)
+
+# Fragment : changer la sélection ne relance que ce bloc, pas la carte ni les autres graphiques
+@st.fragment
+def show_variable_averages(df):
     st.markdown("### Moyennes des Variables par Type d'Accident")
     st.markdown("**Comparaison des indicateurs selon le type d'accident**")
     variables = [
@@ -37,7 +118,7 @@ def show_tab1(df):
         default=["Total Damage Cost"]
     )
     if selected_vars:
-        df_avg = df.groupby("Accident Type")[selected_vars].mean().reset_index()
+        df_avg = df.groupby("Accident Type", observed=True)[selected_vars].mean().reset_index()
         for var in selected_vars:
             st.markdown(f"#### {var}")
             sorted_df = df_avg.sort_values(var, ascending=False)
@@ -49,10 +130,29 @@ def show_tab1(df):
                 height=400,
                 color_discrete_sequence=["#2ecc71"]
             )
-            st.plotly_chart(fig, use_container_width=True)
+            plotly_chart(fig, use_container_width=True)
     else:
         st.info("Veuillez sélectionner au moins une variable.")
 
+def show_tab1(df):
+
+    st.subheader("Répartition par Type d'Accident")
+    type_counts = df["Accident Type"].value_counts().reset_index()
+    type_counts.columns = ["Accident Type", "Count"]
+    fig_type = px.bar(
+        type_counts,
+        x="Accident Type",
+        y="Count",
+        color="Accident Type",
+        title="Nombre d'incidents par type",
+        color_discrete_sequence=px.colors.qualitative.Set3
+    )
+    plotly_chart(apply_responsive(fig_type), use_container_width=True)
+
+    st.markdown("---")
+
+    show_variable_averages(df)
+
     st.markdown("---")
 
     st.subheader("Niveau de Criticité Global")
@@ -66,41 +166,12 @@ def show_tab1(df):
         color="Niveau_criticité",
         color_discrete_map={"Low": "green", "Medium": "orange", "High": "red"}
     )
-    st.plotly_chart(apply_responsive(fig_crit), use_container_width=True)
+    plotly_chart(apply_responsive(fig_crit), use_container_width=True)
 
     st.markdown("---")
 
     st.subheader("Carte des Incidents")
-    # Nettoyage des coordonnées
-    df_map = df.dropna(subset=["Latitude", "Longitude"])
-    df_map = df_map[
-        (df_map["Latitude"].between(24.5, 49.5)) &
-        (df_map["Longitude"].between(-125, -66))
-    ]
-
-    fig_map = px.scatter_map(
-        df_map,
-        lat="Latitude",
-        lon="Longitude",
-        color="Niveau_criticité",
-        zoom=3,
-        height=600,
-        map_style="carto-positron",
-        color_discrete_map={
-            "Low": "#2ecc71",
-            "Medium": "#f1c40f",
-            "High": "#e74c3c"
-        },
-        hover_data=["State Name", "County Name", "Accident Type", "Total Damage Cost", "Total Persons Killed"],
-    )
-
-    fig_map.update_layout(
-        margin={"r":0, "t":0, "l":0, "b":0},
-        mapbox_center={"lat": 37.5, "lon": -95},
-        mapbox_zoom=3.2
-    )
-
-    st.plotly_chart(apply_responsive(fig_map), use_container_width=True)
+    show_incident_map(df)
 
     st.markdown("---")
 
@@ -129,19 +200,19 @@ def show_tab2(df):
         labels={"x": "Année", "y": "Nombre d'incidents"},
         title="Nombre d'incidents par année"
     )
-    st.plotly_chart(fig_years, use_container_width=True)
+    plotly_chart(fig_years, use_container_width=True)
 
     st.markdown("---")
 
     # Répartition par type d'incident sur le temps
     st.subheader("Types d'Accidents au Fil du Temps")
-    type_year = df.groupby(["Report Year", "Accident Type"]).size().unstack(fill_value=0)
+    type_year = df.groupby(["Report Year", "Accident Type"], observed=True).size().unstack(fill_value=0)
     fig_type = px.area(
         type_year,
         labels={"value": "Nombre", "Report Year": "Année", "variable": "Type"},
         title="Évolution des types d'accidents"
     )
-    st.plotly_chart(fig_type, use_container_width=True)
+    plotly_chart(fig_type, use_container_width=True)
 
     st.markdown("---")
 
@@ -155,13 +226,13 @@ def show_tab2(df):
         labels={"x": "Année", "y": "Risque moyen"},
         title="Risque moyen par année"
     )
-    st.plotly_chart(fig_risk, use_container_width=True)
+    plotly_chart(fig_risk, use_container_width=True)
 
     st.markdown("---")
 
     # Moment de la journée
     st.subheader("Répartition par Moment de la Journée")
-    fig_time = px.histogram(
+    fig_time = histogram(
         df,
         x="TimeOfDay",
         color="Niveau_criticité",
@@ -170,7 +241,7 @@ def show_tab2(df):
         labels={"count": "Nombre d'incidents"},
         title="Incidents par moment de la journée"
     )
-    st.plotly_chart(fig_time, use_container_width=True)
+    plotly_chart(fig_time, use_container_width=True)
 
 
 def show_tab3(df):
@@ -183,10 +254,10 @@ def show_tab3(df):
 
     st.markdown("### Corrélation Générale")
     st.markdown("**Corrélation entre les variables générales**")
-    corr_general = df[general_cols].corr()
+    corr_general = load_statistic("railroad_accident_cleaned", COLUMNS, "corr", columns=general_cols)
     fig1 = px.imshow(corr_general, text_auto=True, color_continuous_scale="RdBu_r", aspect="auto")
     fig1.update_layout(width=900, height=600, margin=dict(l=50, r=50, t=50, b=50))
-    st.plotly_chart(fig1, use_container_width=True)
+    plotly_chart(fig1, use_container_width=True)
     st.caption("Les variables fortement corrélées sont les blessures, les décès et les coûts matériels. Hazmat reste faiblement lié.")
 
     st.markdown("---")
@@ -194,10 +265,10 @@ def show_tab3(df):
     st.markdown("### Corrélation Hazmat & Risque")
     st.markdown("**Corrélation Hazmat et Risque Composite**")
     hazmat_cols = ["Hazmat Cars", "Hazmat Cars Damaged", "Persons Evacuated", "Risque_composite"]
-    corr_hazmat = df[hazmat_cols].corr()
+    corr_hazmat = load_statistic("railroad_accident_cleaned", COLUMNS, "corr", columns=hazmat_cols)
     fig2 = px.imshow(corr_hazmat, text_auto=True, color_continuous_scale="YlGnBu", aspect="auto")
     fig2.update_layout(width=800, height=500, margin=dict(l=50, r=50, t=50, b=50))
-    st.plotly_chart(fig2, use_container_width=True)
+    plotly_chart(fig2, use_container_width=True)
     st.caption("Corrélation modérée entre wagons Hazmat endommagés et nombre total. Risque composite peu influencé ici.")
 
 def show():
@@ -237,17 +308,7 @@ def show():
     """)
 
     # Charger les données nettoyées
-    df = load_csv("../data/cleaned/railroad_accident_cleaned.csv")
-
-    # Nettoyage des noms de colonnes (strip des espaces invisibles s'il y en a)
-    df.columns = df.columns.str.strip()
-
-    # Créer une colonne Date complète à partir des 3 colonnes séparées
-    df["Accident_Date"] = pd.to_datetime({
-        "year": df["Report Year"],
-        "month": df["Accident Month"],
-        "day": df["Day"]
-    }, errors="coerce")
+    df = load_dataset("railroad_accident_cleaned", COLUMNS)
 
     # Aperçu dans un expander
     with st.expander("Voir un aperçu du dataset (1000 lignes)"):
@@ -261,7 +322,7 @@ def show():
     total_injured = df["Total Persons Injured"].sum()
     total_damage = df["Total Damage Cost"].sum()
     avg_damage = df["Total Damage Cost"].mean()
-    max_damage_state = df.groupby("State Name")["Total Damage Cost"].sum().idxmax()
+    max_damage_state = df.groupby("State Name", observed=True)["Total Damage Cost"].sum().idxmax()
     top_state = df["State Name"].value_counts().idxmax()
 
     col1, col2, col3 = st.columns(3)
@@ -274,16 +335,12 @@ def show():
     col5.metric("Dommage Moyen", f"${avg_damage:,.0f}")
     col6.metric("État + Touché ($)", max_damage_state)
 
-    tab1, tab2, tab3 = st.tabs(["Vue Globale", "Analyses Temporelle", "Heatmap"])
-
-    with tab1:
-        show_tab1(df)
-
-    with tab2:
-        show_tab2(df)
-
-    with tab3:
-        show_tab3(df)
+    # Onglets paresseux : seul l'onglet ouvert est calculé (voir utils.show_tabs)
+    show_tabs({
+        "Vue Globale": lambda: show_tab1(df),
+        "Analyses Temporelle": lambda: show_tab2(df),
+        "Heatmap": lambda: show_tab3(df)
+    }, key="railroad_tabs")
 
     st.markdown("---")
 
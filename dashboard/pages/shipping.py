@@ -1,13 +1,29 @@
 import streamlit as st
 import base64
-from utils import load_csv, apply_responsive
+from utils import load_dataset, load_statistic, dataset_fingerprint, apply_responsive, histogram, plotly_chart, show_tabs
 import plotly.express as px
 import plotly.graph_objects as go
-import pandas as pd
+import numpy as np
 from sidebar import show_sidebar
 
 show_sidebar()
 
+# Contrat de projection : colonnes lues par la page
+COLUMNS = {
+    "Unique_ID": "string",
+    "Year": "int16",
+    "Location": "category",
+    "Geo_Zone": "category",
+    "Geo_Latitude_Zone": "string",
+    "Geo_Longitude_Zone": "string",
+    "Pollution_Score": "float64",
+    "Risk_Score": "float64",
+    "Risk_Class": "category",
+    "Acc_Type": "category",
+    "Latitude": "float64",
+    "Longitude": "float64"
+}
+
 def show_tab1(df):
     st.markdown("## Répartition des Accidents et du Risque")
 
@@ -28,7 +44,7 @@ def show_tab1(df):
             text="Nombre"
         )
         fig_type.update_layout(xaxis_tickangle=45, showlegend=False)
-        st.plotly_chart(fig_type, use_container_width=True)
+        plotly_chart(fig_type, use_container_width=True)
 
     with col2:
         st.subheader("Par Zone Géographique")
@@ -41,7 +57,7 @@ def show_tab1(df):
             title="Répartition géographique des accidents",
             color_discrete_sequence=px.colors.sequential.RdBu
         )
-        st.plotly_chart(apply_responsive(fig_zone), use_container_width=True)
+        plotly_chart(apply_responsive(fig_zone), use_container_width=True)
 
     st.markdown("---")
 
@@ -65,13 +81,13 @@ def show_tab1(df):
             },
             category_orders={"Classe de Risque": ["Low", "Medium", "High", "Critical"]},
         )
-        st.plotly_chart(apply_responsive(fig_risk), use_container_width=True)
+        plotly_chart(apply_responsive(fig_risk), use_container_width=True)
 
-    q = df['Risk_Score'].quantile([0, 0.25, 0.5, 0.75, 1]).values
+    q = load_statistic("shipping_accidents_cleaned", COLUMNS, "quantile", column="Risk_Score", q=[0, 0.25, 0.5, 0.75, 1]).values
 
     with col4:
         st.subheader("Distribution du Score de Risque")
-        fig_dist = px.histogram(
+        fig_dist = histogram(
             df,
             x="Risk_Score",
             nbins=80,
@@ -86,7 +102,7 @@ def show_tab1(df):
             yaxis_title="Nombre d'accidents (échelle log)",
             bargap=0.05
         )
-        st.plotly_chart(fig_dist, use_container_width=True)
+        plotly_chart(fig_dist, use_container_width=True)
 
     with st.expander("💡 Interprétation des Scores de Risque"):
         st.markdown(f"""
@@ -102,30 +118,55 @@ def show_tab1(df):
         """)
 
 
-def show_tab2(df):
-    st.markdown("## Analyse Temporelle et Cartographie")
+# Pas de la grille (degrés) des frames de la carte animée
+MAP_STEP = 1.0
 
-    # Conversion explicite des années en entiers pour animation
-    df["Year"] = df["Year"].astype("Int64")
+# `_df` (préfixé par _) n'est pas haché par Streamlit : la clé de cache est l'empreinte du fichier.
+# La figure est persistée sur disque : la construire ne coûte qu'une fois par version du dataset
+@st.cache_data(persist="disk")
+def build_animated_map(_df, fingerprint):
+    """Carte animée, une frame par année : accidents agrégés par cellule de MAP_STEP degrés.
+
+    Chaque frame porte au plus une bulle par cellule (nombre d'accidents, score de risque
+    moyen) : la figure grandit avec l'emprise et le nombre d'années, pas avec le nombre d'accidents.
+    """
+    located = _df.dropna(subset=["Latitude", "Longitude"])
+    cells = (
+        located.assign(
+            Latitude=(np.floor(located["Latitude"] / MAP_STEP) + 0.5) * MAP_STEP,
+            Longitude=(np.floor(located["Longitude"] / MAP_STEP) + 0.5) * MAP_STEP
+        )
+        .groupby(["Year", "Latitude", "Longitude"])
+        .agg(Accidents=("Unique_ID", "size"), Risk_Score=("Risk_Score", "mean"))
+        .reset_index()
+    )
+    cells["Risk_Score"] = cells["Risk_Score"].round(3)
 
-    # Carte des incidents animée par année
-    st.subheader("Cartographie Animée des Accidents Maritimes")
     fig_map = px.scatter_map(
-        df,
+        cells,
         lat="Latitude",
         lon="Longitude",
-        hover_name="Acc_Type",
-        hover_data=["Risk_Score", "Location"],
+        size="Accidents",
+        size_max=15,
+        hover_data={"Accidents": True, "Risk_Score": True, "Latitude": False, "Longitude": False},
+        labels={"Risk_Score": "Score de risque moyen"},
         color_discrete_sequence=["red"],
         zoom=3,
         height=500,
-        animation_frame="Year",
-        animation_group="Unique_ID"
+        animation_frame="Year"
     )
-    fig_map.update_layout(mapbox_style="carto-positron", margin={"r":0,"t":0,"l":0,"b":0})
+    fig_map.update_layout(map_style="carto-positron", margin={"r":0,"t":0,"l":0,"b":0})
     fig_map.update_layout(transition_duration=500)
     fig_map.update_layout(legend=dict(yanchor="top", y=0.99, xanchor="left", x=0.01))
-    st.plotly_chart(apply_responsive(fig_map), use_container_width=True)
+    return fig_map
+
+def show_tab2(df):
+    st.markdown("## Analyse Temporelle et Cartographie")
+
+    # Carte des incidents animée par année (figure précalculée, voir build_animated_map)
+    st.subheader("Cartographie Animée des Accidents Maritimes")
+    fig_map = build_animated_map(df, dataset_fingerprint("shipping_accidents_cleaned"))
+    plotly_chart(apply_responsive(fig_map), use_container_width=True)
 
     st.markdown("---")
 
@@ -141,7 +182,7 @@ def show_tab2(df):
             markers=True
         )
         fig_years.update_layout(title="Accidents par an", xaxis=dict(dtick=1))
-        st.plotly_chart(fig_years, use_container_width=True)
+        plotly_chart(fig_years, use_container_width=True)
 
     with col2:
         st.subheader("Évolution du Score de Risque Moyen par Année")
@@ -154,7 +195,7 @@ def show_tab2(df):
             markers=True
         )
         fig_risk.update_layout(title="Score de Risque Moyen par Année", yaxis_range=[0, 0.1])
-        st.plotly_chart(fig_risk, use_container_width=True)
+        plotly_chart(fig_risk, use_container_width=True)
 
 def show_tab3(df):
     st.markdown("## Corrélations entre Zones, Types et Risques")
@@ -163,7 +204,7 @@ def show_tab3(df):
 
     with col1:
         st.subheader("Type d'accident vs Zone géographique")
-        heatmap1 = pd.crosstab(df['Acc_Type'], df['Geo_Zone'])
+        heatmap1 = load_statistic("shipping_accidents_cleaned", COLUMNS, "crosstab", index="Acc_Type", columns="Geo_Zone")
         fig1 = px.imshow(
             heatmap1,
             labels=dict(x="Zone", y="Type", color="Nombre"),
@@ -172,11 +213,11 @@ def show_tab3(df):
             aspect="auto"
         )
         fig1.update_layout(margin=dict(t=40, l=0, r=0, b=0))
-        st.plotly_chart(apply_responsive(fig1), use_container_width=True)
+        plotly_chart(apply_responsive(fig1), use_container_width=True)
 
     with col2:
         st.subheader("Zone géographique vs Classe de Risque")
-        heatmap2 = pd.crosstab(df['Geo_Zone'], df['Risk_Class'])
+        heatmap2 = load_statistic("shipping_accidents_cleaned", COLUMNS, "crosstab", index="Geo_Zone", columns="Risk_Class")
         fig2 = px.imshow(
             heatmap2,
             labels=dict(x="Classe de Risque", y="Zone", color="Nombre"),
@@ -185,13 +226,13 @@ def show_tab3(df):
             aspect="auto"
         )
         fig2.update_layout(margin=dict(t=40, l=0, r=0, b=0))
-        st.plotly_chart(apply_responsive(fig2), use_container_width=True)
+        plotly_chart(apply_responsive(fig2), use_container_width=True)
 
     st.markdown("---")
 
     # Deuxième ligne : Type d'accident vs Classe de risque
     st.subheader("Type d'accident vs Classe de Risque")
-    heatmap3 = pd.crosstab(df['Acc_Type'], df['Risk_Class'])
+    heatmap3 = load_statistic("shipping_accidents_cleaned", COLUMNS, "crosstab", index="Acc_Type", columns="Risk_Class")
     fig3 = px.imshow(
         heatmap3,
         labels=dict(x="Classe de Risque", y="Type d'accident", color="Nombre"),
@@ -200,15 +241,16 @@ def show_tab3(df):
         aspect="auto"
     )
     fig3.update_layout(margin=dict(t=40, l=0, r=0, b=0))
-    st.plotly_chart(apply_responsive(fig3), use_container_width=True)
+    plotly_chart(apply_responsive(fig3), use_container_width=True)
 
     st.markdown("---")
 
     st.subheader("Risque Moyen par Zone")
-    df["Zone_Geo"] = df["Geo_Latitude_Zone"] + " / " + df["Geo_Longitude_Zone"]
-    heatmap_data = df.groupby("Zone_Geo")["Risk_Score"].mean().reset_index()
-    heatmap_data["Latitude"] = heatmap_data["Zone_Geo"].apply(lambda x: x.split(" / ")[0])
-    heatmap_data["Longitude"] = heatmap_data["Zone_Geo"].apply(lambda x: x.split(" / ")[1])
+    heatmap_data = (
+        df.groupby(["Geo_Latitude_Zone", "Geo_Longitude_Zone"])["Risk_Score"].mean()
+        .reset_index()
+        .rename(columns={"Geo_Latitude_Zone": "Latitude", "Geo_Longitude_Zone": "Longitude"})
+    )
 
     fig3 = px.density_heatmap(
         heatmap_data,
@@ -223,7 +265,7 @@ def show_tab3(df):
         yaxis_title="Zone Latitudinale",
         margin=dict(t=30, l=0, r=0, b=0)
     )
-    st.plotly_chart(apply_responsive(fig3), use_container_width=True)
+    plotly_chart(apply_responsive(fig3), use_container_width=True)
 
 def show():
     # Charger l'icône et encoder en base64
@@ -270,7 +312,7 @@ def show():
     """)
 
     # Charger les données nettoyées
-    df = load_csv("../data/cleaned/shipping_accidents_cleaned.csv")
+    df = load_dataset("shipping_accidents_cleaned", COLUMNS)
 
     # Aperçu dans un expander
     with st.expander("Voir un aperçu du dataset (1000 lignes)"):
@@ -303,16 +345,12 @@ def show():
     col5.metric("Années distinctes", distinct_years)
     col6.metric("Pollution totale (tonnes)", pollution_display)
 
-    tab1, tab2, tab3 = st.tabs(["Vue Globale", "Analyses Temporelle", "Heatmap"])
-
-    with tab1:
-        show_tab1(df)
-
-    with tab2:
-        show_tab2(df)
-
-    with tab3:
-        show_tab3(df)
+    # Onglets paresseux : seul l'onglet ouvert est calculé (voir utils.show_tabs)
+    show_tabs({
+        "Vue Globale": lambda: show_tab1(df),
+        "Analyses Temporelle": lambda: show_tab2(df),
+        "Heatmap": lambda: show_tab3(df)
+    }, key="shipping_tabs")
 
     st.markdown("---")
 
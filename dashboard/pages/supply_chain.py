@@ -1,17 +1,31 @@
 import streamlit as st
 import base64
-from utils import load_csv, apply_responsive
+from utils import load_dataset, load_statistic, apply_responsive, histogram, box, plotly_chart, show_tabs
 import plotly.express as px
 import plotly.graph_objects as go
 from sidebar import show_sidebar
 
 show_sidebar()
 
+# Contrat de projection : colonnes lues par la page
+COLUMNS = {
+    "product_id": "string",
+    "supplier_id": "string",
+    "supplier_country": "category",
+    "disruption_likelihood_score": "float64",
+    "delay_probability": "float64",
+    "delivery_time_deviation": "float64",
+    "lead_time_days": "float64",
+    "supplier_reliability_score": "float64",
+    "Risk_Score": "float64",
+    "Resilience_Index": "float64"
+}
+
 def show_tab1(df):
     st.markdown("### Carte des Fournisseurs les Plus Fiables")
 
     # Moyenne du Resilience_Index par pays
-    df_resilience = df.groupby("supplier_country", as_index=False)["Resilience_Index"].mean()
+    df_resilience = df.groupby("supplier_country", as_index=False, observed=True)["Resilience_Index"].mean()
 
     fig_map = px.choropleth(
         df_resilience,
@@ -21,14 +35,14 @@ def show_tab1(df):
         color_continuous_scale="Greens"
     )
     fig_map.update_geos(showcountries=True, showcoastlines=True, fitbounds="locations")
-    st.plotly_chart(apply_responsive(fig_map), use_container_width=True)
+    plotly_chart(apply_responsive(fig_map), use_container_width=True)
 
     st.markdown("---")
 
     # TOP pays
     st.markdown("### Top 10 des Pays avec les Fournisseurs les Plus Fiables")
     top_countries_best = (
-        df.groupby('supplier_country', as_index=False)['Resilience_Index']
+        df.groupby('supplier_country', as_index=False, observed=True)['Resilience_Index']
         .mean()
         .sort_values(by='Resilience_Index', ascending=False)
         .head(10)
@@ -39,7 +53,7 @@ def show_tab1(df):
 
     st.markdown("### Top 10 des Pays avec les Fournisseurs les Moins Fiables")
     top_countries_worst = (
-        df.groupby('supplier_country', as_index=False)['Resilience_Index']
+        df.groupby('supplier_country', as_index=False, observed=True)['Resilience_Index']
         .mean()
         .sort_values(by='Resilience_Index', ascending=True)
         .head(10)
@@ -54,23 +68,23 @@ def show_tab1(df):
 
     with col1:
         st.subheader("Risk Score")
-        fig_risk = px.histogram(df, x="Risk_Score", nbins=50, color_discrete_sequence=["#e74c3c"])
-        st.plotly_chart(apply_responsive(fig_risk), use_container_width=True)
+        fig_risk = histogram(df, x="Risk_Score", nbins=50, color_discrete_sequence=["#e74c3c"])
+        plotly_chart(apply_responsive(fig_risk), use_container_width=True)
 
     with col2:
         st.subheader("Indice de Résilience")
-        fig_resilience = px.histogram(df, x="Resilience_Index", nbins=50, color_discrete_sequence=["#27ae60"])
-        st.plotly_chart(apply_responsive(fig_resilience), use_container_width=True)
+        fig_resilience = histogram(df, x="Resilience_Index", nbins=50, color_discrete_sequence=["#27ae60"])
+        plotly_chart(apply_responsive(fig_resilience), use_container_width=True)
 
 def show_tab2(df):
     # --- Analyse des Délais ---
     st.markdown("### Analyse des Délais de Livraison")
 
-    fig_lead_hist = px.histogram(df, x="lead_time_days", nbins=50, color_discrete_sequence=["#1f77b4"])
-    st.plotly_chart(apply_responsive(fig_lead_hist), use_container_width=True)
+    fig_lead_hist = histogram(df, x="lead_time_days", nbins=50, color_discrete_sequence=["#1f77b4"])
+    plotly_chart(apply_responsive(fig_lead_hist), use_container_width=True)
 
     top_lead_time_long = (
-        df.groupby("supplier_country", as_index=False)["lead_time_days"]
+        df.groupby("supplier_country", as_index=False, observed=True)["lead_time_days"]
         .mean()
         .sort_values(by="lead_time_days", ascending=False)
         .head(10)
@@ -81,7 +95,7 @@ def show_tab2(df):
     st.dataframe(top_lead_time_long, use_container_width=True, hide_index=True)
 
     top_lead_time_short = (
-        df.groupby("supplier_country", as_index=False)["lead_time_days"]
+        df.groupby("supplier_country", as_index=False, observed=True)["lead_time_days"]
         .mean()
         .sort_values(by="lead_time_days", ascending=True)
         .head(10)
@@ -96,8 +110,8 @@ def show_tab2(df):
     # --- Analyse des Retards ---
     st.markdown("### Analyse des Retards de Livraison (Delivery Time Deviation)")
 
-    fig_delay_hist = px.histogram(df, x="delivery_time_deviation", nbins=50, color_discrete_sequence=["#ff7f0e"])
-    st.plotly_chart(apply_responsive(fig_delay_hist), use_container_width=True)
+    fig_delay_hist = histogram(df, x="delivery_time_deviation", nbins=50, color_discrete_sequence=["#ff7f0e"])
+    plotly_chart(apply_responsive(fig_delay_hist), use_container_width=True)
 
     # KPIs retards / avances
     n_total = len(df)
@@ -113,21 +127,21 @@ def show_tab2(df):
     top_countries = df['supplier_country'].value_counts().head(10).index.tolist()
     df_top_countries = df[df['supplier_country'].isin(top_countries)]
 
-    fig_box = px.box(
+    fig_box = box(
         df_top_countries,
         x="supplier_country",
         y="delivery_time_deviation",
         color="supplier_country",
         category_orders={"supplier_country": top_countries}
     )
-    st.plotly_chart(apply_responsive(fig_box), use_container_width=True)
+    plotly_chart(apply_responsive(fig_box), use_container_width=True)
 
     st.markdown("---")
 
     # --- Fournisseurs les Plus et Moins Résilients ---
     st.markdown("### Top 10 des Fournisseurs les Plus Résilients")
     top_suppliers_best = (
-        df.groupby(['supplier_id', 'supplier_country'], as_index=False)['Resilience_Index']
+        df.groupby(['supplier_id', 'supplier_country'], as_index=False, observed=True)['Resilience_Index']
         .mean()
         .sort_values(by='Resilience_Index', ascending=False)
         .head(10)
@@ -138,7 +152,7 @@ def show_tab2(df):
 
     st.markdown("### Top 10 des Fournisseurs les Moins Résilients")
     top_suppliers_worst = (
-        df.groupby(['supplier_id', 'supplier_country'], as_index=False)['Resilience_Index']
+        df.groupby(['supplier_id', 'supplier_country'], as_index=False, observed=True)['Resilience_Index']
         .mean()
         .sort_values(by='Resilience_Index', ascending=True)
         .head(10)
@@ -175,7 +189,7 @@ def show_tab3(df):
     ]
 
     # Calcul de la matrice
-    corr_matrix = df[corr_cols].corr().round(2)
+    corr_matrix = load_statistic('supply_chain_cleaned', COLUMNS, 'corr', columns=corr_cols).round(2)
 
     # Plotly Heatmap stylée
     fig = go.Figure(
@@ -199,7 +213,7 @@ def show_tab3(df):
         margin=dict(l=40, r=40, t=50, b=40)
     )
 
-    st.plotly_chart(apply_responsive(fig), use_container_width=True)
+    plotly_chart(apply_responsive(fig), use_container_width=True)
 
 def show():
     # Charger l'icône et encoder en base64
@@ -237,7 +251,7 @@ def show():
     """)
 
     # Charger les données nettoyées
-    df = load_csv("../data/cleaned/supply_chain_cleaned.csv")
+    df = load_dataset("supply_chain_cleaned", COLUMNS)
 
     # Aperçu dans un expander
     with st.expander("Voir un aperçu du dataset (1000 lignes)"):
@@ -253,16 +267,12 @@ def show():
     col4.metric("Risk Score (moy)", f"{df['Risk_Score'].mean():.3f}")
     col5.metric("Résilience (moy)", f"{df['Resilience_Index'].mean():.3f}")
 
-    tab1, tab2, tab3 = st.tabs(["Vue Globale", "Analyses Temporelle", "Heatmap"])
-
-    with tab1:
-        show_tab1(df)
-
-    with tab2:
-        show_tab2(df)
-
-    with tab3:
-        show_tab3(df)
+    # Onglets paresseux : seul l'onglet ouvert est calculé (voir utils.show_tabs)
+    show_tabs({
+        "Vue Globale": lambda: show_tab1(df),
+        "Analyses Temporelle": lambda: show_tab2(df),
+        "Heatmap": lambda: show_tab3(df)
+    }, key="supply_chain_tabs")
 
     st.markdown("---")
 
@@ -1,38 +1,202 @@
 import streamlit as st
 import plotly.express as px
-import pandas as pd
-from utils import load_csv, apply_responsive, get_base64
+from utils import load_dataset, load_filtered, load_preview, dataset_fingerprint, apply_responsive, get_base64, plotly_chart, show_tabs
 from sidebar import show_sidebar
 
 show_sidebar()
 
 icon_base64 = get_base64("assets/traffic_accident_icon.png")
 
+# Contrat de projection : la page ne lit que le cube d'agrégats écrit par le notebook
+CUBE_COLUMNS = {
+    "Risk_Category": "category",
+    "Main_Weather": "category",
+    "HourOfDay": "int8",
+    "DayOfWeek": "int8",
+    "Month": "int8",
+    "Count": "int64",
+    "Risk_Score_sum": "float64",
+    "Duration_sum": "float64"
+}
+
+# Schéma de l'aperçu : horodatage natif et parties de date entières (aucun parsing au rendu)
+PREVIEW_COLUMNS = {
+    "ID": "string",
+    "Start_Time": "datetime64[ns]",
+    "Start_Lat": "float32",
+    "Start_Lng": "float32",
+    "Severity": "int8",
+    "Duration(min)": "float32",
+    "Risk_Score": "float32",
+    "Resilience_Index": "float32",
+    "Risk_Category": "category",
+    "Main_Weather": "category",
+    "Year": "int16",
+    "Month": "int8",
+    "DayOfWeek": "int8",
+    "HourOfDay": "int8"
+}
+
+def aggregate(cube, keys):
+    """Ré-agrège le cube sur `keys` : effectif et Risk_Score moyen (pondéré par l'effectif)."""
+    grouped = cube.groupby(keys, observed=True)[['Count', 'Risk_Score_sum', 'Duration_sum']].sum()
+    grouped['Risk_Score'] = grouped['Risk_Score_sum'] / grouped['Count']
+    return grouped
+
+# `_cube` (préfixé par _) n'est pas haché par Streamlit : la clé de cache est l'empreinte du fichier
 @st.cache_data
-def prepare_data(df):
-    hour_counts = df['HourOfDay'].value_counts().sort_index().reset_index()
-    hour_counts.columns = ['HourOfDay', 'Count']
+def prepare_data(_cube, fingerprint):
+    hour_counts = aggregate(_cube, 'HourOfDay')['Count'].reset_index()
+    day_counts = aggregate(_cube, 'DayOfWeek')['Count'].reset_index()
+    month_counts = aggregate(_cube, 'Month')['Count'].reset_index()
 
-    day_counts = df['DayOfWeek'].value_counts().sort_index().reset_index()
-    day_counts.columns = ['DayOfWeek', 'Count']
+    hour_scores = aggregate(_cube, 'HourOfDay')['Risk_Score'].reset_index()
+    day_scores = aggregate(_cube, 'DayOfWeek')['Risk_Score'].reset_index()
+    month_scores = aggregate(_cube, 'Month')['Risk_Score'].reset_index()
 
-    month_counts = df['Month'].value_counts().sort_index().reset_index()
-    month_counts.columns = ['Month', 'Count']
+    risk_summary = aggregate(_cube, 'Risk_Category')['Count'].sort_values(ascending=False).reset_index()
+    risk_summary['Proportion (%)'] = (risk_summary['Count'] / _cube['Count'].sum() * 100).round(2)
 
-    hour_scores = df.groupby('HourOfDay')['Risk_Score'].mean().reset_index()
-    day_scores = df.groupby('DayOfWeek')['Risk_Score'].mean().reset_index()
-    month_scores = df.groupby('Month')['Risk_Score'].mean().reset_index()
-
-    risk_summary = df['Risk_Category'].value_counts().reset_index()
-    risk_summary.columns = ['Risk_Category', 'Count']
-    risk_summary['Proportion (%)'] = (risk_summary['Count'] / df.shape[0] * 100).round(2)
-
-    heatmap_data = df[df['Risk_Category'].isin(['Peak Hour Congestion', 'Weather Disruption'])]
+    heatmap_data = _cube[_cube['Risk_Category'].isin(['Peak Hour Congestion', 'Weather Disruption'])]
     heatmap_data = heatmap_data[heatmap_data['Main_Weather'].isin(['Rain', 'Snow', 'Fog', 'Thunderstorm'])]
-    heatmap = heatmap_data.groupby(['Main_Weather', 'HourOfDay'])['Risk_Score'].mean().reset_index()
+    heatmap = aggregate(heatmap_data, ['Main_Weather', 'HourOfDay'])['Risk_Score'].reset_index()
 
     return hour_counts, day_counts, month_counts, hour_scores, day_scores, month_scores, risk_summary, heatmap
 
+@st.cache_data
+def compute_kpis(_cube, fingerprint):
+    # Une catégorie absente du cube compte pour 0 accident (durée moyenne indéfinie : NaN)
+    by_category = aggregate(_cube, 'Risk_Category').reindex(list(RISK_CATEGORY_COLORS), fill_value=0)
+    total = int(by_category['Count'].sum())
+    peak_hour_pct = by_category.loc['Peak Hour Congestion', 'Count'] / total * 100 if total else 0.0
+    infra_block = by_category.loc['High Infrastructure Block']
+    infra_block_mean = infra_block['Duration_sum'] / infra_block['Count'] if infra_block['Count'] else float('nan')
+    weather_pct = by_category.loc['Weather Disruption', 'Count'] / total * 100 if total else 0.0
+    return total, peak_hour_pct, infra_block_mean, weather_pct
+
+# Niveaux de détail de la carte : pas de la pyramide de tuiles (pipeline.traffic.TILE_STEPS)
+# et côté (degrés) de la fenêtre lue autour de la zone choisie (None : tout le pays)
+MAP_LEVELS = {
+    "National (tuiles de 1°)": (1.0, None),
+    "Régional (tuiles de 0,25°)": (0.25, 10.0),
+    "Local (tuiles de 0,05°)": (0.05, 2.0)
+}
+MAP_ZOOM = {1.0: 3.2, 0.25: 5, 0.05: 7.5}
+TOP_ZONES = 20
+
+RISK_CATEGORY_COLORS = {
+    "High Infrastructure Block": "#e74c3c",
+    "Weather Disruption": "#3498db",
+    "Peak Hour Congestion": "#f39c12",
+    "Low Impact": "#2ecc71"
+}
+
+# Seules les tuiles d'un pas (et d'une fenêtre) sont lues : les filtres sont appliqués
+# à la lecture du Parquet, trié par pas et latitude, qui saute les groupes de lignes inutiles
+def load_tiles(step, window):
+    filters = [("Step", "==", step)]
+    if window is not None:
+        lat_min, lat_max, lon_min, lon_max = window
+        filters += [("Latitude", ">=", lat_min), ("Latitude", "<=", lat_max),
+                    ("Longitude", ">=", lon_min), ("Longitude", "<=", lon_max)]
+    return load_filtered("usa_accidents_traffic_tiles", filters)
+
+def show_map():
+    st.subheader("Carte des Accidents")
+    try:
+        load_tiles(1.0, None)
+    except FileNotFoundError:
+        # data/cleaned antérieur à la pyramide de tuiles
+        st.warning("Tuiles de la carte introuvables : relancez le pipeline (`python -m pipeline run`).")
+        return
+    level = st.radio("Niveau de détail", list(MAP_LEVELS), horizontal=True)
+    step, size = MAP_LEVELS[level]
+
+    if size is None:
+        window, center = None, {"lat": 38.5, "lon": -96}
+    else:
+        # Zones proposées : tuiles nationales (1°) les plus touchées
+        zones = load_tiles(1.0, None).nlargest(TOP_ZONES, "Count")
+        labels = {
+            f"{row.Latitude:.1f}° N, {-row.Longitude:.1f}° O — {row.Count:,} accidents": (row.Latitude, row.Longitude)
+            for row in zones.itertuples()
+        }
+        lat, lon = labels[st.selectbox("Zone", list(labels))]
+        window, center = (lat - size / 2, lat + size / 2, lon - size / 2, lon + size / 2), {"lat": lat, "lon": lon}
+
+    tiles = load_tiles(step, window)
+    fig_map = px.scatter_map(
+        tiles,
+        lat="Latitude",
+        lon="Longitude",
+        color="Risk_Category",
+        size="Count",
+        size_max=15,
+        zoom=MAP_ZOOM[step],
+        center=center,
+        height=600,
+        map_style="carto-positron",
+        color_discrete_map=RISK_CATEGORY_COLORS,
+        hover_data={"Count": ":,", "Risk_Score": ":.3f", "Latitude": False, "Longitude": False},
+        labels={"Count": "Accidents", "Risk_Score": "Risk_Score moyen", "Risk_Category": "Catégorie dominante"}
+    )
+    fig_map.update_layout(margin={"r":0, "t":0, "l":0, "b":0})
+    plotly_chart(apply_responsive(fig_map), use_container_width=True)
+    st.caption(f"{len(tiles):,} tuiles affichées (effectif, Risk_Score moyen et catégorie dominante par tuile).")
+
+def show_tab1(risk_summary):
+    st.subheader("Répartition des Catégories de Risque")
+    fig_cat = px.bar(
+        risk_summary,
+        x='Count',
+        y='Risk_Category',
+        orientation='h',
+        text='Proportion (%)',
+        color='Risk_Category',
+        color_discrete_sequence=px.colors.qualitative.Set2
+    )
+    plotly_chart(apply_responsive(fig_cat), use_container_width=True)
+
+def show_tab2(hour_counts, hour_scores, day_counts, day_scores, month_counts, month_scores):
+    st.subheader("Analyse par Heure de la Journée")
+    fig_hour_count = px.bar(hour_counts, x='HourOfDay', y='Count')
+    plotly_chart(apply_responsive(fig_hour_count), use_container_width=True)
+
+    fig_hour_score = px.line(hour_scores, x='HourOfDay', y='Risk_Score', markers=True)
+    plotly_chart(apply_responsive(fig_hour_score), use_container_width=True)
+
+    st.markdown("---")
+
+    st.subheader("Analyse par Jour de la Semaine")
+    fig_day_count = px.bar(day_counts, x='DayOfWeek', y='Count')
+    plotly_chart(apply_responsive(fig_day_count), use_container_width=True)
+
+    fig_day_score = px.line(day_scores, x='DayOfWeek', y='Risk_Score', markers=True)
+    plotly_chart(apply_responsive(fig_day_score), use_container_width=True)
+
+    st.markdown("---")
+
+    st.subheader("Analyse par Mois")
+    fig_month_count = px.bar(month_counts, x='Month', y='Count')
+    plotly_chart(apply_responsive(fig_month_count), use_container_width=True)
+
+    fig_month_score = px.line(month_scores, x='Month', y='Risk_Score', markers=True)
+    plotly_chart(apply_responsive(fig_month_score), use_container_width=True)
+
+def show_tab3(heatmap):
+    st.subheader("Heatmap Risk_Score (Météo vs Heure)")
+    heatmap_pivot = heatmap.pivot(index='Main_Weather', columns='HourOfDay', values='Risk_Score')
+    fig_heat = px.imshow(
+        heatmap_pivot.values,
+        labels=dict(x="Heure", y="Météo", color="Risk_Score"),
+        x=heatmap_pivot.columns,
+        y=heatmap_pivot.index,
+        title="Heatmap Risque Moyen (Météo vs Heure)"
+    )
+    plotly_chart(apply_responsive(fig_heat), use_container_width=True)
+
+    st.markdown("---")
+
 def show():
     # Titre + Icône alignés
     st.markdown(
@@ -63,22 +227,19 @@ def show():
     Ces critères pondérés donnent un `Risk_Score` de 0 (nul) à 1 (élevé).
     """)
 
-    # Charger les données
-    df = load_csv("../data/cleaned/usa_accidents_traffic_cleaned.csv")
-    df['Start_Time'] = pd.to_datetime(df['Start_Time']) # dates sont au format datetime
+    # Charger le cube d'agrégats (aucune donnée ligne à ligne n'est chargée)
+    cube = load_dataset("usa_accidents_traffic_cube", CUBE_COLUMNS)
+    cube_fingerprint = dataset_fingerprint("usa_accidents_traffic_cube")
 
     # Aperçu du CSV
     with st.expander("Voir un aperçu du dataset (1000 lignes)"):
-        st.dataframe(df.head(1000))
+        st.dataframe(load_preview("usa_accidents_traffic_cleaned", 1000, PREVIEW_COLUMNS))
 
     # Préparer les agrégats
-    hour_counts, day_counts, month_counts, hour_scores, day_scores, month_scores, risk_summary, heatmap = prepare_data(df)
+    hour_counts, day_counts, month_counts, hour_scores, day_scores, month_scores, risk_summary, heatmap = prepare_data(cube, cube_fingerprint)
 
     # KPI
-    total = df.shape[0]
-    peak_hour_pct = (df[df['Risk_Category'] == 'Peak Hour Congestion'].shape[0] / total) * 100
-    infra_block_mean = df[df['Risk_Category'] == 'High Infrastructure Block']['Duration(min)'].mean()
-    weather_pct = (df[df['Risk_Category'] == 'Weather Disruption'].shape[0] / total) * 100
+    total, peak_hour_pct, infra_block_mean, weather_pct = compute_kpis(cube, cube_fingerprint)
 
     col1, col2, col3, col4 = st.columns(4)
     col1.metric("Heures de pointe", f"{peak_hour_pct:.1f} %")
@@ -86,61 +247,13 @@ def show():
     col3.metric("Perturbations Météo", f"{weather_pct:.1f} %")
     col4.metric("Total Accidents", f"{total:,}")
 
-    # TABS pour structurer la page
-    tab1, tab2, tab3 = st.tabs(["Vue Globale", "Analyses Temporelle", "Heatmap"])
-
-    with tab1:
-        st.subheader("Répartition des Catégories de Risque")
-        fig_cat = px.bar(
-            risk_summary,
-            x='Count',
-            y='Risk_Category',
-            orientation='h',
-            text='Proportion (%)',
-            color='Risk_Category',
-            color_discrete_sequence=px.colors.qualitative.Set2
-        )
-        st.plotly_chart(apply_responsive(fig_cat), use_container_width=True)
-
-    with tab2:
-        st.subheader("Analyse par Heure de la Journée")
-        fig_hour_count = px.bar(hour_counts, x='HourOfDay', y='Count')
-        st.plotly_chart(apply_responsive(fig_hour_count), use_container_width=True)
-
-        fig_hour_score = px.line(hour_scores, x='HourOfDay', y='Risk_Score', markers=True)
-        st.plotly_chart(apply_responsive(fig_hour_score), use_container_width=True)
-
-        st.markdown("---")
-
-        st.subheader("Analyse par Jour de la Semaine")
-        fig_day_count = px.bar(day_counts, x='DayOfWeek', y='Count')
-        st.plotly_chart(apply_responsive(fig_day_count), use_container_width=True)
-
-        fig_day_score = px.line(day_scores, x='DayOfWeek', y='Risk_Score', markers=True)
-        st.plotly_chart(apply_responsive(fig_day_score), use_container_width=True)
-
-        st.markdown("---")
-
-        st.subheader("Analyse par Mois")
-        fig_month_count = px.bar(month_counts, x='Month', y='Count')
-        st.plotly_chart(apply_responsive(fig_month_count), use_container_width=True)
-
-        fig_month_score = px.line(month_scores, x='Month', y='Risk_Score', markers=True)
-        st.plotly_chart(apply_responsive(fig_month_score), use_container_width=True)
-
-    with tab3:
-        st.subheader("Heatmap Risk_Score (Météo vs Heure)")
-        heatmap_pivot = heatmap.pivot(index='Main_Weather', columns='HourOfDay', values='Risk_Score')
-        fig_heat = px.imshow(
-            heatmap_pivot.values,
-            labels=dict(x="Heure", y="Météo", color="Risk_Score"),
-            x=heatmap_pivot.columns,
-            y=heatmap_pivot.index,
-            title="Heatmap Risque Moyen (Météo vs Heure)"
-        )
-        st.plotly_chart(apply_responsive(fig_heat), use_container_width=True)
-
-        st.markdown("---")
+    # Onglets paresseux : seul l'onglet ouvert est calculé (voir utils.show_tabs)
+    show_tabs({
+        "Vue Globale": lambda: show_tab1(risk_summary),
+        "Analyses Temporelle": lambda: show_tab2(hour_counts, hour_scores, day_counts, day_scores, month_counts, month_scores),
+        "Heatmap": lambda: show_tab3(heatmap),
+        "Carte": show_map
+    }, key="traffic_tabs")
 
     # Résumé
     st.info(f"""
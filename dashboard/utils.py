@@ -1,11 +1,226 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
+import plotly.express as px
+import plotly.graph_objects as go
+import plotly.io as pio
 import base64
+import json
+import os
+import time
+import pyarrow.dataset as ds
+from pathlib import Path
+from streamlit.logger import get_logger
+
+# Copy-on-Write : une copie superficielle partage les colonnes et ne les duplique qu'à la
+# première écriture. Les pages reçoivent ainsi une vue du DataFrame partagé (voir `load_dataset`)
+# qu'elles peuvent enrichir sans modifier celui des autres sessions. Actif par défaut
+# depuis pandas 3, où l'option est dépréciée
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+
+# Dossier des jeux de données nettoyés (relatif à /dashboard, d'où Streamlit est lancé)
+CLEANED_DIR = Path("../data/cleaned")
+
+# Couches géographiques GeoParquet (shapefiles convertis par le pipeline)
+GEO_DIR = Path("../data/geo")
+
+# Budget d'une figure envoyée au navigateur (Mo de JSON), voir `plotly_chart`
+FIGURE_BUDGET_MB = float(os.environ.get("DASHBOARD_FIGURE_BUDGET_MB", 5))
+
+# Entrées gardées en mémoire par les caches partagés (`st.cache_resource`) : chaque réécriture
+# d'un fichier crée une nouvelle entrée, les plus anciennes (versions périmées) sont libérées
+DATASET_CACHE_ENTRIES = 16
+GEO_LAYER_CACHE_ENTRIES = 8
+
+logger = get_logger(__name__)
+
+def file_fingerprint(path):
+    """Empreinte légère d'un fichier (chemin, date de modification, taille) : O(1), sans lire son contenu.
+
+    Pour un dataset partitionné (dossier de parties Parquet), combine les dates et tailles des parties.
+    """
+    if path.is_dir():
+        stats = [part.stat() for part in sorted(path.glob("*.parquet"))]
+        return str(path.resolve()), max((s.st_mtime_ns for s in stats), default=0), sum(s.st_size for s in stats)
+    stat = path.stat()
+    return str(path.resolve()), stat.st_mtime_ns, stat.st_size
+
+def dataset_fingerprint(name):
+    """Empreinte du fichier effectivement lu pour un dataset nettoyé (Parquet en priorité, sinon CSV).
+
+    Sert de clé de cache aux fonctions d'agrégation des pages : Streamlit compare ce
+    petit tuple au lieu de hacher le contenu complet du DataFrame à chaque rerun.
+    """
+    parquet_path = CLEANED_DIR / f"{name}.parquet"
+    if parquet_path.exists():
+        return file_fingerprint(parquet_path)
+    return file_fingerprint(CLEANED_DIR / f"{name}.csv")
+
+def load_dataset(name, columns=None):
+    """Charge un dataset nettoyé et le met en cache.
+
+    Privilégie la version Parquet (schéma typé : dates, catégories, entiers compacts)
+    écrite par le pipeline, fichier unique ou dossier de parties, et se rabat
+    sur le CSV si elle est absente.
+
+    `columns` est le contrat de projection déclaré par la page ({colonne: dtype}) :
+    seules ces colonnes sont lues, avec ces types, et chaque projection a sa propre
+    entrée de cache. Le cache est invalidé dès que le fichier est réécrit.
+
+    Le DataFrame est chargé une seule fois par processus et partagé entre les sessions
+    (`st.cache_resource`, pas de copie désérialisée par session). Chaque appel en renvoie
+    une copie superficielle : avec Copy-on-Write, ajouter ou modifier une colonne ne
+    touche que cette vue, jamais le DataFrame partagé.
+    """
+    return _read_dataset(name, columns, dataset_fingerprint(name)).copy(deep=False)
+
+@st.cache_resource(max_entries=DATASET_CACHE_ENTRIES)
+def _read_dataset(name, columns, fingerprint):
+    parquet_path = CLEANED_DIR / f"{name}.parquet"
+    csv_path = CLEANED_DIR / f"{name}.csv"
+
+    if columns is None:
+        if parquet_path.exists():
+            return pd.read_parquet(parquet_path)
+        return pd.read_csv(csv_path)
+
+    if parquet_path.exists():
+        return pd.read_parquet(parquet_path, columns=list(columns)).astype(columns)
+    return read_typed_csv(csv_path, columns)
+
+def read_typed_csv(csv_path, columns, nrows=None):
+    """Lit un CSV nettoyé selon un contrat {colonne: dtype} (repli quand le Parquet est absent)."""
+    # Les dates ne passent pas par `dtype` : elles sont parsées à la lecture (horodatages ISO
+    # écrits par les notebooks), une seule fois puisque le résultat est mis en cache
+    date_cols = [col for col, dtype in columns.items() if dtype.startswith("datetime")]
+    df = pd.read_csv(
+        csv_path,
+        usecols=list(columns),
+        dtype={col: dtype for col, dtype in columns.items() if col not in date_cols},
+        parse_dates=date_cols,
+        date_format="ISO8601",
+        nrows=nrows
+    )
+    return df[list(columns)]
+
+def load_preview(name, nrows=1000, columns=None):
+    """Lit uniquement les premières lignes d'un dataset nettoyé (aperçu), sans le charger en entier.
+
+    Avec `columns` ({colonne: dtype}), l'aperçu a le même schéma typé que le Parquet,
+    y compris quand il est lu depuis le CSV.
+    """
+    return _read_preview(name, nrows, columns, dataset_fingerprint(name))
+
+@st.cache_data
+def _read_preview(name, nrows, columns, fingerprint):
+    parquet_path = CLEANED_DIR / f"{name}.parquet"
+    csv_path = CLEANED_DIR / f"{name}.csv"
+    if parquet_path.exists():
+        # Fichier unique ou dossier de parties : seules les premières lignes sont décodées
+        head = ds.dataset(parquet_path).head(nrows, columns=list(columns) if columns else None).to_pandas()
+        return head.astype(columns) if columns else head
+    if columns:
+        return read_typed_csv(csv_path, columns, nrows=nrows)
+    return pd.read_csv(csv_path, nrows=nrows)
+
+# Comparaisons acceptées par `load_filtered` (même syntaxe que les filtres pyarrow)
+FILTER_OPERATORS = {
+    "==": lambda s, v: s == v,
+    "!=": lambda s, v: s != v,
+    "<": lambda s, v: s < v,
+    "<=": lambda s, v: s <= v,
+    ">": lambda s, v: s > v,
+    ">=": lambda s, v: s >= v
+}
+
+def load_filtered(name, filters):
+    """Lit les seules lignes d'un dataset nettoyé qui vérifient `filters` ([(colonne, op, valeur)], tous vrais).
+
+    Sur le Parquet, les filtres sont appliqués à la lecture (groupes de lignes inutiles sautés) ;
+    sur le CSV de repli, après lecture. Chaque filtre a sa propre entrée de cache, invalidée
+    dès que le fichier est réécrit. Lève FileNotFoundError si aucun des deux fichiers n'existe.
+    """
+    return _read_filtered(name, tuple(filters), dataset_fingerprint(name))
+
+@st.cache_data
+def _read_filtered(name, filters, fingerprint):
+    parquet_path = CLEANED_DIR / f"{name}.parquet"
+    if parquet_path.exists():
+        return pd.read_parquet(parquet_path, filters=list(filters))
+    df = pd.read_csv(CLEANED_DIR / f"{name}.csv")
+    mask = np.ones(len(df), dtype=bool)
+    for column, op, value in filters:
+        mask &= FILTER_OPERATORS[op](df[column], value).to_numpy()
+    return df[mask].reset_index(drop=True)
+
+def load_summary(name):
+    """Charge le résumé (KPI + effectifs triés) écrit par le notebook à côté du dataset nettoyé."""
+    summary_path = CLEANED_DIR / f"{name}_summary.json"
+    return _read_summary(summary_path, file_fingerprint(summary_path))
 
 @st.cache_data
-def load_csv(filepath):
-    """Charge un CSV et le met en cache pour améliorer les performances."""
-    return pd.read_csv(filepath)
+def _read_summary(summary_path, fingerprint):
+    with open(summary_path, encoding="utf-8") as f:
+        return json.load(f)
+
+# Statistiques coûteuses des pages, calculées sur un dataset nettoyé (voir `load_statistic`)
+STATISTICS = {
+    "corr": lambda df, columns: df[list(columns)].corr(),
+    "quantile": lambda df, column, q: df[column].quantile(list(q)),
+    "crosstab": lambda df, index, columns: pd.crosstab(df[index], df[columns]),
+    "pivot_mean": lambda df, index, columns, values: df.pivot_table(
+        index=index, columns=columns, values=values, aggfunc="mean", observed=True
+    )
+}
+
+def load_statistic(name, columns, statistic, /, **params):
+    """Calcule une statistique de STATISTICS (ex. "corr", columns=[...]) sur un dataset nettoyé.
+
+    Le résultat est indexé par (version du dataset, statistique, paramètres) et persisté
+    sur disque par Streamlit : il est calculé une seule fois, puis relu par toutes les
+    sessions, y compris après un redémarrage du serveur. Une nouvelle version du fichier
+    (réécrit par le pipeline) invalide l'entrée.
+
+    `columns` est le contrat de projection de la page (positionnel : `columns=` désigne un
+    paramètre de la statistique) ; la statistique porte sur le DataFrame partagé chargé par
+    `load_dataset(name, columns)`, jamais sur une vue modifiée par la page.
+    """
+    return _compute_statistic(name, columns, statistic, params, dataset_fingerprint(name))
+
+@st.cache_data(persist="disk")
+def _compute_statistic(name, columns, statistic, params, fingerprint):
+    return STATISTICS[statistic](_read_dataset(name, columns, fingerprint), **params)
+
+def load_geo_layer(dataset, layer, bbox=None):
+    """Charge une couche GeoParquet (ex. "Shipping_Accidents", "ports") et la met en cache.
+
+    La couche est déjà dans son CRS cible ; `bbox` (minx, miny, maxx, maxy, dans ce CRS)
+    ne lit que les géométries de l'emprise. Le cache est invalidé dès que la couche est réécrite.
+    """
+    path = GEO_DIR / dataset / f"{layer}.parquet"
+    # Partagée entre les sessions comme les datasets nettoyés (voir `load_dataset`)
+    return _read_geo_layer(path, bbox, file_fingerprint(path)).copy(deep=False)
+
+@st.cache_resource(max_entries=GEO_LAYER_CACHE_ENTRIES)
+def _read_geo_layer(path, bbox, fingerprint):
+    import geopandas as gpd
+
+    return gpd.read_parquet(path, bbox=bbox)
+
+def show_tabs(tabs, key):
+    """Affiche des onglets à rendu paresseux : seul le contenu de l'onglet ouvert est calculé.
+
+    `tabs` : {libellé: fonction sans argument qui dessine l'onglet}. Changer d'onglet
+    relance la page, qui ne calcule que le nouvel onglet ; chaque onglet est un fragment,
+    donc un widget qu'il contient ne relance que cet onglet. `key` (unique dans
+    l'application) conserve l'onglet ouvert entre les reruns.
+    """
+    containers = st.tabs(list(tabs), key=key, on_change="rerun")
+    for container, (label, render) in zip(containers, tabs.items()):
+        if container.open:
+            with container:
+                st.fragment(render, key=f"{key}:{label}")()
 
 def apply_responsive(fig):
     fig.update_layout(
@@ -16,7 +231,183 @@ def apply_responsive(fig):
     )
     return fig
 
+def histogram(df, x, nbins=50, color=None, **kwargs):
+    """Histogramme agrégé côté serveur : équivalent de `px.histogram(df, x, nbins, color, ...)`.
+
+    Les effectifs sont calculés ici (intervalles égaux, comme `np.histogram`) et tracés en
+    barres : la figure envoyée au navigateur contient un point par intervalle (et par
+    couleur), et non plus une ligne par enregistrement. Une colonne non numérique, ou entière
+    avec moins de `nbins` valeurs possibles, est comptée valeur par valeur.
+    `kwargs` est transmis à `px.bar` (title, labels, category_orders, barmode, log_y, ...).
+    """
+    keys = [x] if color is None else [x, color]
+    data = df[keys].dropna(subset=[x])
+    values = data[x]
+    width = None
+
+    discrete = not pd.api.types.is_numeric_dtype(values) or (
+        pd.api.types.is_integer_dtype(values) and len(values) and int(values.max()) - int(values.min()) < nbins
+    )
+    if not discrete:
+        edges = np.histogram_bin_edges(values.to_numpy(dtype="float64"), bins=nbins)
+        codes = np.clip(np.searchsorted(edges, values.to_numpy(dtype="float64"), side="right") - 1, 0, nbins - 1)
+        data = data.assign(**{x: ((edges[:-1] + edges[1:]) / 2)[codes]})
+        width = edges[1] - edges[0]
+
+    counts = data.groupby(keys, observed=True).size().reset_index(name="count")
+    fig = px.bar(counts, x=x, y="count", color=color, **kwargs)
+    if width is not None:
+        fig.update_traces(width=width)
+        fig.update_layout(bargap=0)
+    return fig
+
+def box(df, x, y, color=None, category_orders=None, color_discrete_sequence=None,
+        labels=None, title=None, max_outliers=100):
+    """Boîtes à moustaches agrégées côté serveur : équivalent de `px.box(df, x, y, ...)`.
+
+    Quartiles (interpolation linéaire, comme Plotly), moustaches à 1,5 × l'écart
+    interquartile et au plus `max_outliers` points aberrants tirés au hasard par boîte :
+    la figure ne dépend plus du nombre de lignes. `color` ne peut valoir que `x`
+    (une couleur par boîte, comme `px.box(..., color=x)`).
+    """
+    data = df[[x, y]].dropna()
+    grouped = data.groupby(x, observed=True)[y]
+    stats = grouped.quantile([0.25, 0.5, 0.75]).unstack()
+    stats.columns = ["q1", "median", "q3"]
+
+    bounds = stats.reindex(data[x]).set_axis(data.index)
+    iqr = bounds["q3"] - bounds["q1"]
+    inside = data[y].between(bounds["q1"] - 1.5 * iqr, bounds["q3"] + 1.5 * iqr)
+    stats["lowerfence"] = data[inside].groupby(x, observed=True)[y].min()
+    stats["upperfence"] = data[inside].groupby(x, observed=True)[y].max()
+    outliers = data[~inside].sample(frac=1, random_state=0).groupby(x, observed=True).head(max_outliers)
+
+    order = (category_orders or {}).get(x)
+    stats = stats.reindex([c for c in order if c in stats.index]) if order else stats
+    colors = color_discrete_sequence or px.colors.qualitative.Plotly
+
+    fig = go.Figure()
+    for i, (category, row) in enumerate(stats.iterrows()):
+        trace_color = colors[i % len(colors)] if color == x else colors[0]
+        points = outliers.loc[outliers[x] == category, y]
+        fig.add_trace(go.Box(
+            x=[category], q1=[row["q1"]], median=[row["median"]], q3=[row["q3"]],
+            lowerfence=[row["lowerfence"]], upperfence=[row["upperfence"]],
+            name=str(category), marker_color=trace_color, showlegend=color == x
+        ))
+        fig.add_trace(go.Scatter(
+            x=[category] * len(points), y=points, mode="markers", name=str(category),
+            marker=dict(color=trace_color, size=4), showlegend=False, hoverinfo="y"
+        ))
+
+    labels = labels or {}
+    fig.update_layout(
+        title=title,
+        xaxis_title=labels.get(x, x),
+        yaxis_title=labels.get(y, y),
+        xaxis=dict(type="category", categoryorder="array", categoryarray=list(stats.index))
+    )
+    return fig
+
+def plotly_chart(fig, budget_mb=None, **kwargs):
+    """`st.plotly_chart` avec un budget de taille : toutes les figures du dashboard passent par ici.
+
+    Mesure la taille du JSON envoyé au navigateur et le temps de rendu côté serveur
+    (journal Streamlit, niveau debug). Au-delà du budget (`FIGURE_BUDGET_MB`, réglable
+    par DASHBOARD_FIGURE_BUDGET_MB), la figure est allégée avant l'envoi et chaque
+    mesure prise est journalisée (niveau warning) : voir `fit_figure`.
+    """
+    budget = (budget_mb or FIGURE_BUDGET_MB) * 1e6
+    start = time.perf_counter()
+    size = figure_size(fig)
+    if size > budget:
+        fig, actions = fit_figure(fig, size, budget)
+        logger.warning("Figure %r : %.2f Mo > budget de %.2f Mo, %s (%.2f Mo envoyés)",
+                       figure_title(fig), size / 1e6, budget / 1e6,
+                       ", ".join(actions) or "aucune réduction possible", figure_size(fig) / 1e6)
+    result = st.plotly_chart(fig, **kwargs)
+    logger.debug("Figure %r : %.2f Mo, rendue en %.0f ms",
+                 figure_title(fig), size / 1e6, (time.perf_counter() - start) * 1000)
+    return result
+
+def figure_size(fig):
+    """Taille (octets) du JSON de la figure, tel que Streamlit le sérialise."""
+    return len(pio.to_json(fig, validate=False))
+
+def figure_title(fig):
+    return fig.layout.title.text or "sans titre"
+
+def fit_figure(fig, size, budget, seed=0):
+    """Allège une figure trop lourde. Retourne (figure, liste des mesures prises).
+
+    - les nuages de points SVG (`scatter`) passent en WebGL (`scattergl`) : le navigateur
+      dessine des dizaines de milliers de points sans bloquer ;
+    - les points de chaque trace (et de chaque frame d'animation) sont échantillonnés au
+      hasard dans la proportion budget / taille, toutes leurs propriétés point par point
+      (coordonnées, couleurs, tailles, textes de survol) avec le même tirage.
+
+    Les histogrammes et boîtes à moustaches sont déjà agrégés côté serveur (`histogram`, `box`).
+    """
+    spec = decode_arrays(fig.to_plotly_json())
+    traces = spec["data"] + [trace for frame in spec.get("frames", []) for trace in frame.get("data", [])]
+    actions = []
+
+    webgl = [trace for trace in traces if trace.get("type") == "scatter" and not trace.get("stackgroup")]
+    for trace in webgl:
+        trace["type"] = "scattergl"
+    if webgl:
+        actions.append(f"{len(webgl)} trace(s) en WebGL")
+
+    fraction = budget / size * 0.9
+    rng = np.random.default_rng(seed)
+    sampled = 0
+    for trace in traces:
+        n = trace_length(trace)
+        keep = int(n * fraction)
+        if n > 1000 and keep < n:
+            sample_points(trace, n, np.sort(rng.choice(n, keep, replace=False)))
+            sampled += n - keep
+    if sampled:
+        actions.append(f"{sampled:,} points écartés (échantillon de {fraction:.0%})")
+
+    return go.Figure(spec, skip_invalid=True), actions
+
+def decode_arrays(value):
+    """Remplace récursivement les tableaux typés de Plotly ({"dtype", "bdata", "shape"}) par des tableaux numpy.
+
+    Depuis Plotly 6, `to_plotly_json` encode les tableaux numpy en base64 : sans ce décodage,
+    les points ne seraient ni comptés ni échantillonnés.
+    """
+    if isinstance(value, dict):
+        if "bdata" in value and "dtype" in value:
+            array = np.frombuffer(base64.b64decode(value["bdata"]), dtype=value["dtype"])
+            shape = value.get("shape")
+            if shape:
+                array = array.reshape([int(dim) for dim in str(shape).split(",")])
+            return array
+        return {key: decode_arrays(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [decode_arrays(item) for item in value]
+    return value
+
+# Propriétés d'une trace qui décrivent un point chacune
+POINT_KEYS = ("x", "y", "lat", "lon", "z", "text", "hovertext", "customdata", "ids", "color", "size", "symbol")
+
+def trace_length(trace):
+    for key in ("x", "y", "lat", "lon"):
+        if trace.get(key) is not None and np.ndim(trace[key]) > 0:
+            return len(trace[key])
+    return 0
+
+def sample_points(props, n, index):
+    """Ne garde que les points `index` dans toutes les propriétés point par point (y compris `marker`)."""
+    for key, value in props.items():
+        if isinstance(value, dict):
+            sample_points(value, n, index)
+        elif key in POINT_KEYS and value is not None and np.ndim(value) > 0 and len(value) == n:
+            props[key] = np.asarray(value, dtype=object if isinstance(value, (list, tuple)) else None)[index]
+
 def get_base64(file):
     with open(file, "rb") as f:
         data = f.read()
-    return base64.b64encode(data).decode()
\ No newline at end of file
+    return base64.b64encode(data).decode()
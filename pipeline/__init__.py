@@ -0,0 +1 @@
+"""Étapes du pipeline de données exécutables hors notebook (téléchargement, nettoyage par dataset, agrégats)."""
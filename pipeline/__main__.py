@@ -0,0 +1,58 @@
+"""Ligne de commande du pipeline (depuis la racine du projet).
+
+    python -m pipeline clean traffic          # nettoie un dataset (archive déjà présente)
+    python -m pipeline clean all
+    python -m pipeline run                    # graphe complet, incrémental
+    python -m pipeline run --force clean:shipping --capacity 8
+
+`run` télécharge depuis Kaggle (KAGGLE_USERNAME / KAGGLE_KEY) ou depuis le miroir
+local désigné par DATASETS_MIRROR_DIR.
+"""
+import argparse
+import os
+import sys
+
+from pipeline.dag import STATE_NAME, run_dag
+from pipeline.datasets import BASE_DIR, CLEANERS, build_nodes, clean_dataset
+from pipeline.scheduler import print_report, timed_call
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m pipeline", description="Pipeline de données du dashboard.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    clean = commands.add_parser("clean", help="nettoie un ou plusieurs datasets, sans graphique")
+    clean.add_argument("names", nargs="+", choices=[*CLEANERS, "all"], metavar="NAME",
+                       help=f"{', '.join(CLEANERS)} ou all")
+
+    run = commands.add_parser("run", help="téléchargement, extraction et nettoyage des étapes périmées")
+    run.add_argument("--force", nargs="*", default=[], metavar="NODE", help="nœuds à relancer (ex. clean:traffic)")
+    run.add_argument("--capacity", type=float, default=8, help="budget mémoire en Go (défaut : 8)")
+    run.add_argument("--mirror", default=os.environ.get("DATASETS_MIRROR_DIR"), help="miroir local des archives")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "clean":
+        names = list(CLEANERS) if "all" in args.names else args.names
+        results = []
+        for name in names:
+            print(f"▶️  clean:{name}")
+            seconds, error = timed_call(clean_dataset, (name, BASE_DIR), {})
+            if error:
+                print(f"❌ clean:{name} en échec :\n{error}")
+            results.append({"name": f"clean:{name}", "weight": CLEANERS[name]["weight"], "seconds": seconds,
+                            "status": "échec" if error else "exécuté", "error": error})
+        print_report(results, sum(r["seconds"] for r in results))
+    else:
+        results = run_dag(
+            build_nodes(BASE_DIR, args.mirror),
+            BASE_DIR / "data" / STATE_NAME,
+            capacity=args.capacity,
+            force=args.force
+        )
+
+    return 1 if any(r["error"] for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+"""Nettoyage du dataset Airline Delay Cause (retards des vols aux USA, par mois).
+
+Étapes partagées avec `notebooks/EDA_Airline_Delay_Cause.ipynb` : le notebook les
+appelle au fil de l'exploration, `clean_airline` les enchaîne sans graphique.
+"""
+import json
+from pathlib import Path
+
+import pandas as pd
+
+from pipeline.archives import open_source
+
+CSV_MEMBER = "Airline_Delay_Cause.csv"
+
+DELAY_COUNT_COLUMNS = ['carrier_ct', 'weather_ct', 'nas_ct', 'security_ct', 'late_aircraft_ct']
+DELAY_MINUTES_COLUMNS = ['carrier_delay', 'weather_delay', 'nas_delay', 'security_delay', 'late_aircraft_delay']
+
+# Schéma typé pour la version colonnaire (années/mois compacts, libellés en catégories)
+EXPORT_DTYPES = {
+    'year': 'int16',
+    'month': 'int8',
+    'carrier': 'category',
+    'carrier_name': 'category',
+    'airport': 'category',
+    'airport_name': 'category'
+}
+
+
+def prepare(df):
+    """Colonne `date` (AAAA-MM), lignes sans vols supprimées, `arr_del15` manquant à 0."""
+    df = df.copy()
+    df['date'] = df['year'].astype(str) + '-' + df['month'].astype(str).str.zfill(2)
+    df = df.dropna(subset=['arr_flights'])
+    df['arr_del15'] = df['arr_del15'].fillna(0)
+    return df
+
+
+def add_scores(df):
+    """Ajoute risk_score, mttr, mttr_norm, delay_rate et resilience_score."""
+    df = df.copy()
+    df['risk_score'] = (df['arr_del15'] + df['arr_cancelled'] + df['arr_diverted']) / df['arr_flights']
+    df['mttr'] = df[DELAY_MINUTES_COLUMNS].sum(axis=1) / df[DELAY_COUNT_COLUMNS].sum(axis=1)
+    df['mttr_norm'] = (df['mttr'] - df['mttr'].min()) / (df['mttr'].max() - df['mttr'].min())
+    df['delay_rate'] = df['arr_del15'] / df['arr_flights']
+    df['resilience_score'] = 1 - (df['mttr_norm'] + df['delay_rate'])
+    return df
+
+
+def yearly_delays(df):
+    """Séries annuelles de l'onglet temporel, en une agrégation groupée chacune.
+
+    - causes : minutes moyennes de retard par vol retardé, par an et par cause
+      (format long `year`, `cause`, `minutes`, lignes avec `arr_del15` > 0) ;
+    - taux : `arr_del15` et `arr_flights` sommés par an, `delay_rate` en %.
+    """
+    delayed = df[df['arr_del15'] > 0]
+    per_delayed_flight = delayed[DELAY_MINUTES_COLUMNS].div(delayed['arr_del15'], axis=0)
+    causes = (
+        per_delayed_flight.groupby(delayed['year']).mean().round(2)
+        .rename_axis(columns='cause')
+        .stack(future_stack=True)
+        .rename('minutes')
+        .reset_index()
+    )
+    causes['cause'] = causes['cause'].astype('category')
+
+    rates = df.groupby('year')[['arr_del15', 'arr_flights']].sum().reset_index()
+    rates['delay_rate'] = (rates['arr_del15'] / rates['arr_flights'] * 100).round(2)
+    return causes, rates
+
+
+def export(df, cleaned_dir):
+    """Écrit le CSV, le Parquet typé, les séries annuelles et le résumé JSON de la page d'accueil. Retourne le résumé."""
+    cleaned_dir = Path(cleaned_dir)
+    df_export = df.astype(EXPORT_DTYPES)
+    df_export.to_csv(cleaned_dir / "airline_delay_cause_cleaned.csv", index=False)
+    df_export.to_parquet(cleaned_dir / "airline_delay_cause_cleaned.parquet", index=False)
+
+    # Séries annuelles précalculées : l'onglet temporel ne ré-agrège plus le dataset complet
+    causes, rates = yearly_delays(df_export)
+    causes.to_csv(cleaned_dir / "airline_delay_cause_yearly.csv", index=False)
+    causes.to_parquet(cleaned_dir / "airline_delay_cause_yearly.parquet", index=False)
+    rates.to_csv(cleaned_dir / "airline_delay_rate_yearly.csv", index=False)
+    rates.to_parquet(cleaned_dir / "airline_delay_rate_yearly.parquet", index=False)
+
+    # Total des retards + nombre par cause, triés
+    delay_counts = df_export[DELAY_COUNT_COLUMNS].sum()
+    summary = {
+        "kpi": int(df_export['arr_del15'].sum()),
+        "counts": {k: int(v) for k, v in delay_counts.sort_values(ascending=False).items()}
+    }
+    with open(cleaned_dir / "airline_delay_cause_cleaned_summary.json", "w", encoding="utf-8") as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+    return summary
+
+
+def clean_airline(raw_path, cleaned_dir, member=CSV_MEMBER):
+    """Chaîne complète : lecture (dans l'archive si `member`), nettoyage, scores, export."""
+    with open_source(raw_path, member) as f:
+        df = pd.read_csv(f)
+    return export(add_scores(prepare(df)), cleaned_dir)
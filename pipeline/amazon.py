@@ -0,0 +1,117 @@
+"""Nettoyage du dataset Amazon Delivery (livraisons du dernier kilomètre).
+
+Étapes partagées avec `notebooks/EDA_Amazon_Delivery_Dataset.ipynb` : le notebook les
+appelle au fil de l'exploration, `clean_amazon` les enchaîne sans graphique.
+"""
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from pipeline.archives import open_source
+from pipeline.dates import hour_of, period_of, weekday_of
+
+CSV_MEMBER = "amazon_delivery.csv"
+
+# Livraison "à risque" au-delà de ce délai (minutes)
+RISK_THRESHOLD_MIN = 120
+
+# Ordre métier des niveaux de trafic
+TRAFFIC_ORDER = ['Low', 'Medium', 'High', 'Jam']
+
+# Schéma typé pour la version colonnaire
+# (heures conservées en texte HH:MM:SS comme dans le CSV, libellés en catégories)
+EXPORT_DTYPES = {
+    'Order_Time': 'string',
+    'Pickup_Time': 'string',
+    'Weather': 'category',
+    'Vehicle': 'category',
+    'Area': 'category',
+    'Category': 'category',
+    'delivery_risk': 'int8',
+    'Order_Hour': 'Int8'
+}
+
+
+def parse_dates(df):
+    """Order_Date en datetime, Order_Time / Pickup_Time en heures (datetime.time)."""
+    df = df.copy()
+    df['Order_Date'] = pd.to_datetime(df['Order_Date'], format='%Y-%m-%d', errors='coerce')
+    df['Order_Time'] = pd.to_datetime(df['Order_Time'], format='%H:%M:%S', errors='coerce').dt.time
+    df['Pickup_Time'] = pd.to_datetime(df['Pickup_Time'], format='%H:%M:%S', errors='coerce').dt.time
+    return df
+
+
+def fill_missing(df):
+    """Agent_Rating manquant : moyenne ; Weather manquant : modalité la plus fréquente."""
+    df = df.copy()
+    df['Agent_Rating'] = df['Agent_Rating'].fillna(df['Agent_Rating'].mean())
+    df['Weather'] = df['Weather'].fillna(df['Weather'].mode()[0])
+    return df
+
+
+def add_delivery_risk(df, threshold=RISK_THRESHOLD_MIN):
+    """delivery_risk = 1 si Delivery_Time dépasse `threshold` minutes."""
+    df = df.copy()
+    df['delivery_risk'] = (df['Delivery_Time'] > threshold).astype(int)
+    return df
+
+
+def clean_traffic_levels(df):
+    """Traffic nettoyé (espaces, 'NaN' texte), lignes sans trafic retirées, catégorie ordonnée."""
+    df = df.copy()
+    df['Traffic'] = df['Traffic'].str.strip().replace(['NaN', 'nan', ''], np.nan)
+    df_clean = df.dropna(subset=['Traffic']).copy()
+    df_clean['Traffic'] = pd.Categorical(df_clean['Traffic'], categories=TRAFFIC_ORDER, ordered=True)
+    return df_clean
+
+
+def weather_traffic_risk(df_clean):
+    """Taux de livraisons à risque par Weather (lignes) x Traffic (colonnes, ordre métier)."""
+    cross = df_clean.pivot_table(index='Weather', columns='Traffic', values='delivery_risk', aggfunc='mean')
+    return cross[TRAFFIC_ORDER]
+
+
+def add_scores(df_clean, cross, area_risk_score):
+    """Ajoute les scores de risque/résilience Weather x Traffic et par zone (Area)."""
+    df_clean = df_clean.copy()
+    # Recherche vectorisée dans la matrice (combinaison absente : NaN)
+    pairs = pd.MultiIndex.from_arrays([df_clean['Weather'], df_clean['Traffic'].astype(object)])
+    risk = cross.stack(future_stack=True).reindex(pairs)
+    df_clean['weather_traffic_risk_score'] = risk.to_numpy(dtype=float)
+    df_clean['weather_traffic_resilience_score'] = 1 - df_clean['weather_traffic_risk_score']
+
+    df_clean['area_risk_score'] = df_clean['Area'].map(area_risk_score)
+    df_clean['area_resilience_score'] = df_clean['Area'].map(1 - area_risk_score)
+    return df_clean
+
+
+def add_calendar(df):
+    """Colonnes calendaires de la commande : Order_Hour, Order_Weekday, Order_Period (voir pipeline.dates)."""
+    df = df.copy()
+    df['Order_Hour'] = hour_of(df['Order_Time'])
+    df['Order_Weekday'] = weekday_of(df['Order_Date'])
+    df['Order_Period'] = period_of(df['Order_Hour'])
+    return df
+
+
+def export(df_clean, cleaned_dir):
+    """Écrit le CSV et le Parquet typé du dataset enrichi."""
+    cleaned_dir = Path(cleaned_dir)
+    df_export = df_clean.astype(EXPORT_DTYPES)
+    df_export.to_csv(cleaned_dir / "amazon_delivery_cleaned.csv", index=False)
+    df_export.to_parquet(cleaned_dir / "amazon_delivery_cleaned.parquet", index=False)
+    return df_export
+
+
+def clean_amazon(raw_path, cleaned_dir, member=CSV_MEMBER):
+    """Chaîne complète : lecture (dans l'archive si `member`), nettoyage, scores, export."""
+    with open_source(raw_path, member) as f:
+        df = pd.read_csv(f)
+    df = add_delivery_risk(fill_missing(parse_dates(df)))
+
+    # Le score par zone est calculé sur toutes les livraisons, la matrice sur celles dont le trafic est connu
+    area_risk_score = df.groupby('Area')['delivery_risk'].mean().sort_values(ascending=False)
+    df_clean = clean_traffic_levels(df)
+    cross = weather_traffic_risk(df_clean)
+    return export(add_calendar(add_scores(df_clean, cross, area_risk_score)), cleaned_dir)
@@ -0,0 +1,73 @@
+"""Lecture des archives ZIP de data/raw sans extraction complète.
+
+Les CSV sont lus en flux directement dans l'archive (`open_member`) : plus besoin
+d'écrire une copie décompressée de plusieurs Go dans data/extracted avant le
+nettoyage. Seuls les fichiers qui doivent exister sur disque (jeux de fichiers
+d'un shapefile) sont extraits, et uniquement ceux demandés (`extract_members`).
+"""
+import shutil
+import zipfile
+from contextlib import contextmanager
+from pathlib import Path, PurePosixPath
+
+
+def find_member(zf, name):
+    """Nom complet du membre `name` dans l'archive (cherché aussi dans les sous-dossiers)."""
+    if name in zf.NameToInfo:
+        return name
+    matches = [m for m in zf.namelist() if PurePosixPath(m).name == name]
+    if len(matches) != 1:
+        raise FileNotFoundError(f"{name} introuvable (ou ambigu) dans {zf.filename}")
+    return matches[0]
+
+
+@contextmanager
+def open_member(zip_path, name):
+    """Ouvre en lecture binaire le fichier `name` de l'archive, décompressé à la volée.
+
+    Utilisable directement avec pandas :
+
+        with open_member("../data/raw/airline-delay-cause.zip", "Airline_Delay_Cause.csv") as f:
+            df = pd.read_csv(f)
+    """
+    with zipfile.ZipFile(zip_path) as zf, zf.open(find_member(zf, name)) as f:
+        yield f
+
+
+def open_source(path, member=None):
+    """Ouvre un fichier brut : fichier sur disque, ou membre `member` de l'archive `path`."""
+    return open_member(path, member) if member else open(path, "rb")
+
+
+def member_size(zip_path, name):
+    """Taille décompressée du fichier `name` de l'archive (en octets)."""
+    with zipfile.ZipFile(zip_path) as zf:
+        return zf.getinfo(find_member(zf, name)).file_size
+
+
+def extract_members(zip_path, dest_dir, stems=None):
+    """Extrait dans `dest_dir` les fichiers de l'archive dont le nom (sans extension) est dans `stems`.
+
+    `stems=["ports"]` extrait ports.shp, ports.shx, ports.dbf, ports.prj, ... à plat
+    dans `dest_dir` ; `stems=None` extrait toute l'archive (arborescence conservée).
+    L'extraction se fait dans un dossier temporaire remplacé en une fois : une
+    extraction interrompue ne laisse pas de fichiers à moitié écrits.
+    """
+    dest_dir = Path(dest_dir)
+    staging = dest_dir.with_name(f"{dest_dir.name}.tmp")
+    shutil.rmtree(staging, ignore_errors=True)
+    staging.mkdir(parents=True)
+
+    with zipfile.ZipFile(zip_path) as zf:
+        members = [m for m in zf.infolist() if not m.is_dir()]
+        if stems is None:
+            zf.extractall(staging, members)
+        else:
+            members = [m for m in members if PurePosixPath(m.filename).stem in set(stems)]
+            for member in members:
+                with zf.open(member) as src, open(staging / PurePosixPath(member.filename).name, "wb") as dst:
+                    shutil.copyfileobj(src, dst, 1024 * 1024)
+
+    shutil.rmtree(dest_dir, ignore_errors=True)
+    staging.rename(dest_dir)
+    print(f"📦 {len(members)} fichier(s) de {Path(zip_path).name} extrait(s) dans {dest_dir}")
@@ -0,0 +1,133 @@
+"""Pipeline incrémental : graphe téléchargement → extraction → nettoyage.
+
+Chaque étape (nœud) déclare ses entrées, son code et ses sorties. Sa clé est un
+SHA-256 de ses arguments et des empreintes de contenu de ses entrées et de son
+code ; elle est enregistrée dans un fichier d'état avec l'empreinte des sorties
+produites. Au lancement suivant, un nœud n'est relancé que si :
+
+- sa clé a changé (archive rafraîchie, notebook ou module modifié, ...),
+- une de ses sorties a disparu ou a été modifiée depuis,
+- ou il est forcé (`force`).
+
+Un nœud relancé qui produit des sorties identiques ne relance pas ses
+successeurs : leurs clés dépendent du contenu des entrées, pas des dates.
+Les branches indépendantes (un dataset par branche) tournent en parallèle via
+`run_jobs`, sous la même contrainte mémoire que les EDA.
+
+Un nœud est un dict :
+
+    {"name": "clean:traffic", "func": clean_dataset, "args": ("traffic", base_dir),
+     "deps": ["download:USA_Accidents_Traffic"], "inputs": [zip_path],
+     "code": ["pipeline/traffic.py"], "outputs": [cleaned_csv, cleaned_parquet], "weight": 8}
+
+Les nœuds tournent dans des processus fils, sauf `"executor": "thread"` (I/O).
+"""
+import hashlib
+import json
+import os
+from pathlib import Path
+
+from pipeline.download import sha256_of
+from pipeline.scheduler import run_jobs
+
+STATE_NAME = "pipeline_state.json"
+
+
+def load_state(state_path):
+    state_path = Path(state_path)
+    if state_path.exists():
+        with open(state_path, encoding="utf-8") as f:
+            state = json.load(f)
+    else:
+        state = {}
+    state.setdefault("nodes", {})
+    state.setdefault("hashes", {})
+    return state
+
+
+def save_state(state_path, state):
+    state_path = Path(state_path)
+    tmp_path = state_path.with_suffix(".json.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False, indent=2, sort_keys=True)
+    os.replace(tmp_path, state_path)
+
+
+def file_digest(path, hashes):
+    """SHA-256 d'un fichier, mis en cache par (chemin, taille, mtime) dans `hashes`."""
+    stat = path.stat()
+    cache_key = f"{path.resolve()}|{stat.st_size}|{stat.st_mtime_ns}"
+    if cache_key not in hashes:
+        # Une seule entrée par fichier : on oublie les empreintes de ses anciennes versions
+        prefix = cache_key.rsplit("|", 2)[0] + "|"
+        for stale_key in [k for k in hashes if k.startswith(prefix)]:
+            del hashes[stale_key]
+        hashes[cache_key] = sha256_of(path)
+    return hashes[cache_key]
+
+
+def path_digest(path, hashes):
+    """Empreinte de contenu d'un fichier ou d'un dossier (None s'il n'existe pas)."""
+    path = Path(path)
+    if path.is_file():
+        return file_digest(path, hashes)
+    if not path.is_dir():
+        return None
+    digest = hashlib.sha256()
+    for file in sorted(p for p in path.rglob("*") if p.is_file()):
+        digest.update(f"{file.relative_to(path).as_posix()}:{file_digest(file, hashes)}\n".encode())
+    return digest.hexdigest()
+
+
+def node_key(node, hashes):
+    """Clé d'un nœud : arguments + empreintes de ses entrées et de son code."""
+    description = {
+        "name": node["name"],
+        "args": [str(arg) for arg in node.get("args", ())],
+        "inputs": {str(p): path_digest(p, hashes) for p in node.get("inputs", ())},
+        "code": {str(p): path_digest(p, hashes) for p in node.get("code", ())}
+    }
+    return hashlib.sha256(json.dumps(description, sort_keys=True).encode()).hexdigest()
+
+
+def run_dag(nodes, state_path, capacity, force=(), max_workers=None):
+    """Exécute les nœuds périmés de `nodes`, dans l'ordre des dépendances.
+
+    `force` : noms des nœuds à relancer même s'ils sont à jour. Retourne les
+    résultats de `run_jobs` (statut "à jour" pour les nœuds non relancés).
+    """
+    state = load_state(state_path)
+    force = set(force)
+
+    # `run_jobs` appelle ces deux fonctions depuis sa boucle principale (jamais en parallèle)
+    def is_stale(node):
+        if node["name"] in force:
+            return True
+        record = state["nodes"].get(node["name"])
+        if record is None or record["key"] != node_key(node, state["hashes"]):
+            return True
+        return any(path_digest(p, state["hashes"]) != digest for p, digest in record["outputs"].items())
+
+    def on_success(node):
+        state["nodes"][node["name"]] = {
+            "key": node_key(node, state["hashes"]),
+            "outputs": {str(p): path_digest(p, state["hashes"]) for p in node.get("outputs", ())}
+        }
+        # Enregistré après chaque nœud : une interruption ne fait pas tout relancer
+        save_state(state_path, state)
+
+    jobs = []
+    for node in nodes:
+        jobs.append({
+            "name": node["name"],
+            "func": node["func"],
+            "args": node.get("args", ()),
+            "kwargs": node.get("kwargs", {}),
+            "deps": node.get("deps", ()),
+            "weight": node.get("weight", 1),
+            "executor": node.get("executor", "process"),
+            "is_stale": lambda node=node: is_stale(node),
+            "on_success": lambda node=node: on_success(node)
+        })
+
+    return run_jobs(jobs, capacity=capacity, max_workers=max_workers)
@@ -0,0 +1,223 @@
+"""Registre des datasets et graphe du pipeline download ➜ (extract ➜ convert) ➜ clean.
+
+Utilisé par `data_sources/data_pipeline.ipynb` et par la ligne de commande
+(`python -m pipeline`). Le nettoyage de chaque dataset est une fonction Python
+(`pipeline.<nom>.clean_<nom>`) : pas de noyau Jupyter ni de graphiques exploratoires,
+seul le travail sur les données est refait.
+"""
+import ast
+import importlib
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+PIPELINE_DIR = BASE_DIR / "pipeline"
+
+# Les CSV sont lus directement dans les ZIP de /data/raw/ : seuls les datasets
+# avec "extract_members" sont (partiellement) extraits dans /data/extracted/
+DATASETS = [
+    {
+        "slug": "ryanjt/airline-delay-cause",
+        "zip_name": "airline-delay-cause.zip",
+        "extract_dir": "USA_Airline_Delay_Cause",
+        "expected_file": "Airline_Delay_Cause.csv"
+    },
+    {
+        "slug": "chrico03/railroad-accident-and-incident-data",
+        "zip_name": "railroad-accident-and-incident-data.zip",
+        "extract_dir": "Railroad_Accident_Incident_Data",
+        "expected_file": "Rail_Equipment_Accident_Incident_Data.csv"
+    },
+    {
+        "slug": "natasha0786/supply-chain-dataset",
+        "zip_name": "supply-chain-dataset.zip",
+        "extract_dir": "Supply_chain_dataset",
+        "expected_file": "dynamic_supply_chain_logistics_dataset_with_country.csv"
+    },
+    {
+        "slug": "sobhanmoosavi/us-accidents",
+        "zip_name": "us-accidents.zip",
+        "extract_dir": "USA_Accidents_Traffic",
+        "expected_file": "US_Accidents_March23.csv"
+    },
+    {
+        "slug": "sujalsuthar/amazon-delivery-dataset",
+        "zip_name": "amazon-delivery-dataset.zip",
+        "extract_dir": "Amazon_Delivery_Dataset",
+        "expected_file": "amazon_delivery.csv"
+    },
+    {
+        "slug": "gabrielcabart/maritime-accidents-and-port-data",
+        "zip_name": "maritime-accidents-and-port-data.zip",
+        "extract_dir": "Shipping_Accidents",
+        "expected_file": "Shipping_Accidents.shp",
+        # Shapefiles : seuls ces jeux de fichiers (.shp, .shx, .dbf, .prj, ...) sont extraits
+        "extract_members": ["Shipping_Accidents", "lands", "ports"]
+    }
+]
+
+# Nettoyage par dataset : module `pipeline.<nom>` (fonction `clean_<nom>`), dataset lu,
+# sorties produites dans /data/cleaned/ et poids mémoire estimé (Go ; traffic a le poids
+# de la capacité : il tourne seul). Les modules dont dépend le résultat sont déduits des
+# imports (voir `module_code`).
+# Avec "geo", le nettoyage lit les couches GeoParquet de /data/geo/ (étape convert)
+CLEANERS = {
+    "airline": {
+        "dataset": "USA_Airline_Delay_Cause",
+        "outputs": ["airline_delay_cause_cleaned.csv", "airline_delay_cause_cleaned.parquet",
+                    "airline_delay_cause_yearly.csv", "airline_delay_cause_yearly.parquet",
+                    "airline_delay_rate_yearly.csv", "airline_delay_rate_yearly.parquet",
+                    "airline_delay_cause_cleaned_summary.json"],
+        "weight": 1
+    },
+    "amazon": {
+        "dataset": "Amazon_Delivery_Dataset",
+        "outputs": ["amazon_delivery_cleaned.csv", "amazon_delivery_cleaned.parquet"],
+        "weight": 1
+    },
+    "railroad": {
+        "dataset": "Railroad_Accident_Incident_Data",
+        "outputs": ["railroad_accident_cleaned.csv", "railroad_accident_cleaned.parquet",
+                    "railroad_accident_grid.csv", "railroad_accident_grid.parquet",
+                    "railroad_accident_cleaned_summary.json"],
+        "weight": 2
+    },
+    "traffic": {
+        "dataset": "USA_Accidents_Traffic",
+        "outputs": ["usa_accidents_traffic_cleaned.csv", "usa_accidents_traffic_cleaned.parquet",
+                    "usa_accidents_traffic_cube.csv", "usa_accidents_traffic_cube.parquet",
+                    "usa_accidents_traffic_tiles.csv", "usa_accidents_traffic_tiles.parquet",
+                    "usa_accidents_traffic_cleaned_summary.json"],
+        "weight": 8
+    },
+    "supply_chain": {
+        "dataset": "Supply_chain_dataset",
+        "outputs": ["supply_chain_cleaned.csv", "supply_chain_cleaned.parquet"],
+        "weight": 1
+    },
+    "shipping": {
+        "dataset": "Shipping_Accidents",
+        "outputs": ["shipping_accidents_cleaned.csv", "shipping_accidents_cleaned.parquet",
+                    "shipping_accidents_cleaned_summary.json"],
+        "weight": 3,
+        # Shapefiles convertis en GeoParquet (couches et CRS : pipeline.shipping.GEO_LAYERS)
+        "geo": True,
+        # Index spatial des ports et des terres réutilisé entre les exécutions (data/cache/)
+        "cache": True
+    }
+}
+
+DATASETS_BY_DIR = {ds["extract_dir"]: ds for ds in DATASETS}
+
+
+def module_code(name):
+    """Fichiers de `pipeline/` dont dépend le module `pipeline.<name>` : lui-même et ses imports `pipeline.*`, récursivement."""
+    files, pending = set(), [name]
+    while pending:
+        module = pending.pop()
+        if f"{module}.py" in files:
+            continue
+        files.add(f"{module}.py")
+        tree = ast.parse((PIPELINE_DIR / f"{module}.py").read_text(encoding="utf-8"))
+        for node in ast.walk(tree):
+            if isinstance(node, ast.ImportFrom) and node.module:
+                imported = [node.module]
+            elif isinstance(node, ast.Import):
+                imported = [alias.name for alias in node.names]
+            else:
+                continue
+            pending += [m.split(".")[1] for m in imported if m.startswith("pipeline.")]
+    return sorted(files)
+
+
+def clean_dataset(name, base_dir=BASE_DIR):
+    """Nettoie le dataset `name` (clé de CLEANERS) depuis son archive ou ses fichiers extraits."""
+    base_dir = Path(base_dir)
+    ds = DATASETS_BY_DIR[CLEANERS[name]["dataset"]]
+    cleaned_dir = base_dir / "data" / "cleaned"
+    cleaned_dir.mkdir(parents=True, exist_ok=True)
+    clean = getattr(importlib.import_module(f"pipeline.{name}"), f"clean_{name}")
+    kwargs = {"cache_dir": base_dir / "data" / "cache"} if CLEANERS[name].get("cache") else {}
+
+    if CLEANERS[name].get("geo"):
+        return clean(base_dir / "data" / "geo" / ds["extract_dir"], cleaned_dir, **kwargs)
+    if "extract_members" in ds:
+        return clean(base_dir / "data" / "extracted" / ds["extract_dir"], cleaned_dir, **kwargs)
+    return clean(base_dir / "data" / "raw" / ds["zip_name"], cleaned_dir, member=ds["expected_file"], **kwargs)
+
+
+def build_nodes(base_dir=BASE_DIR, mirror_dir=None):
+    """Nœuds du graphe (voir pipeline.dag) : une branche download ➜ (extract ➜ convert) ➜ clean par dataset."""
+    from pipeline.archives import extract_members
+    from pipeline.download import ensure_archive
+    from pipeline.geo import convert_layers
+
+    base_dir = Path(base_dir)
+    raw_dir = base_dir / "data" / "raw"
+    extracted_dir = base_dir / "data" / "extracted"
+    geo_dir = base_dir / "data" / "geo"
+    cleaned_dir = base_dir / "data" / "cleaned"
+
+    nodes = []
+    for ds in DATASETS:
+        zip_path = raw_dir / ds["zip_name"]
+        nodes.append({
+            "name": f"download:{ds['extract_dir']}",
+            "func": ensure_archive,
+            "args": (ds, raw_dir, mirror_dir),
+            # En mode miroir, une archive rafraîchie dans le miroir rend le nœud périmé
+            "inputs": [Path(mirror_dir) / ds["zip_name"]] if mirror_dir else [],
+            "code": [PIPELINE_DIR / "download.py"],
+            "outputs": [zip_path],
+            # Threads : I/O réseau, et le verrou du manifeste n'est partagé qu'entre threads.
+            # Poids nul : ces nœuds ne comptent pas dans le budget mémoire et chevauchent les nettoyages
+            "executor": "thread",
+            "weight": 0
+        })
+        if "extract_members" in ds:
+            nodes.append({
+                "name": f"extract:{ds['extract_dir']}",
+                "func": extract_members,
+                "args": (zip_path, extracted_dir / ds["extract_dir"], ds["extract_members"]),
+                "deps": [f"download:{ds['extract_dir']}"],
+                "inputs": [zip_path],
+                "code": [PIPELINE_DIR / "archives.py"],
+                "outputs": [extracted_dir / ds["extract_dir"]],
+                "executor": "thread",
+                "weight": 0
+            })
+
+    for name, spec in CLEANERS.items():
+        ds = DATASETS_BY_DIR[spec["dataset"]]
+        if spec.get("geo"):
+            nodes.append({
+                "name": f"convert:{ds['extract_dir']}",
+                "func": convert_layers,
+                "args": (extracted_dir / ds["extract_dir"], geo_dir / ds["extract_dir"],
+                         importlib.import_module(f"pipeline.{name}").GEO_LAYERS),
+                "deps": [f"extract:{ds['extract_dir']}"],
+                "inputs": [extracted_dir / ds["extract_dir"]],
+                "code": [PIPELINE_DIR / "geo.py"],
+                "outputs": [geo_dir / ds["extract_dir"]],
+                "weight": spec["weight"]
+            })
+
+        # Le nettoyage lit soit les couches GeoParquet, soit les fichiers extraits, soit directement le ZIP
+        if spec.get("geo"):
+            source_node, source_path = f"convert:{ds['extract_dir']}", geo_dir / ds["extract_dir"]
+        elif "extract_members" in ds:
+            source_node, source_path = f"extract:{ds['extract_dir']}", extracted_dir / ds["extract_dir"]
+        else:
+            source_node, source_path = f"download:{ds['extract_dir']}", raw_dir / ds["zip_name"]
+
+        nodes.append({
+            "name": f"clean:{name}",
+            "func": clean_dataset,
+            "args": (name, base_dir),
+            "deps": [source_node],
+            "inputs": [source_path],
+            # `clean_dataset` (choix de la source et des paramètres) fait aussi partie du code du nœud
+            "code": [PIPELINE_DIR / "datasets.py"] + [PIPELINE_DIR / f for f in module_code(name)],
+            "outputs": [cleaned_dir / f for f in spec["outputs"]],
+            "weight": spec["weight"]
+        })
+    return nodes
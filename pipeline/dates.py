@@ -0,0 +1,31 @@
+"""Dimension calendaire partagée : colonnes précalculées au nettoyage (heure, jour, moment de la journée).
+
+Les pages du dashboard groupent directement sur ces colonnes compactes (entiers
+courts, catégories ordonnées) au lieu de re-parser dates et heures à chaque rerun.
+"""
+import numpy as np
+import pandas as pd
+
+# Jours dans l'ordre du calendrier (lundi en premier, comme `dayofweek`)
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+# Moments de la journée : 6h-12h, 12h-18h, le reste
+PERIODS = ["Matin (6h-12h)", "Après-midi (12h-18h)", "Soir/Nuit (18h-6h)"]
+
+
+def hour_of(times, format="%H:%M:%S"):
+    """Heure (0-23, Int8, NA si illisible) d'une colonne d'heures texte ou `datetime.time`."""
+    return pd.to_datetime(times.astype(str), format=format, errors="coerce").dt.hour.astype("Int8")
+
+
+def weekday_of(dates):
+    """Jour de la semaine d'une colonne datetime (catégorie ordonnée WEEKDAYS, NaN si date manquante)."""
+    codes = dates.dt.dayofweek.fillna(-1).astype("int8")
+    return pd.Series(pd.Categorical.from_codes(codes, categories=WEEKDAYS, ordered=True), index=dates.index)
+
+
+def period_of(hours):
+    """Moment de la journée d'une colonne d'heures (catégorie ordonnée PERIODS, NaN si heure manquante)."""
+    hours = hours.astype("float64")
+    codes = np.select([hours.isna(), hours.between(6, 11), hours.between(12, 17)], [-1, 0, 1], default=2)
+    return pd.Series(pd.Categorical.from_codes(codes, categories=PERIODS, ordered=True), index=hours.index)
@@ -0,0 +1,251 @@
+"""Téléchargement concurrent et reprenable des archives Kaggle, avec contrôle d'intégrité.
+
+- Les six archives sont téléchargées en parallèle (threads : le travail est de l'I/O) :
+  une installation neuve dure le temps de la plus grosse archive, pas leur somme.
+- Le téléchargement écrit dans `<zip>.part` ; après une coupure il reprend là où il
+  s'était arrêté (en-tête HTTP `Range`) au lieu de repartir de zéro.
+- Une archive n'est mise en place qu'après vérification de sa taille (annoncée par le
+  serveur) ; sa taille et son SHA-256 sont alors enregistrés dans `manifest.json`.
+  Aux lancements suivants, une archive présente n'est conservée que si elle correspond
+  au manifeste : un ZIP tronqué n'est plus gardé silencieusement.
+- Mode miroir : avec `mirror_dir`, les archives sont lues depuis un dossier local
+  (mêmes noms de fichiers) au lieu de Kaggle, pour travailler hors ligne.
+- Identifiants Kaggle : variables KAGGLE_USERNAME / KAGGLE_KEY, sinon `kaggle.json`
+  (dans KAGGLE_CONFIG_DIR ou ~/.kaggle), comme la CLI `kaggle`.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+KAGGLE_DOWNLOAD_URL = "https://www.kaggle.com/api/v1/datasets/download/{slug}"
+MANIFEST_NAME = "manifest.json"
+CHUNK_BYTES = 1024 * 1024
+MAX_ATTEMPTS = 3
+
+# Plusieurs téléchargements (threads) peuvent mettre à jour le manifeste en même temps
+MANIFEST_LOCK = threading.Lock()
+
+
+class InvalidPartial(IOError):
+    """Le fichier `.part` ne peut pas servir de point de reprise (à supprimer)."""
+
+
+class MissingCredentials(RuntimeError):
+    """Aucun identifiant Kaggle trouvé (variables d'environnement ou kaggle.json)."""
+
+
+def kaggle_credentials():
+    """(utilisateur, clé) Kaggle, depuis l'environnement ou kaggle.json ; MissingCredentials sinon."""
+    if os.environ.get("KAGGLE_USERNAME") and os.environ.get("KAGGLE_KEY"):
+        return os.environ["KAGGLE_USERNAME"], os.environ["KAGGLE_KEY"]
+    config_path = Path(os.environ.get("KAGGLE_CONFIG_DIR", Path.home() / ".kaggle")) / "kaggle.json"
+    if config_path.exists():
+        with open(config_path, encoding="utf-8") as f:
+            config = json.load(f)
+        if config.get("username") and config.get("key"):
+            return config["username"], config["key"]
+    raise MissingCredentials(
+        f"Identifiants Kaggle introuvables : définir KAGGLE_USERNAME et KAGGLE_KEY, "
+        f"ou créer {config_path} (Kaggle ➜ Settings ➜ Create New Token)"
+    )
+
+
+def sha256_of(path):
+    """SHA-256 d'un fichier, lu par blocs."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(CHUNK_BYTES), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_manifest(raw_dir):
+    manifest_path = Path(raw_dir) / MANIFEST_NAME
+    if manifest_path.exists():
+        with open(manifest_path, encoding="utf-8") as f:
+            return json.load(f)
+    return {}
+
+
+def update_manifest(raw_dir, entries):
+    """Fusionne `entries` dans le manifeste sur disque (relu sous verrou, écrit atomiquement)."""
+    manifest_path = Path(raw_dir) / MANIFEST_NAME
+    with MANIFEST_LOCK:
+        manifest = load_manifest(raw_dir)
+        manifest.update(entries)
+        tmp_path = manifest_path.with_suffix(".json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(tmp_path, manifest_path)
+
+
+def is_verified(zip_path, entry, verify_checksum=True):
+    """Vrai si l'archive présente correspond à son entrée du manifeste."""
+    if not zip_path.exists() or entry is None:
+        return False
+    if zip_path.stat().st_size != entry["size"]:
+        return False
+    return not verify_checksum or sha256_of(zip_path) == entry["sha256"]
+
+
+def open_kaggle(slug, offset, auth):
+    """Ouvre le flux Kaggle à partir de `offset`. Retourne (itérateur d'octets, taille totale, repris ?)."""
+    import requests
+
+    headers = {"Range": f"bytes={offset}-"} if offset else {}
+    response = requests.get(
+        KAGGLE_DOWNLOAD_URL.format(slug=slug),
+        auth=auth,
+        headers=headers,
+        stream=True,
+        timeout=60
+    )
+    if response.status_code == 416:
+        raise InvalidPartial("plage demandée au-delà de la fin du fichier")
+    response.raise_for_status()
+
+    resumed = response.status_code == 206
+    if resumed:
+        # Content-Range: bytes <début>-<fin>/<total>
+        total = int(response.headers["Content-Range"].rsplit("/", 1)[1])
+    else:
+        length = response.headers.get("Content-Length")
+        total = int(length) if length is not None else None
+    return response.iter_content(CHUNK_BYTES), total, resumed
+
+
+def open_mirror(source_path, offset):
+    """Même interface que `open_kaggle`, depuis un fichier du miroir local."""
+    total = source_path.stat().st_size
+
+    def read_from_offset():
+        with open(source_path, "rb") as f:
+            f.seek(offset)
+            yield from iter(lambda: f.read(CHUNK_BYTES), b"")
+
+    return read_from_offset(), total, True
+
+
+def fetch(ds, raw_dir, mirror_dir=None, auth=None):
+    """Télécharge (ou reprend) une archive dans `<zip>.part`, vérifie sa taille et la met en place.
+
+    `auth` : identifiants Kaggle (voir `kaggle_credentials`), inutiles en mode miroir.
+    """
+    zip_path = raw_dir / ds["zip_name"]
+    part_path = raw_dir / f"{ds['zip_name']}.part"
+
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        offset = part_path.stat().st_size if part_path.exists() else 0
+        try:
+            if mirror_dir:
+                chunks, total, resumed = open_mirror(Path(mirror_dir) / ds["zip_name"], offset)
+            else:
+                chunks, total, resumed = open_kaggle(ds["slug"], offset, auth)
+
+            if offset and not resumed:
+                print(f"↩️  {ds['zip_name']} : reprise non supportée par le serveur, redémarrage")
+                offset = 0
+            elif offset:
+                print(f"↩️  {ds['zip_name']} : reprise à {offset / 1e6:.1f} Mo")
+
+            with open(part_path, "ab" if offset else "wb") as f:
+                for chunk in chunks:
+                    f.write(chunk)
+
+            size = part_path.stat().st_size
+            if total is not None and size > total:
+                raise InvalidPartial(f"taille {size} octets, supérieure aux {total} attendus")
+            if total is not None and size != total:
+                raise IOError(f"taille reçue {size} octets, attendue {total}")
+            if not zipfile.is_zipfile(part_path):
+                # Taille complète mais répertoire central illisible : contenu incohérent
+                raise InvalidPartial("archive ZIP illisible")
+
+            os.replace(part_path, zip_path)
+            return {"size": size, "sha256": sha256_of(zip_path), "source": str(mirror_dir or "kaggle")}
+
+        except Exception as e:
+            print(f"⚠️ {ds['zip_name']} : tentative {attempt}/{MAX_ATTEMPTS} échouée ({e})")
+            if isinstance(e, InvalidPartial):
+                part_path.unlink(missing_ok=True)
+            time.sleep(2 * attempt)
+
+    raise IOError(f"Échec du téléchargement de {ds['zip_name']} après {MAX_ATTEMPTS} tentatives")
+
+
+def download_datasets(datasets, raw_dir, mirror_dir=None, verify_checksum=True, max_workers=None):
+    """Télécharge en parallèle les archives manquantes ou invalides de `datasets`.
+
+    `datasets` est la liste DATASETS de data_pipeline.ipynb (slug, zip_name, ...).
+    Retourne `{zip_name: "ok" | "téléchargé" | message d'erreur}`. Lève MissingCredentials
+    si une archive doit être téléchargée depuis Kaggle sans identifiants.
+    """
+    raw_dir = Path(raw_dir)
+    raw_dir.mkdir(parents=True, exist_ok=True)
+    manifest = load_manifest(raw_dir)
+    status = {}
+
+    to_fetch = []
+    for ds in datasets:
+        zip_path = raw_dir / ds["zip_name"]
+        entry = manifest.get(ds["zip_name"])
+        if mirror_dir and entry is not None and not is_verified(Path(mirror_dir) / ds["zip_name"], entry, verify_checksum):
+            # Archive rafraîchie dans le miroir : la copie locale est périmée
+            print(f"🔄 {ds['zip_name']} a changé dans le miroir : nouvelle copie.")
+            zip_path.unlink(missing_ok=True)
+            (raw_dir / f"{ds['zip_name']}.part").unlink(missing_ok=True)
+            entry = None
+        if is_verified(zip_path, entry, verify_checksum):
+            print(f"✅ {ds['zip_name']} déjà présent et vérifié.")
+            status[ds["zip_name"]] = "ok"
+            continue
+        if zip_path.exists() and entry is None and zipfile.is_zipfile(zip_path):
+            # Archive antérieure au manifeste mais lisible : on l'enregistre telle quelle
+            print(f"✅ {ds['zip_name']} déjà présent, ajouté au manifeste.")
+            manifest[ds["zip_name"]] = {"size": zip_path.stat().st_size, "sha256": sha256_of(zip_path), "source": "local"}
+            status[ds["zip_name"]] = "ok"
+            continue
+        if zip_path.exists():
+            part_path = raw_dir / f"{ds['zip_name']}.part"
+            truncated = entry is None or zip_path.stat().st_size < entry["size"]
+            if truncated and not part_path.exists():
+                # Archive tronquée : elle sert de point de reprise
+                print(f"⚠️ {ds['zip_name']} incomplet : reprise du téléchargement.")
+                os.replace(zip_path, part_path)
+            else:
+                # Archive altérée (taille ou SHA-256 différents du manifeste) : on repart de zéro
+                print(f"⚠️ {ds['zip_name']} ne correspond pas au manifeste : nouveau téléchargement.")
+                zip_path.unlink()
+                part_path.unlink(missing_ok=True)
+        to_fetch.append(ds)
+
+    if to_fetch:
+        # Vérifiés une seule fois, avant tout téléchargement (une erreur d'identifiants n'a pas à être retentée)
+        auth = None if mirror_dir else kaggle_credentials()
+        print(f"⬇️  Téléchargement de {len(to_fetch)} archive(s) en parallèle ...")
+        with ThreadPoolExecutor(max_workers=max_workers or len(to_fetch)) as pool:
+            futures = {ds["zip_name"]: pool.submit(fetch, ds, raw_dir, mirror_dir, auth) for ds in to_fetch}
+            for zip_name, future in futures.items():
+                try:
+                    manifest[zip_name] = future.result()
+                    status[zip_name] = "téléchargé"
+                    print(f"✅ Téléchargement terminé et vérifié : {zip_name}")
+                except Exception as e:
+                    status[zip_name] = str(e)
+                    print(f"❌ Erreur lors du téléchargement de {zip_name} : {e}")
+
+    fetched = {ds["zip_name"]: manifest[ds["zip_name"]] for ds in datasets if ds["zip_name"] in manifest}
+    update_manifest(raw_dir, fetched)
+    return status
+
+
+def ensure_archive(ds, raw_dir, mirror_dir=None):
+    """Étape du DAG : garantit une archive vérifiée pour un seul dataset (erreur sinon)."""
+    status = download_datasets([ds], raw_dir, mirror_dir=mirror_dir)
+    if status[ds["zip_name"]] not in ("ok", "téléchargé"):
+        raise IOError(status[ds["zip_name"]])
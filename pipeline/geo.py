@@ -0,0 +1,40 @@
+"""Couches géographiques en GeoParquet : conversion des shapefiles et lecture rapide.
+
+Un shapefile est relu et reprojeté à chaque lecture ; sa version GeoParquet est
+déjà dans le CRS cible et porte une colonne `bbox` par géométrie (métadonnée
+"covering" GeoParquet 1.1), qui permet de ne lire que les lignes d'une emprise.
+"""
+import shutil
+from pathlib import Path
+
+
+def convert_layers(shp_dir, geo_dir, layers):
+    """Convertit chaque `<nom>.shp` de `shp_dir` en `<nom>.parquet` dans `geo_dir`.
+
+    `layers` : {nom de la couche: CRS cible}. Une couche sans CRS est supposée en
+    EPSG:4326. Comme pour `extract_members`, l'écriture se fait dans un dossier
+    temporaire remplacé en une fois.
+    """
+    import geopandas as gpd
+
+    shp_dir, geo_dir = Path(shp_dir), Path(geo_dir)
+    staging = geo_dir.with_name(f"{geo_dir.name}.tmp")
+    shutil.rmtree(staging, ignore_errors=True)
+    staging.mkdir(parents=True)
+
+    for name, crs in layers.items():
+        gdf = gpd.read_file(shp_dir / f"{name}.shp")
+        if gdf.crs is None:
+            gdf = gdf.set_crs("EPSG:4326")
+        gdf.to_crs(crs).to_parquet(staging / f"{name}.parquet", index=False, write_covering_bbox=True)
+
+    shutil.rmtree(geo_dir, ignore_errors=True)
+    staging.rename(geo_dir)
+    print(f"🗺️  {len(layers)} couche(s) converties en GeoParquet dans {geo_dir}")
+
+
+def read_layer(geo_dir, name, bbox=None, columns=None):
+    """Lit la couche `name` de `geo_dir` ; `bbox` (minx, miny, maxx, maxy, dans le CRS de la couche) filtre à la lecture."""
+    import geopandas as gpd
+
+    return gpd.read_parquet(Path(geo_dir) / f"{name}.parquet", bbox=bbox, columns=columns)
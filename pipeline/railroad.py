@@ -0,0 +1,311 @@
+"""Nettoyage du dataset Railroad Accident & Incident (accidents ferroviaires aux USA).
+
+Étapes partagées avec `notebooks/EDA_Railroad_Accident_Incident_Data.ipynb` : le
+notebook les appelle au fil de l'exploration, `clean_railroad` les enchaîne sans graphique.
+"""
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import MinMaxScaler
+
+from pipeline.archives import open_source
+from pipeline.dates import hour_of, weekday_of
+from pipeline.rules import map_unique
+
+CSV_MEMBER = "Rail_Equipment_Accident_Incident_Data.csv"
+
+# Colonnes presque vides (aucun impact sur la shortlist)
+EMPTY_COLUMNS = ['Adjunct Code Name 3', 'Adjunct Code 3', 'Adjunct Code Name 2', 'Adjunct Code 2', 'Other Railroad Company Grouping']
+
+# Shortlist des variables prioritaires pour le dashboard risque
+PRIORITY_COLUMNS = [
+    # Structure/identité
+    "Accident Number", "Reporting Railroad Code", "Reporting Railroad Name",
+    "Accident Year", "Accident Month", "Day", "Date", "Time", "Report Year",
+    # Nature et contexte
+    "Accident Type", "State Abbreviation", "State Name", "County Name", "Latitude", "Longitude",
+    "Weather Condition", "Temperature", "Visibility", "Train Speed",
+    # Impact/coût
+    "Total Damage Cost", "Equipment Damage Cost", "Track Damage Cost",
+    # Causes
+    "Primary Accident Cause", "Primary Accident Cause Code",
+    "Accident Cause", "Accident Cause Code",
+    # Humain
+    "Railroad Employees Killed", "Railroad Employees Injured",
+    "Passengers Killed", "Passengers Injured",
+    "Others Killed", "Others Injured", "Total Persons Killed", "Total Persons Injured",
+    # Risque/impact logistique
+    "Hazmat Cars", "Hazmat Cars Damaged", "Hazmat Released Cars", "Persons Evacuated",
+    "Derailed Loaded Freight Cars", "Derailed Empty Freight Cars",
+    "Derailed Loaded Passenger Cars", "Derailed Empty Passenger Cars"
+]
+
+COST_COLUMNS = ["Total Damage Cost", "Equipment Damage Cost", "Track Damage Cost"]
+
+# Variables "impact" (tués/blessés, wagons déraillés, etc.) : entiers, NA -> 0
+IMPACT_COLUMNS = [
+    "Railroad Employees Killed", "Railroad Employees Injured",
+    "Passengers Killed", "Passengers Injured", "Others Killed", "Others Injured",
+    "Total Persons Killed", "Total Persons Injured",
+    "Hazmat Cars", "Hazmat Cars Damaged", "Hazmat Released Cars", "Persons Evacuated",
+    "Derailed Loaded Freight Cars", "Derailed Empty Freight Cars",
+    "Derailed Loaded Passenger Cars", "Derailed Empty Passenger Cars"
+]
+
+TEXT_COLUMNS = ["Accident Type", "State Abbreviation", "State Name", "County Name", "Weather Condition", "Visibility"]
+
+# On garde les 20 dernières années
+MIN_REPORT_YEAR = 2002
+
+# Hypothèse : 10 à 20 millions de trajets de trains par an aux USA (2002-2022)
+MIN_TRAINS_PER_YEAR = 10_000_000
+MAX_TRAINS_PER_YEAR = 20_000_000
+N_YEARS = 2022 - 2002 + 1
+
+ACCIDENT_TYPE_FR = {
+    "Derailment": "Déraillement",
+    "Hwy-rail crossing": "Collision voie-route",
+    "RR grade crossing": "Collision voie-route",
+    "Side collision": "Collision latérale",
+    "Rear end collision": "Collision arrière",
+    "Head on collision": "Collision frontale",
+    "Broken train collision": "Collision convoi cassé",
+    "Raking collision": "Collision latérale",
+    "Fire/violent rupture": "Feu ou rupture",
+    "Explosion-detonation": "Explosion",
+    "Obstruction": "Obstacle sur voie",
+    "Other (describe in narrative)": "Autre",
+    "Other impacts": "Autre"
+}
+
+EXPORT_COLUMNS = [
+    "Accident Number",
+    "Accident Year", "Accident Month", "Day", "Report Year",
+    "Accident Type", "State Abbreviation", "State Name", "County Name",
+    "Latitude", "Longitude",
+    "Weather Condition", "Visibility", "TimeOfDay",
+    "Accident_Date", "Accident_Weekday", "Accident_Hour",
+    "Total Damage Cost", "Total Persons Killed", "Total Persons Injured",
+    "Hazmat Cars", "Hazmat Cars Damaged", "Persons Evacuated",
+    "Frequence (%) (bas)", "Frequence (%) (haut)",
+    "Consequence", "Risque_composite", "Niveau_criticité"
+]
+
+# Schéma typé pour la version colonnaire (dates compactes, libellés en catégories)
+EXPORT_DTYPES = {
+    "Accident Year": "int16",
+    "Accident Month": "int8",
+    "Day": "int8",
+    "Report Year": "int16",
+    "Accident Type": "category",
+    "State Abbreviation": "category",
+    "State Name": "category",
+    "County Name": "category",
+    "Weather Condition": "category",
+    "Visibility": "category",
+    "TimeOfDay": "category",
+    "Accident_Hour": "Int8",
+    "Niveau_criticité": "category"
+}
+
+# Carte du dashboard : emprise des USA continentaux et pas des grilles d'agrégation (degrés),
+# de la vue nationale à la vue régionale
+MAP_BOUNDS = {"Latitude": (24.5, 49.5), "Longitude": (-125, -66)}
+MAP_GRID_STEPS = [1.0, 0.25]
+
+# Niveaux de criticité, du moins au plus grave
+CRITICITY_LEVELS = ["Low", "Medium", "High"]
+
+
+def time_class(val):
+    """Tranche horaire d'une heure "HH:MM AM/PM" (NaN si illisible)."""
+    try:
+        time, abbr = str(val).strip().split()
+        hr = int(time.split(':')[0])
+        if abbr.upper() == "AM":
+            return "EARLY MORNING" if hr < 6 else "LATE MORNING"
+        if abbr.upper() == "PM":
+            return "AFTERNOON" if hr < 4 else "EVENING"
+    except ValueError:
+        return np.nan
+    return None
+
+
+def select_and_type(df):
+    """Shortlist des variables, conversion des types et colonne TimeOfDay."""
+    df_risk = df.drop(columns=EMPTY_COLUMNS)
+    df_risk = df_risk[[v for v in PRIORITY_COLUMNS if v in df_risk.columns]].copy()
+
+    # Coûts : retrait des virgules, conversion en float, NA -> 0
+    for col in COST_COLUMNS:
+        df_risk[col] = (
+            df_risk[col]
+            .astype(str)
+            .str.replace(",", "", regex=False)
+            .replace("nan", "0")
+            .replace("", "0")
+            .astype(float)
+            .fillna(0)
+        )
+
+    for col in ["Accident Year", "Accident Month", "Day", "Report Year"]:
+        if col in df_risk.columns:
+            df_risk[col] = pd.to_numeric(df_risk[col], errors="coerce").fillna(0).astype(int)
+
+    for col in ["Latitude", "Longitude", "Train Speed"]:
+        if col in df_risk.columns:
+            df_risk[col] = pd.to_numeric(df_risk[col], errors="coerce")
+
+    for col in IMPACT_COLUMNS:
+        if col in df_risk.columns:
+            df_risk[col] = pd.to_numeric(df_risk[col], errors="coerce").fillna(0).astype(int)
+
+    # Une classification par heure distincte (≈ 1 500 valeurs) au lieu d'une par ligne
+    df_risk["TimeOfDay"] = map_unique(df_risk["Time"], time_class)
+
+    # Chaînes : trim, NA -> ""
+    for col in TEXT_COLUMNS:
+        if col in df_risk.columns:
+            df_risk[col] = df_risk[col].astype(str).str.strip().replace("nan", "")
+    return df_risk
+
+
+def filter_recent(df_risk):
+    """Accidents depuis MIN_REPORT_YEAR, avec un type d'accident renseigné."""
+    df_risk = df_risk[df_risk["Report Year"] >= MIN_REPORT_YEAR].copy()
+    df_risk["Accident Type"] = df_risk["Accident Type"].astype(str).str.strip()
+    return df_risk[
+        df_risk["Accident Type"].notna() &
+        (df_risk["Accident Type"] != "") &
+        (df_risk["Accident Type"].str.lower() != "nan")
+    ]
+
+
+def risk_by_type(df_risk_valid):
+    """Fréquence, conséquence normalisée, risque composite et criticité par type d'accident."""
+    total_trains_min = MIN_TRAINS_PER_YEAR * N_YEARS
+    total_trains_max = MAX_TRAINS_PER_YEAR * N_YEARS
+
+    summary = pd.DataFrame({"Accident Type": df_risk_valid["Accident Type"].unique()}).set_index("Accident Type")
+    summary["Incidents_recensés"] = df_risk_valid["Accident Type"].value_counts()
+    summary["Frequence (%) (bas)"] = summary["Incidents_recensés"] / total_trains_min * 100
+    summary["Frequence (%) (haut)"] = summary["Incidents_recensés"] / total_trains_max * 100
+
+    by_type = df_risk_valid.groupby("Accident Type")
+    summary["Coût_moyen_USD"] = by_type["Total Damage Cost"].mean()
+    summary["Tués_par_incident"] = by_type["Total Persons Killed"].sum() / summary["Incidents_recensés"]
+    summary["Blessés_par_incident"] = by_type["Total Persons Injured"].sum() / summary["Incidents_recensés"]
+
+    # Normalisation de la conséquence seule, puis agrégation pondérée
+    consequence_cols = ["Coût_moyen_USD", "Tués_par_incident", "Blessés_par_incident"]
+    summary[consequence_cols] = MinMaxScaler().fit_transform(summary[consequence_cols].fillna(0))
+    summary["Consequence"] = (
+        summary["Coût_moyen_USD"] * 0.5 +
+        summary["Tués_par_incident"] * 0.3 +
+        summary["Blessés_par_incident"] * 0.2
+    )
+
+    # Risque = Frequence (bas) x Consequence, criticité par quantiles
+    summary["Risque_composite"] = summary["Frequence (%) (bas)"] * summary["Consequence"]
+    summary["Niveau_criticité"] = pd.qcut(summary["Risque_composite"], q=[0, 0.5, 0.75, 1], labels=CRITICITY_LEVELS)
+    return summary.reset_index()
+
+
+def add_risk(df_risk, summary):
+    """Ajoute à chaque accident les indicateurs de risque de son type."""
+    return df_risk.merge(
+        summary[[
+            "Accident Type",
+            "Frequence (%) (bas)",
+            "Frequence (%) (haut)",
+            "Consequence",
+            "Risque_composite",
+            "Niveau_criticité"
+        ]],
+        on="Accident Type",
+        how="left"
+    )
+
+
+def add_calendar(df_risk):
+    """Colonnes calendaires : Accident_Date (Report Year, Accident Month, Day), Accident_Weekday, Accident_Hour."""
+    df_risk = df_risk.copy()
+    df_risk["Accident_Date"] = pd.to_datetime({
+        "year": df_risk["Report Year"],
+        "month": df_risk["Accident Month"],
+        "day": df_risk["Day"]
+    }, errors="coerce")
+    df_risk["Accident_Weekday"] = weekday_of(df_risk["Accident_Date"])
+    # Heures au format "HH:MM AM/PM"
+    df_risk["Accident_Hour"] = hour_of(df_risk["Time"], format="%I:%M %p")
+    return df_risk
+
+
+def map_grid(df_final):
+    """Incidents par cellule de grille, pour chaque pas de MAP_GRID_STEPS.
+
+    Une ligne par (Step, cellule) : centre de la cellule (Latitude, Longitude), nombre
+    d'incidents (Count) et niveau de criticité le plus fréquent (Niveau_criticité).
+    Le nombre de cellules dépend de l'emprise et du pas, pas de l'historique.
+    """
+    located = df_final.dropna(subset=["Latitude", "Longitude"])
+    located = located[
+        located["Latitude"].between(*MAP_BOUNDS["Latitude"]) &
+        located["Longitude"].between(*MAP_BOUNDS["Longitude"])
+    ]
+
+    grids = []
+    for step in MAP_GRID_STEPS:
+        cells = pd.DataFrame({
+            "Latitude": (np.floor(located["Latitude"] / step) + 0.5) * step,
+            "Longitude": (np.floor(located["Longitude"] / step) + 0.5) * step,
+            # Ordonnée par gravité (les catégories exportées sont dans l'ordre alphabétique)
+            "Niveau_criticité": pd.Categorical(located["Niveau_criticité"], categories=CRITICITY_LEVELS, ordered=True)
+        })
+        by_level = cells.groupby(["Latitude", "Longitude", "Niveau_criticité"], observed=True).size().rename("n").reset_index()
+        # Criticité dominante : effectif le plus élevé de la cellule (à égalité, la plus grave)
+        dominant = (
+            by_level.sort_values(["n", "Niveau_criticité"], ascending=False, kind="stable")
+            .drop_duplicates(["Latitude", "Longitude"])
+            .drop(columns="n")
+        )
+        counts = cells.groupby(["Latitude", "Longitude"]).size().rename("Count").reset_index()
+        grids.append(counts.merge(dominant, on=["Latitude", "Longitude"]).assign(Step=step))
+
+    grid = pd.concat(grids, ignore_index=True)
+    return grid[["Step", "Latitude", "Longitude", "Count", "Niveau_criticité"]].astype({"Count": "int32"})
+
+
+def export(df_risk, cleaned_dir):
+    """Traduit les types d'accident, écrit le CSV, le Parquet typé, la grille de la carte et le résumé JSON. Retourne le résumé."""
+    cleaned_dir = Path(cleaned_dir)
+    df_final = df_risk[EXPORT_COLUMNS].copy()
+    df_final["Accident Type"] = df_final["Accident Type"].replace(ACCIDENT_TYPE_FR)
+    df_final = df_final.astype(EXPORT_DTYPES)
+
+    df_final.to_csv(cleaned_dir / "railroad_accident_cleaned.csv", index=False)
+    df_final.to_parquet(cleaned_dir / "railroad_accident_cleaned.parquet", index=False)
+
+    # Carte agrégée du dashboard : sa taille ne grandit pas avec l'historique
+    grid = map_grid(df_final)
+    grid.to_csv(cleaned_dir / "railroad_accident_grid.csv", index=False)
+    grid.to_parquet(cleaned_dir / "railroad_accident_grid.parquet", index=False)
+
+    # KPI + effectifs par type d'accident, triés
+    summary = {
+        "kpi": int(len(df_final)),
+        "counts": {str(k): int(v) for k, v in df_final["Accident Type"].value_counts().items()}
+    }
+    with open(cleaned_dir / "railroad_accident_cleaned_summary.json", "w", encoding="utf-8") as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+    return summary
+
+
+def clean_railroad(raw_path, cleaned_dir, member=CSV_MEMBER):
+    """Chaîne complète : lecture (dans l'archive si `member`), nettoyage, risque par type, export."""
+    with open_source(raw_path, member) as f:
+        df = pd.read_csv(f)
+    df_risk = filter_recent(select_and_type(df))
+    return export(add_calendar(add_risk(df_risk, risk_by_type(df_risk))), cleaned_dir)
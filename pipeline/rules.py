@@ -0,0 +1,100 @@
+"""Règles de classification déclaratives, évaluées de façon vectorisée.
+
+Les notebooks EDA classaient les lignes une par une avec `.apply` (fonctions `if/elif`).
+Ici une règle se déclare comme une liste ordonnée `(libellé, condition)` ; chaque
+condition est une fonction `df -> masque booléen` construite avec les helpers
+ci-dessous, et `classify` évalue toutes les conditions d'un coup avec `np.select`
+(la première condition vraie l'emporte, comme dans un `if/elif`).
+
+Exemple :
+
+    RULES = [
+        ("Bloquant", all_of(compare("Severity", ">=", 3), compare("Duration(min)", ">", 120))),
+        ("Météo", isin("Weather_Condition", ["Snow", "Fog"])),
+    ]
+    df["Categorie"] = classify(df, RULES, default="Autre")
+"""
+import operator
+import re
+
+import numpy as np
+import pandas as pd
+
+COMPARATORS = {
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "==": operator.eq,
+    "!=": operator.ne
+}
+
+
+def compare(column, op, value):
+    """Condition `df[column] <op> value` (op parmi <, <=, >, >=, ==, !=)."""
+    func = COMPARATORS[op]
+    return lambda df: func(df[column], value).fillna(False).astype(bool)
+
+
+def isin(column, values):
+    """Condition : la valeur de `column` appartient exactement à `values`."""
+    values = list(values)
+    return lambda df: df[column].isin(values)
+
+
+def isna(column):
+    """Condition : valeur manquante dans `column`."""
+    return lambda df: df[column].isna()
+
+
+def contains_any(column, keywords, case=True):
+    """Condition : le texte de `column` contient au moins un des mots-clés (valeurs manquantes : faux)."""
+    pattern = "|".join(re.escape(kw) for kw in keywords)
+    return lambda df: df[column].astype("string").str.contains(pattern, case=case, regex=True).fillna(False).astype(bool)
+
+
+def all_of(*conditions):
+    """Condition vraie si toutes les conditions le sont (ET)."""
+    return lambda df: np.logical_and.reduce([cond(df) for cond in conditions])
+
+
+def any_of(*conditions):
+    """Condition vraie si au moins une des conditions l'est (OU)."""
+    return lambda df: np.logical_or.reduce([cond(df) for cond in conditions])
+
+
+def classify(df, rules, default):
+    """Libellé de la première règle vraie pour chaque ligne, `default` si aucune ne l'est."""
+    conditions = [np.asarray(cond(df), dtype=bool) for _, cond in rules]
+    labels = [label for label, _ in rules]
+    return pd.Series(np.select(conditions, labels, default=default), index=df.index)
+
+
+def bin_thresholds(values, thresholds, labels, right=False, na_label=None):
+    """Découpe des valeurs numériques selon des seuils croissants.
+
+    Avec `right=False`, `x < thresholds[0]` donne `labels[0]`, `x < thresholds[1]` donne
+    `labels[1]`, etc., et le dernier libellé couvre le reste. `right=True` utilise `<=`.
+    Les valeurs manquantes prennent `na_label` s'il est fourni, sinon le dernier libellé
+    (comportement d'une chaîne `if x < s: ... else: ...` sur NaN).
+    """
+    if len(labels) != len(thresholds) + 1:
+        raise ValueError("Il faut exactement un libellé de plus que de seuils")
+    values = pd.Series(values)
+    numbers = pd.to_numeric(values, errors="coerce").to_numpy(dtype=float)
+    idx = np.searchsorted(np.asarray(thresholds, dtype=float), numbers, side="left" if right else "right")
+    result = pd.Series(np.asarray(labels, dtype=object)[idx], index=values.index)
+    if na_label is not None:
+        result[np.isnan(numbers)] = na_label
+    return result
+
+
+def map_unique(values, func):
+    """Applique `func` une seule fois par valeur distincte de `values` (au lieu d'une fois par ligne).
+
+    Pour les fonctions de classification non vectorisables (analyse d'heures en texte,
+    conversions avec repli) sur des colonnes aux valeurs très répétées.
+    """
+    values = pd.Series(values)
+    uniques = pd.unique(values)
+    return values.map(pd.Series([func(v) for v in uniques], index=uniques))
@@ -0,0 +1,177 @@
+"""Exécution concurrente des jobs de nettoyage dans un pool de processus.
+
+Chaque job déclare un poids mémoire (en Go, estimation du pic). Le scheduler lance
+les jobs tant que la somme des poids en cours reste sous la capacité : les petits
+jobs (airline, amazon, supply chain) tournent ensemble, tandis qu'un job dont le
+poids atteint la capacité (traffic) tourne seul. Un récapitulatif des temps
+d'exécution par job est affiché à la fin.
+
+Un job est un dict :
+
+    {"name": "traffic", "func": run_notebook, "args": (path,), "weight": 8}
+
+`func` doit être importable depuis un module (pas définie dans un notebook) pour
+pouvoir être envoyée à un processus fils, y compris sous Windows.
+"""
+import time
+import traceback
+from contextlib import ExitStack
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+
+def run_notebook(notebook_path, cwd=None, parameters=None):
+    """Exécute un notebook EDA avec papermill (sans sauvegarder la copie exécutée)."""
+    import papermill as pm
+
+    pm.execute_notebook(
+        input_path=str(notebook_path),
+        output_path=None,
+        parameters=parameters or {},
+        cwd=str(cwd) if cwd else None,
+        progress_bar=False
+    )
+
+
+def timed_call(func, args, kwargs):
+    """Appelle `func` dans le processus fils et mesure son temps d'exécution."""
+    start = time.perf_counter()
+    try:
+        func(*args, **kwargs)
+        error = None
+    except Exception:
+        error = traceback.format_exc()
+    return time.perf_counter() - start, error
+
+
+def run_jobs(jobs, capacity, max_workers=None, executor="process"):
+    """Exécute `jobs` en parallèle sous la contrainte `somme des poids <= capacity`.
+
+    Les jobs sont lancés du plus lourd au plus léger ; un job plus lourd que la
+    capacité est ramené à la capacité (il tourne alors seul). Un job en échec
+    n'interrompt pas les autres, y compris quand son processus meurt brutalement
+    (mémoire, segfault) : le pool cassé est alors recréé pour les jobs suivants.
+
+    Clés optionnelles d'un job :
+    - "deps" : noms des jobs à terminer avec succès avant de le lancer (un job dont
+      une dépendance échoue est ignoré) ;
+    - "is_stale" : fonction appelée au moment où le job devient lançable ; si elle
+      renvoie False, le job est considéré à jour et n'est pas exécuté ;
+    - "on_success" : fonction appelée (dans ce processus) après une exécution réussie ;
+    - "executor" : remplace `executor` pour ce job.
+
+    `executor="thread"` utilise des threads plutôt que des processus (jobs d'I/O ou
+    qui lancent eux-mêmes un sous-processus). Retourne la liste des résultats
+    `{"name", "weight", "seconds", "status", "error"}` dans l'ordre de fin.
+    """
+    names = {job["name"] for job in jobs}
+    for job in jobs:
+        unknown = set(job.get("deps", ())) - names
+        if unknown:
+            raise ValueError(f"{job['name']} dépend de jobs inconnus : {sorted(unknown)}")
+
+    pending = sorted(jobs, key=lambda job: job.get("weight", 1), reverse=True)
+    running = {}
+    results = []
+    succeeded, failed = set(), set()
+    used = 0
+    start = time.perf_counter()
+
+    def finish(job, weight, seconds, status, error=None):
+        (failed if error else succeeded).add(job["name"])
+        results.append({"name": job["name"], "weight": weight, "seconds": seconds, "status": status, "error": error})
+
+    # Un pool par type d'exécuteur, créé à la première utilisation
+    pools = {}
+
+    def pool_for(job):
+        kind = job.get("executor", executor)
+        if kind not in pools:
+            pool_class = ThreadPoolExecutor if kind == "thread" else ProcessPoolExecutor
+            pools[kind] = stack.enter_context(pool_class(max_workers=max_workers or len(jobs) or 1))
+        return pools[kind]
+
+    def discard_pool(pool):
+        # Le pool suivant est créé à la prochaine soumission ; l'ancien est fermé par l'ExitStack
+        for kind, current in list(pools.items()):
+            if current is pool:
+                del pools[kind]
+
+    with ExitStack() as stack:
+        while pending or running:
+            # Lancer tous les jobs prêts qui tiennent dans la capacité restante ; un job
+            # à jour ou ignoré peut débloquer les suivants, d'où la boucle jusqu'à stabilité
+            launched = True
+            while launched:
+                launched = False
+                for job in list(pending):
+                    deps = job.get("deps", ())
+                    weight = min(job.get("weight", 1), capacity)
+                    if any(dep in failed for dep in deps):
+                        pending.remove(job)
+                        finish(job, weight, 0.0, "ignoré", error="dépendance en échec")
+                        print(f"⏭️  {job['name']} ignoré (dépendance en échec)")
+                        launched = True
+                    elif not all(dep in succeeded for dep in deps):
+                        continue
+                    elif "is_stale" in job and not job["is_stale"]():
+                        pending.remove(job)
+                        finish(job, weight, 0.0, "à jour")
+                        print(f"✅ {job['name']} à jour")
+                        launched = True
+                    elif used + weight <= capacity:
+                        pending.remove(job)
+                        used += weight
+                        call = (timed_call, job["func"], job.get("args", ()), job.get("kwargs", {}))
+                        pool = pool_for(job)
+                        try:
+                            future = pool.submit(*call)
+                        except BrokenProcessPool:
+                            # Pool cassé par un job dont l'échec n'est pas encore relevé
+                            discard_pool(pool)
+                            pool = pool_for(job)
+                            future = pool.submit(*call)
+                        running[future] = (job, weight, pool, time.perf_counter())
+                        print(f"▶️  {job['name']} lancé (poids {weight}, utilisé {used}/{capacity})")
+
+            if not running:
+                if pending:
+                    # Rien ne tourne et rien n'est lançable : dépendances circulaires
+                    raise ValueError(f"Dépendances circulaires entre : {[job['name'] for job in pending]}")
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                job, weight, pool, launched_at = running.pop(future)
+                used -= weight
+                try:
+                    seconds, error = future.result()
+                except BrokenProcessPool:
+                    # Processus fils tué : tous les jobs en cours dans ce pool échouent avec lui
+                    seconds, error = time.perf_counter() - launched_at, traceback.format_exc()
+                    discard_pool(pool)
+                if not error and "on_success" in job:
+                    try:
+                        job["on_success"]()
+                    except Exception:
+                        error = traceback.format_exc()
+                if error:
+                    finish(job, weight, seconds, "échec", error)
+                    print(f"❌ {job['name']} en échec après {seconds:.1f} s :\n{error}")
+                else:
+                    finish(job, weight, seconds, "exécuté")
+                    print(f"✅ {job['name']} terminé en {seconds:.1f} s")
+
+    print_report(results, time.perf_counter() - start)
+    return results
+
+
+def print_report(results, wall_seconds):
+    """Affiche le temps d'exécution de chaque job et le gain du parallélisme."""
+    print("\n=== Temps d'exécution par job ===")
+    width = max((len(r["name"]) for r in results), default=0)
+    for r in sorted(results, key=lambda r: r["seconds"], reverse=True):
+        icon = "❌" if r["error"] else "✅"
+        print(f"{icon} {r['name']:<{width}}  {r['seconds']:8.1f} s  (poids {r['weight']}, {r['status']})")
+    total = sum(r["seconds"] for r in results)
+    print(f"Durée totale : {wall_seconds:.1f} s (somme des jobs : {total:.1f} s)")
@@ -0,0 +1,444 @@
+"""Nettoyage du dataset Shipping Accidents (accidents maritimes, shapefiles).
+
+Étapes partagées avec `notebooks/EDA_Shipping_Accidents.ipynb` : le notebook les
+appelle au fil de l'exploration, `clean_shipping` les enchaîne sans graphique.
+"""
+import datetime
+import json
+import os
+import pickle
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import MinMaxScaler
+
+from pipeline.download import sha256_of
+from pipeline.geo import read_layer
+from pipeline.rules import any_of, bin_thresholds, classify, compare, contains_any, isin, isna, map_unique
+
+# Intervalle de 20 ans conservé
+START_YEAR = 2003
+END_YEAR = 2023
+
+# Regroupement des types d'accidents en 5 catégories
+ACC_TYPE_GROUPS = {
+    # Technical or Equipment Failure
+    'Damage to ship or equipment': 'Technical or Equipment Failure',
+    'Damages to ships or equipment': 'Technical or Equipment Failure',
+    'Dammage to ships or equipment': 'Technical or Equipment Failure',
+    'Door fault . fault in doorways': 'Technical or Equipment Failure',
+    'hull failure': 'Technical or Equipment Failure',
+    'Hull failure/failure of watertight doors/ports etc.': 'Technical or Equipment Failure',
+    'machinery damage': 'Technical or Equipment Failure',
+    'Machinery damage': 'Technical or Equipment Failure',
+    'Machinery dammage': 'Technical or Equipment Failure',
+    'macihnery damage': 'Technical or Equipment Failure',
+    'Technical failure': 'Technical or Equipment Failure',
+    # Navigation or Maneuvering
+    'Capsizing.listing': 'Navigation or Maneuvering',
+    'Capsizing/listing': 'Navigation or Maneuvering',
+    'collision': 'Navigation or Maneuvering',
+    'Collision': 'Navigation or Maneuvering',
+    'contact': 'Navigation or Maneuvering',
+    'Contact': 'Navigation or Maneuvering',
+    'Flooding/Foundering': 'Navigation or Maneuvering',
+    'grounding': 'Navigation or Maneuvering',
+    'Grounding': 'Navigation or Maneuvering',
+    'Grounding/stranding': 'Navigation or Maneuvering',
+    'Loss of control': 'Navigation or Maneuvering',
+    'stranding.grounding': 'Navigation or Maneuvering',
+    'Stranding.grounding': 'Navigation or Maneuvering',
+    'stranding/grounding': 'Navigation or Maneuvering',
+    'Stranding/grounding': 'Navigation or Maneuvering',
+    'Tilt / crash': 'Navigation or Maneuvering',
+    'Navigation or Maneuvering Incident': 'Navigation or Maneuvering',
+    # Fire or Explosion
+    'Fire': 'Fire or Explosion',
+    'Fire . explosion': 'Fire or Explosion',
+    'Fire/Explosion': 'Fire or Explosion',
+    'Fire or explosion': 'Fire or Explosion',
+    # Life-saving Equipment
+    'Accidents with life-saving appliances': 'Life-saving Equipment',
+    'Related to the use of rescue equipment': 'Life-saving Equipment',
+    'Life-saving Equipment Incident': 'Life-saving Equipment',
+    # Other
+    'n.i.': 'Other',
+    'other': 'Other',
+    "other (unsealing the vessel's hull)": 'Other',
+    'Other reason': 'Other',
+    'Other type': 'Other',
+    'Physical damage': 'Other',
+    'Sunk': 'Other',
+    'v.serious accident': 'Other'
+}
+
+# Distances des zones géographiques (mètres, projection METRIC_CRS)
+METRIC_CRS = "EPSG:3857"
+BUFFER_DISTANCES = {
+    "port": 3000,        # 3 km
+    "approach": 10000,   # 10 km
+    "coast": 20000       # 20 km
+}
+
+# Classification de l'emplacement (règles ordonnées, la première vraie l'emporte)
+LOCATION_RULES = [
+    ("Port", compare("is_port", "==", True)),
+    ("Port approach", compare("is_port_approach", "==", True)),
+    ("Sea", compare("is_coastal", "==", True))
+]
+LOCATION_DEFAULT = "Open sea"
+
+# Index spatial des ports et des terres, mis en cache tant que leurs couches sont inchangées
+LOCATION_INDEX_NAME = "shipping_accidents_location_index.pkl"
+LOCATION_INDEX_SOURCES = ["lands.parquet", "ports.parquet"]
+
+# Couches converties en GeoParquet (voir pipeline.geo) et leur CRS cible : les accidents
+# en coordonnées GPS, les ports et les terres directement en projection métrique
+GEO_LAYERS = {
+    "Shipping_Accidents": "EPSG:4326",
+    "lands": METRIC_CRS,
+    "ports": METRIC_CRS
+}
+
+LOCATION_CODES = {
+    "Port": "P",
+    "Port approach": "A",
+    "Sea": "S",
+    "Open sea": "O"
+}
+
+# Seuil de suppression des colonnes trop vides
+SPARSE_THRESHOLD = 0.85
+
+# Colonnes encore trop incomplètes après nettoyage
+INCOMPLETE_COLUMNS = [
+    "CauseDetai", "CrewIceTra", "HumanEleme", "Sh2Size_gt",
+    "Sh2_Categ", "Acc_Detail", "Sh1_Hull", "Date"
+]
+
+# Regroupement des dégâts par mots-clés (règles ordonnées, la première vraie l'emporte)
+DAMAGE_RULES = [
+    ("Aucun", any_of(isna("Damage_clean"), isin("Damage_clean", ["non renseigné", "no damage", "0", "n.i."]))),
+    ("Mineur", contains_any("Damage_clean", ["minor", "light", "scratches", "superficial"])),
+    ("Modéré", contains_any("Damage_clean", ["damage", "fracture", "hull", "propeller", "fire"])),
+    ("Sévère", contains_any("Damage_clean", ["severe", "flood", "sinking", "explosion", "total", "major"]))
+]
+DAMAGE_DEFAULT = "Inconnu"
+
+POLLUTION_LABELS = {
+    "yes": "Oui",
+    "oui": "Oui",
+    "no": "Non",
+    "non": "Non",
+    "n.i.": "Non précisé",
+    "no information": "Non précisé",
+    "unknown": "Non précisé"
+}
+
+POLLUTION_QUALITY_LABELS = {
+    "Partiel": "Partiel",
+    "Partielle": "Partiel",
+    "Fiable": "Fiable",
+    "Reliable": "Fiable",
+    "Non renseigné": None,
+    "Non renseignée": None,
+    "": None,
+    None: None
+}
+
+TIME_PERIOD_LABELS = {
+    "Matin": "Matin",
+    "Morning": "Matin",
+    "Après-midi": "Après-midi",
+    "Apres-midi": "Après-midi",
+    "Après Midi": "Après-midi",
+    "Soir": "Soir",
+    "Evening": "Soir",
+    "Nuit": "Nuit",
+    "Night": "Nuit",
+    "": None,
+    None: None
+}
+
+# Pondérations métier du Risk_Score
+RISK_WEIGHTS = {'Damage_Severe': 0.5, 'Pollution_Score': 0.35, 'Ship_Profile_Score': 0.15}
+
+ACC_TYPE_FR = {
+    "Technical or Equipment Failure": "Défaillance technique ou équipement",
+    "Navigation or Maneuvering": "Erreur de navigation ou de manœuvre",
+    "Fire or Explosion": "Incendie ou explosion",
+    "Life-saving Equipment": "Équipement de sauvetage",
+    "Pollution": "Pollution",
+    "Other": "Autre"
+}
+
+EXPORT_COLUMNS = [
+    "Unique_ID",
+    "Year", "Location", "Geo_Zone", "Geo_Latitude_Zone", "Geo_Longitude_Zone",
+    "Damage_Class", "Damage_Severe", "Pollution_Score", "Pollution_Qualité", "Risk_Score", "Risk_Class",
+    "Ship_Profile_Score", "Ship_Profile_Class", "Sh1Size_gt_clean",
+    "Time_Period", "Decade",
+    "Acc_Type", "Cargo_Type", "Colli_Type", "Assistance",
+    "Latitude", "Longitude"
+]
+
+# Schéma typé pour la version colonnaire
+# (Geo_Latitude_Zone / Geo_Longitude_Zone restent en texte : concaténées dans le dashboard)
+EXPORT_DTYPES = {
+    "Year": "int16",
+    "Decade": "int16",
+    "Location": "category",
+    "Geo_Zone": "category",
+    "Damage_Class": "category",
+    "Damage_Severe": "int8",
+    "Pollution_Qualité": "category",
+    "Risk_Class": "category",
+    "Ship_Profile_Class": "category",
+    "Time_Period": "category",
+    "Acc_Type": "category",
+    "Cargo_Type": "category",
+    "Colli_Type": "category",
+    "Assistance": "category"
+}
+
+
+def filter_records(df):
+    """Accidents de START_YEAR à END_YEAR, coordonnées renseignées et non nulles, types regroupés."""
+    df = df[(df['Year'] >= START_YEAR) & (df['Year'] <= END_YEAR)]
+    df = df[~((df['Longitude'].isnull()) | (df['Latitude'].isnull()) | (df['Longitude'] == 0) | (df['Latitude'] == 0))].copy()
+    df['Acc_Type'] = df['Acc_Type'].replace(ACC_TYPE_GROUPS).fillna('Other')
+    return df
+
+
+def build_location_index(lands, ports):
+    """Index STRtree des ports et des terres, en projection métrique (METRIC_CRS)."""
+    from shapely import STRtree
+
+    for layer in [lands, ports]:
+        if layer.crs is None:
+            layer.set_crs("EPSG:4326", inplace=True)
+    return {
+        "ports": STRtree(ports.to_crs(METRIC_CRS).geometry.to_numpy()),
+        "lands": STRtree(lands.to_crs(METRIC_CRS).geometry.to_numpy())
+    }
+
+
+def load_location_index(geo_dir, cache_dir=None):
+    """Index des ports et des terres, relu depuis `cache_dir` tant que leurs couches sont inchangées.
+
+    Les couches sont lues en GeoParquet (voir `pipeline.geo.convert_layers`), déjà en
+    METRIC_CRS ; le cache (pickle) évite en plus de les relire : seul l'arbre est
+    reconstruit au chargement.
+    """
+    geo_dir = Path(geo_dir)
+    sources = {name: sha256_of(geo_dir / name) for name in LOCATION_INDEX_SOURCES}
+    cache_path = Path(cache_dir) / LOCATION_INDEX_NAME if cache_dir else None
+
+    if cache_path and cache_path.exists():
+        with open(cache_path, "rb") as f:
+            cached = pickle.load(f)
+        if cached["sources"] == sources and cached["crs"] == METRIC_CRS:
+            return cached["index"]
+
+    index = build_location_index(read_layer(geo_dir, "lands"), read_layer(geo_dir, "ports"))
+    if cache_path:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_suffix(".tmp")
+        with open(tmp_path, "wb") as f:
+            pickle.dump({"sources": sources, "crs": METRIC_CRS, "index": index}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    return index
+
+
+def classify_location(df, index):
+    """Emplacement de chaque accident : Port, Port approach, Sea (côtier) ou Open sea.
+
+    Requêtes de distance sur l'index (voir `load_location_index`) : distance au port
+    le plus proche (bornée au rayon d'approche) et présence d'une terre à moins de
+    BUFFER_DISTANCES["coast"], en projection métrique.
+    """
+    import geopandas as gpd
+
+    gdf_proj = gpd.GeoDataFrame(df, geometry="geometry", crs="EPSG:4326").to_crs(METRIC_CRS)
+    points = gdf_proj.geometry.to_numpy()
+
+    # a) / b) Distance au port le plus proche (inf au-delà du rayon d'approche)
+    (point_idx, _), distances = index["ports"].query_nearest(
+        points, max_distance=BUFFER_DISTANCES["approach"], return_distance=True
+    )
+    port_distance = np.full(len(points), np.inf)
+    np.minimum.at(port_distance, point_idx, distances)
+
+    # c) Zone côtière : au moins une terre à moins de 20 km
+    coastal_idx, _ = index["lands"].query(points, predicate="dwithin", distance=BUFFER_DISTANCES["coast"])
+    is_coastal = np.zeros(len(points), dtype=bool)
+    is_coastal[coastal_idx] = True
+
+    flags = pd.DataFrame({
+        "is_port": port_distance <= BUFFER_DISTANCES["port"],
+        "is_port_approach": port_distance <= BUFFER_DISTANCES["approach"],
+        "is_coastal": is_coastal
+    }, index=gdf_proj.index)
+    return classify(flags, LOCATION_RULES, default=LOCATION_DEFAULT)
+
+
+def drop_sparse_columns(df, threshold=SPARSE_THRESHOLD):
+    """Supprime les colonnes dont la part de valeurs manquantes dépasse `threshold`. Retourne (df, colonnes supprimées)."""
+    cols_to_drop = df.columns[df.isnull().mean() > threshold]
+    return df.drop(columns=cols_to_drop), list(cols_to_drop)
+
+
+def clean_text_columns(df):
+    """Nettoyage (espaces, casse) et remplissage des colonnes texte critiques."""
+    df = df.copy()
+    df["Damage"] = (
+        df["Damage"]
+        .str.strip().str.title()
+        .replace({"Not Known": None, "Unknown": None, "": None})
+        .fillna("Non renseigné")
+    )
+    df["Pollu_t"] = (
+        df["Pollu_t"]
+        .str.strip().str.lower()
+        .replace({"not known": None, "unknown": None, "": None})
+        .fillna("non précisé")
+    )
+    df["Cause_Sh1"] = (
+        df["Cause_Sh1"]
+        .str.strip().str.capitalize()
+        .replace({"": None})
+        .fillna("Non précisé")
+    )
+    df["Pilot_Sh1"] = (
+        df["Pilot_Sh1"]
+        .str.strip().str.lower()
+        .replace({"not known": None, "unknown": None, "": None})
+        .fillna("inconnu")
+    )
+    df["Assistance"] = df["Assistance"].str.strip().str.capitalize().fillna("Non renseigné")
+    df["Ship1_Name"] = df["Ship1_Name"].str.strip().str.upper().fillna("NON RENSEIGNE")
+    for col in ["Colli_Type", "Cargo_Type", "IceCondit", "Sh1_Type"]:
+        df[col] = df[col].str.strip().str.title().fillna("Non précisé")
+    return df.drop(columns=INCOMPLETE_COLUMNS)
+
+
+def extract_number(values):
+    """Premier nombre d'un texte ("1,5 t" -> 1.5), NaN sinon."""
+    return pd.to_numeric(values.astype(str).str.replace(",", ".").str.extract(r"([\d.]+)")[0], errors="coerce")
+
+
+def draught_value(x):
+    """Tirant d'eau en float si numérique, "Non précisé" sinon."""
+    return float(x) if str(x).replace('.', '', 1).isdigit() else "Non précisé"
+
+
+def time_of_day(time_str):
+    """Période de la journée d'une heure "HH:MM:SS AM/PM" (None si illisible)."""
+    try:
+        t = datetime.datetime.strptime(time_str, "%I:%M:%S %p").time()
+    except (TypeError, ValueError):
+        return None
+    if datetime.time(6, 0) <= t < datetime.time(12, 0):
+        return "Matin"
+    if datetime.time(12, 0) <= t < datetime.time(18, 0):
+        return "Après-midi"
+    if datetime.time(18, 0) <= t < datetime.time(22, 0):
+        return "Soir"
+    return "Nuit"
+
+
+def add_features(df):
+    """Variables dérivées : décennie, dégâts, pollution, profil du navire, période, zone géographique."""
+    df = df.copy()
+    df["Decade"] = (df["Year"] // 10) * 10
+    df["Damage_Severe"] = df["Damage"].isin(["Severe Damage", "Total Loss"]).astype(int)
+    df["Location_Code"] = df["Location"].map(LOCATION_CODES)
+
+    # Tirant d'eau : valeur brute conservée, conversion avec repli texte
+    df["Sh1Draug_raw"] = df["Sh1Draug_m"]
+    df["Sh1Draug_m"] = map_unique(df["Sh1Draug_m"].replace("n.i.", "Non précisé"), draught_value)
+
+    df["Damage_clean"] = df["Damage"].str.strip().str.lower()
+    df["Damage_Class"] = classify(df, DAMAGE_RULES, default=DAMAGE_DEFAULT)
+
+    df["Pollution"] = df["Pollution"].str.strip().str.lower().replace(POLLUTION_LABELS)
+    df["Pollution_Binaire"] = map_unique(df["Pollution"], lambda x: 1 if x == "Oui" else 0 if x == "Non" else None)
+
+    # Volume de pollution : somme tonnes + m3, fiable seulement si les deux sont connus
+    df["Pollu_t_clean"] = extract_number(df["Pollu_t"])
+    df["Pollu_m3_clean"] = extract_number(df["Pollu_m3"])
+    df["Pollution_Score"] = df["Pollu_t_clean"].fillna(0) + df["Pollu_m3_clean"].fillna(0)
+    df["Pollution_Score_Complet"] = df[["Pollu_t_clean", "Pollu_m3_clean"]].notnull().all(axis=1).astype(int)
+    df["Pollution_Score_Weighted"] = df["Pollution_Score"] * df["Pollution_Score_Complet"]
+    df["Pollution_Qualité"] = df["Pollution_Score_Complet"].map({1: "Fiable", 0: "Partiel"})
+
+    # Taille du navire (< 3000 : Petit, < 15000 : Moyen, sinon Grand ; taille inconnue : Inconnu)
+    df["Sh1Size_gt_clean"] = extract_number(df["Sh1Size_gt"])
+    df["Ship_Profile_Score"] = df["Sh1Size_gt_clean"].fillna(0)
+    df["Ship_Profile_Class"] = bin_thresholds(
+        df["Sh1Size_gt_clean"], [3000, 15000], ["Petit", "Moyen", "Grand"], na_label="Inconnu"
+    )
+
+    df["Time_Period"] = map_unique(df["Time"], time_of_day)
+
+    # Latitude : < 56 Sud, [56, 59[ Centre, sinon Nord ; Longitude : < 12 Ouest, [12, 18[ Centre, sinon Est
+    df["Geo_Latitude_Zone"] = bin_thresholds(df["Latitude"], [56, 59], ["Sud", "Centre", "Nord"])
+    df["Geo_Longitude_Zone"] = bin_thresholds(df["Longitude"], [12, 18], ["Ouest", "Centre", "Est"])
+    df["Geo_Zone"] = df["Geo_Latitude_Zone"] + "-" + df["Geo_Longitude_Zone"]
+
+    # Uniformisation des libellés
+    df["Pollution_Qualité"] = df["Pollution_Qualité"].str.strip().str.capitalize().replace(POLLUTION_QUALITY_LABELS)
+    df["Time_Period"] = df["Time_Period"].str.strip().str.capitalize().replace(TIME_PERIOD_LABELS)
+    return df
+
+
+def add_risk_score(df):
+    """Risk_Score (0-10, variables normalisées et pondérées) et Risk_Class par quartiles.
+
+    Retourne (df, quantiles du score).
+    """
+    df = df.copy()
+    features = df[list(RISK_WEIGHTS)].fillna(0)
+    features_scaled = pd.DataFrame(MinMaxScaler().fit_transform(features), columns=features.columns)
+    df['Risk_Score'] = sum(w * features_scaled[col] for col, w in RISK_WEIGHTS.items()) * 10
+
+    # Classes équilibrées, bornes incluses à droite : score <= q1 Low, <= q2 Medium, <= q3 High, sinon Critical
+    q = df['Risk_Score'].quantile([0, 0.25, 0.5, 0.75, 1]).values
+    df['Risk_Class'] = bin_thresholds(df['Risk_Score'], q[1:4], ['Low', 'Medium', 'High', 'Critical'], right=True)
+    return df, q
+
+
+def export(df, cleaned_dir):
+    """Traduit les types d'accident, écrit le CSV, le Parquet typé et le résumé JSON. Retourne le résumé."""
+    cleaned_dir = Path(cleaned_dir)
+    df = df.copy()
+    df["Acc_Type"] = df["Acc_Type"].replace(ACC_TYPE_FR)
+    df_filtered = pd.DataFrame(df[EXPORT_COLUMNS]).astype(EXPORT_DTYPES)
+
+    df_filtered.to_csv(cleaned_dir / "shipping_accidents_cleaned.csv", index=False)
+    df_filtered.to_parquet(cleaned_dir / "shipping_accidents_cleaned.parquet", index=False)
+
+    # KPI + effectifs par type d'accident, triés
+    summary = {
+        "kpi": int(len(df_filtered)),
+        "counts": {str(k): int(v) for k, v in df_filtered["Acc_Type"].value_counts().items()}
+    }
+    with open(cleaned_dir / "shipping_accidents_cleaned_summary.json", "w", encoding="utf-8") as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+    return summary
+
+
+def clean_shipping(geo_dir, cleaned_dir, cache_dir=None):
+    """Chaîne complète depuis le dossier des couches GeoParquet (accidents, terres, ports).
+
+    `cache_dir` : dossier du cache de l'index spatial (pas de cache si None).
+    """
+    # Couche des accidents déjà en EPSG:4326
+    df = filter_records(read_layer(geo_dir, "Shipping_Accidents"))
+    df["Location"] = classify_location(df, load_location_index(geo_dir, cache_dir)).to_numpy()
+
+    df, _ = drop_sparse_columns(df)
+    df = add_features(clean_text_columns(df))
+    df, _ = add_risk_score(df)
+    return export(df, cleaned_dir)
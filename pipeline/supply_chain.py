@@ -0,0 +1,74 @@
+"""Nettoyage du dataset Supply Chain (risque et fiabilité des fournisseurs).
+
+Étapes partagées avec `notebooks/EDA_Supply_chain_dataset.ipynb` : le notebook les
+appelle au fil de l'exploration, `clean_supply_chain` les enchaîne sans graphique.
+"""
+from pathlib import Path
+
+import pandas as pd
+
+from pipeline.archives import open_source
+
+CSV_MEMBER = "dynamic_supply_chain_logistics_dataset_with_country.csv"
+
+# Bornes théoriques (None : pas de borne) pour éviter des fuites de valeurs aberrantes
+BOUNDS = {
+    'route_risk_level': (0, 10),
+    'disruption_likelihood_score': (0, 1),
+    'delay_probability': (0, 1),
+    'supplier_reliability_score': (0, 1),
+    'lead_time_days': (0, None),  # pas de max fixé
+    'delivery_time_deviation': (None, None)  # pas de bornage ici, signe important
+}
+
+# Colonnes essentielles du livrable final
+EXPORT_COLUMNS = [
+    'product_id', 'supplier_id', 'supplier_country',
+    'route_risk_level',
+    'disruption_likelihood_score',
+    'delay_probability',
+    'delivery_time_deviation',
+    'lead_time_days',
+    'supplier_reliability_score',
+    'Risk_Score',
+    'Resilience_Index'
+]
+
+
+def clip_bounds(df):
+    """Ramène les indicateurs clés dans leurs bornes théoriques (BOUNDS)."""
+    df = df.copy()
+    for col, (min_val, max_val) in BOUNDS.items():
+        df[col] = df[col].clip(lower=min_val, upper=max_val)
+    return df
+
+
+def add_scores(df):
+    """Ajoute Risk_Score (pondérations égales) et Resilience_Index."""
+    df = df.copy()
+    df['route_risk_level_norm'] = df['route_risk_level'] / 10
+    df['delivery_time_deviation_norm'] = df['delivery_time_deviation'] / 10
+    df['Risk_Score'] = (
+        0.25 * df['route_risk_level_norm'] +
+        0.25 * df['disruption_likelihood_score'] +
+        0.25 * df['delay_probability'] +
+        0.25 * df['delivery_time_deviation_norm']
+    )
+    df['Resilience_Index'] = df['supplier_reliability_score'] * (1 - df['Risk_Score'])
+    return df
+
+
+def export(df, cleaned_dir):
+    """Écrit le CSV et le Parquet typé (pays en catégorie) des colonnes finales."""
+    cleaned_dir = Path(cleaned_dir)
+    df_final = df[EXPORT_COLUMNS].astype({'supplier_country': 'category'})
+    df_final.to_csv(cleaned_dir / "supply_chain_cleaned.csv", index=False)
+    df_final.to_parquet(cleaned_dir / "supply_chain_cleaned.parquet", index=False)
+    return df_final
+
+
+def clean_supply_chain(raw_path, cleaned_dir, member=CSV_MEMBER):
+    """Chaîne complète : lecture (dans l'archive si `member`), bornage, scores, export."""
+    with open_source(raw_path, member) as f:
+        df = pd.read_csv(f)
+    return export(add_scores(clip_bounds(df)), cleaned_dir)
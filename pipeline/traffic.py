@@ -0,0 +1,340 @@
+"""Nettoyage en flux du dataset US Accidents (≈ 3 Go, 7,7 millions de lignes).
+
+Le CSV brut est lu par blocs (directement dans l'archive ZIP si besoin) dont la taille est déduite d'un budget mémoire : aucune
+étape ne charge le fichier entier. Chaque bloc est nettoyé (règles déclarées ici et
+partagées avec `notebooks/EDA_Accident_Traffic.ipynb`), dédoublonné sur `ID` puis écrit
+aussitôt : une partie Parquet par bloc dans `usa_accidents_traffic_cleaned.parquet/` et
+un ajout au CSV. Le cube d'agrégats, la pyramide de tuiles de la carte et le résumé
+de la page d'accueil sont accumulés au fil des blocs.
+"""
+import json
+import os
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from pipeline.archives import member_size, open_source
+from pipeline.rules import all_of, classify, compare, contains_any, isin
+
+# Colonnes du CSV brut réellement utilisées par le nettoyage
+RAW_COLUMNS = ["ID", "Severity", "Start_Time", "End_Time", "Start_Lat", "Start_Lng", "Weather_Condition"]
+RAW_DTYPES = {"ID": str, "Start_Time": str, "End_Time": str, "Weather_Condition": str}
+
+# Durée maximale conservée (2 jours)
+MAX_DURATION_MIN = 2880
+
+# Conditions météo risquées (recherche par mot-clé, insensible à la casse) pour le Risk_Score
+RISKY_WEATHER_KEYWORDS = ['Rain', 'Snow', 'Thunderstorm', 'Fog', 'Heavy Rain', 'Heavy Snow', 'Blowing Snow']
+WEATHER_RISK = contains_any('Weather_Condition', RISKY_WEATHER_KEYWORDS, case=False)
+
+# Catégories de risque logistique, évaluées dans l'ordre (la première vraie l'emporte)
+RISK_CATEGORY_RULES = [
+    ('High Infrastructure Block', all_of(compare('Severity', '>=', 3), compare('Duration(min)', '>', 120))),
+    ('Weather Disruption', isin('Weather_Condition', ['Heavy Rain', 'Snow', 'Thunderstorm', 'Fog'])),
+    ('Peak Hour Congestion', isin('HourOfDay', list(range(7, 10)) + list(range(16, 20))))
+]
+RISK_CATEGORY_DEFAULT = 'Low Impact'
+RISK_CATEGORIES = [name for name, _ in RISK_CATEGORY_RULES] + [RISK_CATEGORY_DEFAULT]
+
+# Regroupement des conditions météo dominantes (les autres libellés sont conservés)
+MAIN_WEATHER = {
+    'Heavy Rain': 'Rain',
+    'Light Rain': 'Rain',
+    'Heavy Snow': 'Snow',
+    'Blowing Snow': 'Snow',
+    'Thunderstorm': 'Thunderstorm',
+    'Fog': 'Fog'
+}
+
+# Schéma de sortie : identique d'un bloc à l'autre pour que les parties Parquet se relisent ensemble
+OUTPUT_SCHEMA = pa.schema([
+    ("ID", pa.string()),
+    ("Start_Time", pa.timestamp("ns")),
+    ("Start_Lat", pa.float32()),
+    ("Start_Lng", pa.float32()),
+    ("Severity", pa.int8()),
+    ("Duration(min)", pa.float32()),
+    ("Risk_Score", pa.float32()),
+    ("Resilience_Index", pa.float32()),
+    ("Risk_Category", pa.dictionary(pa.int32(), pa.string())),
+    ("Main_Weather", pa.dictionary(pa.int32(), pa.string())),
+    ("Year", pa.int16()),
+    ("Month", pa.int8()),
+    ("DayOfWeek", pa.int8()),
+    ("HourOfDay", pa.int8())
+])
+OUTPUT_DTYPES = {
+    "Start_Lat": "float32",
+    "Start_Lng": "float32",
+    "Severity": "int8",
+    "Duration(min)": "float32",
+    "Risk_Score": "float32",
+    "Resilience_Index": "float32",
+    "Risk_Category": "category",
+    "Main_Weather": "category",
+    "Year": "int16",
+    "Month": "int8",
+    "DayOfWeek": "int8",
+    "HourOfDay": "int8"
+}
+CUBE_KEYS = ['Risk_Category', 'Main_Weather', 'HourOfDay', 'DayOfWeek', 'Month']
+
+# Pyramide de tuiles de la carte : pas des grilles (degrés), de la vue nationale à la vue locale.
+# Une tuile est repérée par sa ligne et sa colonne dans la grille de son pas
+TILE_STEPS = [1.0, 0.25, 0.05]
+TILE_KEYS = ['Step', 'Row', 'Col', 'Risk_Category']
+# Lignes par groupe Parquet : les tuiles triées par pas et latitude se lisent par emprise
+TILE_ROW_GROUP = 50_000
+
+# Facteur entre la taille d'un bloc brut en mémoire et le pic atteint pendant son nettoyage
+# (dates parsées, colonnes intermédiaires, copie typée pour l'écriture)
+CHUNK_OVERHEAD = 4
+SAMPLE_ROWS = 10_000
+MIN_CHUNK_ROWS = 10_000
+
+
+def estimate_chunk_rows(raw_path, memory_budget_mb, member=None):
+    """Nombre de lignes par bloc pour rester sous `memory_budget_mb`.
+
+    La taille d'une ligne est mesurée sur un échantillon. L'ensemble des ID déjà vus
+    (8 octets par ligne, doublé pendant la fusion) est réservé sur le budget.
+    """
+    with open_source(raw_path, member) as f:
+        sample = pd.read_csv(f, usecols=RAW_COLUMNS, dtype=RAW_DTYPES, nrows=SAMPLE_ROWS)
+    row_bytes = sample.memory_usage(deep=True).sum() / max(len(sample), 1)
+
+    with open_source(raw_path, member) as f:
+        f.readline()
+        sample_bytes = sum(len(f.readline()) for _ in range(SAMPLE_ROWS))
+    raw_size = member_size(raw_path, member) if member else os.path.getsize(raw_path)
+    estimated_rows = raw_size / max(sample_bytes / SAMPLE_ROWS, 1)
+    id_reserve = estimated_rows * 8 * 2
+
+    budget = memory_budget_mb * 1024 ** 2 - id_reserve
+    return max(MIN_CHUNK_ROWS, int(budget // (row_bytes * CHUNK_OVERHEAD)))
+
+
+class SeenIds:
+    """Ensemble des ID déjà écrits, stocké comme tableau trié de hachés 64 bits.
+
+    ≈ 60 Mo pour 7,7 millions d'ID (contre plusieurs centaines de Mo pour un set de
+    chaînes). Le risque de collision sur 64 bits est négligeable à cette échelle.
+    """
+
+    def __init__(self):
+        self.hashes = np.empty(0, dtype=np.uint64)
+
+    def keep_new(self, ids):
+        """Masque des lignes à garder : première occurrence dans le bloc et ID jamais vu."""
+        hashes = pd.util.hash_array(ids.to_numpy(dtype=object))
+        first_in_chunk = ~pd.Series(hashes).duplicated().to_numpy()
+
+        if len(self.hashes):
+            pos = np.searchsorted(self.hashes, hashes).clip(max=len(self.hashes) - 1)
+            already_seen = self.hashes[pos] == hashes
+        else:
+            already_seen = np.zeros(len(hashes), dtype=bool)
+
+        keep = first_in_chunk & ~already_seen
+        # Seuls les nouveaux hachés sont triés, puis insérés à leur place dans le tableau existant
+        new = np.sort(hashes[keep])
+        self.hashes = np.insert(self.hashes, np.searchsorted(self.hashes, new), new)
+        return keep
+
+
+def clean_chunk(chunk):
+    """Applique les règles de nettoyage du notebook à un bloc brut et renvoie le bloc typé."""
+    chunk = chunk.copy()
+    chunk['Start_Time'] = pd.to_datetime(chunk['Start_Time'], format='ISO8601', errors='coerce')
+    chunk['End_Time'] = pd.to_datetime(chunk['End_Time'], format='ISO8601', errors='coerce')
+    chunk = chunk.dropna(subset=['Start_Time', 'End_Time'])
+
+    chunk['Duration(min)'] = (chunk['End_Time'] - chunk['Start_Time']).dt.total_seconds() / 60
+    chunk = chunk[chunk['Duration(min)'] <= MAX_DURATION_MIN].copy()
+
+    start = chunk['Start_Time'].dt
+    chunk['Year'] = start.year
+    chunk['Month'] = start.month
+    chunk['DayOfWeek'] = start.dayofweek
+    chunk['HourOfDay'] = start.hour
+
+    # Risk_Score : gravité, durée et météo normalisées sur [0, 1], à parts égales
+    severity_norm = (chunk['Severity'] - 1) / 3
+    duration_norm = (chunk['Duration(min)'] / MAX_DURATION_MIN).clip(0, 1)
+    weather_risk = WEATHER_RISK(chunk).astype(int)
+    chunk['Risk_Score'] = (severity_norm + duration_norm + weather_risk) / 3
+    chunk['Resilience_Index'] = 1 - chunk['Risk_Score']
+
+    chunk['Risk_Category'] = classify(chunk, RISK_CATEGORY_RULES, default=RISK_CATEGORY_DEFAULT)
+    chunk['Main_Weather'] = chunk['Weather_Condition'].replace(MAIN_WEATHER).fillna('Clear')
+
+    return chunk[OUTPUT_SCHEMA.names].astype(OUTPUT_DTYPES)
+
+
+def aggregate_chunk(chunk):
+    """Agrégats additifs d'un bloc (effectifs et sommes), fusionnés ensuite en cube."""
+    sums = chunk[CUBE_KEYS].assign(
+        Count=1,
+        Risk_Score_sum=chunk['Risk_Score'].astype('float64'),
+        Duration_sum=chunk['Duration(min)'].astype('float64')
+    )
+    return sums.groupby(CUBE_KEYS, observed=True).sum().reset_index()
+
+
+def aggregate_tiles(chunk):
+    """Agrégats additifs d'un bloc par tuile (pas, ligne, colonne) et Risk_Category."""
+    located = chunk.dropna(subset=['Start_Lat', 'Start_Lng'])
+    lat = located['Start_Lat'].astype('float64')
+    lng = located['Start_Lng'].astype('float64')
+    category = pd.Categorical(located['Risk_Category'], categories=RISK_CATEGORIES)
+    levels = [
+        pd.DataFrame({
+            'Step': step,
+            'Row': np.floor(lat / step).astype('int32'),
+            'Col': np.floor(lng / step).astype('int32'),
+            'Risk_Category': category,
+            'Count': 1,
+            'Risk_Score_sum': located['Risk_Score'].astype('float64')
+        })
+        for step in TILE_STEPS
+    ]
+    return merge_tiles(levels)
+
+
+def merge_tiles(parts):
+    """Fusionne des agrégats de tuiles (sommes par TILE_KEYS)."""
+    return pd.concat(parts, ignore_index=True).groupby(TILE_KEYS, observed=True).sum().reset_index()
+
+
+def finalize_tiles(tiles):
+    """Une ligne par tuile : centre, effectif, Risk_Score moyen et Risk_Category dominante."""
+    cell = ['Step', 'Row', 'Col']
+    totals = tiles.groupby(cell)[['Count', 'Risk_Score_sum']].sum()
+    dominant = (
+        tiles.sort_values('Count', ascending=False, kind='stable')
+        .drop_duplicates(cell)
+        .set_index(cell)['Risk_Category']
+    )
+    tiles = totals.join(dominant).reset_index()
+    tiles['Latitude'] = ((tiles['Row'] + 0.5) * tiles['Step']).round(6)
+    tiles['Longitude'] = ((tiles['Col'] + 0.5) * tiles['Step']).round(6)
+    tiles['Risk_Score'] = tiles['Risk_Score_sum'] / tiles['Count']
+    return (
+        tiles[['Step', 'Latitude', 'Longitude', 'Count', 'Risk_Score', 'Risk_Category']]
+        .sort_values(['Step', 'Latitude', 'Longitude'], ignore_index=True)
+        .astype({'Count': 'int64', 'Risk_Score': 'float32'})
+    )
+
+
+def replace_path(staging, target):
+    """Remplace `target` (fichier ou dossier) par `staging` une fois l'écriture terminée."""
+    if target.is_dir():
+        shutil.rmtree(target)
+    elif target.exists():
+        target.unlink()
+    os.replace(staging, target)
+
+
+def clean_traffic(raw_path, cleaned_dir, memory_budget_mb=2048, chunk_rows=None, member=None):
+    """Nettoie le CSV brut US Accidents en flux et écrit les sorties dans `cleaned_dir`.
+
+    Avec `member`, `raw_path` est l'archive ZIP et le CSV `member` y est lu en flux,
+    sans extraction préalable.
+
+    Sorties :
+    - usa_accidents_traffic_cleaned.parquet/ : une partie Parquet par bloc ;
+    - usa_accidents_traffic_cleaned.csv ;
+    - usa_accidents_traffic_cube.csv / .parquet : cube d'agrégats du dashboard ;
+    - usa_accidents_traffic_tiles.csv / .parquet : pyramide de tuiles de la carte (TILE_STEPS) ;
+    - usa_accidents_traffic_cleaned_summary.json : KPI de la page d'accueil.
+
+    Les fichiers sont d'abord écrits à côté (suffixe .tmp) puis mis en place à la fin :
+    un nettoyage interrompu ne laisse pas de sortie partielle.
+    """
+    raw_path = Path(raw_path)
+    cleaned_dir = Path(cleaned_dir)
+    cleaned_dir.mkdir(parents=True, exist_ok=True)
+
+    if chunk_rows is None:
+        chunk_rows = estimate_chunk_rows(raw_path, memory_budget_mb, member)
+    print(f"Nettoyage en flux : blocs de {chunk_rows:,} lignes (budget {memory_budget_mb} Mo)")
+
+    parquet_path = cleaned_dir / "usa_accidents_traffic_cleaned.parquet"
+    csv_path = cleaned_dir / "usa_accidents_traffic_cleaned.csv"
+    parquet_staging = cleaned_dir / "usa_accidents_traffic_cleaned.parquet.tmp"
+    csv_staging = cleaned_dir / "usa_accidents_traffic_cleaned.csv.tmp"
+    if parquet_staging.exists():
+        shutil.rmtree(parquet_staging)
+    parquet_staging.mkdir()
+
+    seen_ids = SeenIds()
+    partial_cubes = []
+    tiles = None
+    rows_in = rows_out = 0
+
+    with open_source(raw_path, member) as raw_file:
+        reader = pd.read_csv(raw_file, usecols=RAW_COLUMNS, dtype=RAW_DTYPES, chunksize=chunk_rows)
+        for part, raw_chunk in enumerate(reader):
+            rows_in += len(raw_chunk)
+            raw_chunk = raw_chunk[seen_ids.keep_new(raw_chunk['ID'])]
+            chunk = clean_chunk(raw_chunk)
+            rows_out += len(chunk)
+
+            table = pa.Table.from_pandas(chunk, schema=OUTPUT_SCHEMA, preserve_index=False)
+            pq.write_table(table, parquet_staging / f"part-{part:05d}.parquet")
+            chunk.to_csv(
+                csv_staging, mode="w" if part == 0 else "a", header=part == 0,
+                index=False, date_format='%Y-%m-%d %H:%M:%S'
+            )
+            partial_cubes.append(aggregate_chunk(chunk))
+            # Les tuiles fines sont nombreuses : fusionnées à chaque bloc plutôt qu'accumulées
+            chunk_tiles = aggregate_tiles(chunk)
+            tiles = chunk_tiles if tiles is None else merge_tiles([tiles, chunk_tiles])
+            print(f"  bloc {part} : {rows_out:,} lignes conservées / {rows_in:,} lues")
+
+    if rows_in == 0:
+        # Sorties précédentes laissées en place : un CSV vide signale une source tronquée
+        shutil.rmtree(parquet_staging)
+        csv_staging.unlink(missing_ok=True)
+        raise ValueError(f"Aucune ligne lue dans {raw_path}{f' ({member})' if member else ''}")
+
+    replace_path(parquet_staging, parquet_path)
+    replace_path(csv_staging, csv_path)
+
+    # Cube final : somme des agrégats partiels (les moyennes se recalculent en somme / effectif)
+    cube = (
+        pd.concat(partial_cubes, ignore_index=True)
+        .astype({'Risk_Category': 'object', 'Main_Weather': 'object'})
+        .groupby(CUBE_KEYS)[['Count', 'Risk_Score_sum', 'Duration_sum']]
+        .sum()
+        .reset_index()
+        .astype({
+            'Risk_Category': 'category',
+            'Main_Weather': 'category',
+            'HourOfDay': 'int8',
+            'DayOfWeek': 'int8',
+            'Month': 'int8'
+        })
+    )
+    cube.to_csv(cleaned_dir / "usa_accidents_traffic_cube.csv", index=False)
+    cube.to_parquet(cleaned_dir / "usa_accidents_traffic_cube.parquet", index=False)
+
+    tiles = finalize_tiles(tiles)
+    tiles.to_csv(cleaned_dir / "usa_accidents_traffic_tiles.csv", index=False)
+    tiles.to_parquet(cleaned_dir / "usa_accidents_traffic_tiles.parquet", index=False, row_group_size=TILE_ROW_GROUP)
+
+    category_counts = cube.groupby('Risk_Category', observed=True)['Count'].sum().sort_values(ascending=False)
+    summary = {
+        "kpi": int(rows_out),
+        "counts": {str(k): int(v) for k, v in category_counts.items()}
+    }
+    with open(cleaned_dir / "usa_accidents_traffic_cleaned_summary.json", "w", encoding="utf-8") as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+
+    print(f"Export fait : {parquet_path} ({part + 1} parties) + {csv_path}")
+    print(f"Lignes : {rows_out:,} conservées sur {rows_in:,} ({rows_in - rows_out:,} doublons ou invalides)")
+    return summary
@@ -58,7 +58,7 @@ subprocess.run([str(pip_exe), "install", "-r", str(BASE_DIR / "requirements.txt"
 print("Dépendances installées.")
 
 # --------------------------
-# [3/5] Orchestration DATA SOURCES
+# [3/5] Orchestration DATA SOURCES (un seul noyau : le nettoyage tourne dans les modules `pipeline`)
 try:
     import papermill as pm
 except ImportError:
@@ -102,7 +102,7 @@ if missing:
     print("❌ Certains datasets sont manquants après l'orchestration :")
     for f in missing:
         print(f" - {f}")
-    print("\nLance manuellement `data_pipeline.ipynb` pour corriger ou diagnostiquer.")
+    print("\nLance manuellement `data_pipeline.ipynb` (ou `python -m pipeline run`) pour corriger ou diagnostiquer.")
     sys.exit(1)
 else:
     print("Tous les datasets sont présents.")
@@ -0,0 +1,53 @@
+"""Garde-fou de taille des figures du dashboard (`dashboard/utils.py`)."""
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "dashboard"))
+
+from utils import figure_size, fit_figure  # noqa: E402
+
+BUDGET = 1e6
+
+
+def points(n=200_000, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "lat": rng.uniform(25, 49, n),
+        "lon": rng.uniform(-125, -66, n),
+        "year": rng.integers(2000, 2005, n),
+        "risk": rng.random(n)
+    })
+
+
+def check_under_budget(fig):
+    size = figure_size(fig)
+    assert size > BUDGET
+    fitted, actions = fit_figure(fig, size, BUDGET)
+    assert figure_size(fitted) < BUDGET
+    assert any("points écartés" in action for action in actions)
+    return fitted
+
+
+def test_scatter_map_is_sampled_under_budget():
+    fig = px.scatter_map(points(), lat="lat", lon="lon", hover_data=["risk"])
+    fitted = check_under_budget(fig)
+    trace = fitted.data[0]
+    # Toutes les propriétés point par point gardent la même longueur
+    assert len(trace.lat) == len(trace.lon) == len(trace.customdata)
+
+
+def test_animated_scatter_map_samples_every_frame():
+    fig = px.scatter_map(points(), lat="lat", lon="lon", animation_frame="year")
+    fitted = check_under_budget(fig)
+    assert len(fitted.frames) == len(fig.frames)
+    assert all(len(frame.data[0].lat) < len(original.data[0].lat) for frame, original in zip(fitted.frames, fig.frames))
+
+
+def test_svg_scatter_switches_to_webgl():
+    fig = px.scatter(points(), x="lon", y="lat", render_mode="svg")
+    fitted = check_under_budget(fig)
+    assert fitted.data[0].type == "scattergl"
@@ -0,0 +1,180 @@
+"""Règles vectorisées (`pipeline/rules.py`) comparées aux fonctions ligne à ligne des notebooks EDA."""
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pipeline.rules import bin_thresholds, classify, contains_any, isin, isna, map_unique  # noqa: E402
+from pipeline.shipping import DAMAGE_DEFAULT, DAMAGE_RULES  # noqa: E402
+from pipeline.traffic import RISK_CATEGORY_DEFAULT, RISK_CATEGORY_RULES, RISKY_WEATHER_KEYWORDS, WEATHER_RISK  # noqa: E402
+
+
+# --- Fonctions d'origine des notebooks (référence) ---
+
+def assign_risk_category(row):
+    if row['Severity'] >= 3 and row['Duration(min)'] > 120:
+        return 'High Infrastructure Block'
+    elif row['Weather_Condition'] in ['Heavy Rain', 'Snow', 'Thunderstorm', 'Fog']:
+        return 'Weather Disruption'
+    elif row['HourOfDay'] in range(7, 10) or row['HourOfDay'] in range(16, 20):
+        return 'Peak Hour Congestion'
+    else:
+        return 'Low Impact'
+
+
+def weather_risk(x):
+    return any([kw.lower() in str(x).lower() for kw in RISKY_WEATHER_KEYWORDS])
+
+
+def classify_damage(text):
+    if pd.isnull(text) or text in ["non renseigné", "no damage", "0", "n.i."]:
+        return "Aucun"
+    elif any(word in text for word in ["minor", "light", "scratches", "superficial"]):
+        return "Mineur"
+    elif any(word in text for word in ["damage", "fracture", "hull", "propeller", "fire"]):
+        return "Modéré"
+    elif any(word in text for word in ["severe", "flood", "sinking", "explosion", "total", "major"]):
+        return "Sévère"
+    else:
+        return "Inconnu"
+
+
+def categorize_ship_size(gt):
+    if pd.isna(gt):
+        return "Inconnu"
+    elif gt < 3000:
+        return "Petit"
+    elif gt < 15000:
+        return "Moyen"
+    else:
+        return "Grand"
+
+
+def categorize_latitude(lat):
+    if lat < 56:
+        return "Sud"
+    elif 56 <= lat < 59:
+        return "Centre"
+    else:
+        return "Nord"
+
+
+def categorize_longitude(lon):
+    if lon < 12:
+        return "Ouest"
+    elif 12 <= lon < 18:
+        return "Centre"
+    else:
+        return "Est"
+
+
+def risk_classification_quantile(score, q):
+    if score <= q[1]:
+        return "Low"
+    elif score <= q[2]:
+        return "Medium"
+    elif score <= q[3]:
+        return "High"
+    else:
+        return "Critical"
+
+
+# --- Comparaisons ---
+
+def test_risk_category_matches_row_wise():
+    cases = [
+        (severity, duration, weather, hour)
+        for severity in [2, 3, 4]
+        for duration in [120, 121, np.nan]
+        for weather in ["Heavy Rain", "Light Rain", "Snow", "snow", "Fog", "Clear", np.nan]
+        for hour in [6, 7, 9, 10, 16, 19, 20]
+    ]
+    df = pd.DataFrame(cases, columns=["Severity", "Duration(min)", "Weather_Condition", "HourOfDay"])
+    expected = df.apply(assign_risk_category, axis=1)
+    result = classify(df, RISK_CATEGORY_RULES, default=RISK_CATEGORY_DEFAULT)
+    pd.testing.assert_series_equal(result, expected, check_dtype=False, check_names=False)
+
+
+def test_weather_risk_is_case_insensitive():
+    df = pd.DataFrame({"Weather_Condition": [
+        "Rain", "LIGHT RAIN", "heavy snow", "Thunderstorms and Rain", "Patches of Fog",
+        "Blowing Snow / Windy", "Clear", "Overcast", "", np.nan
+    ]})
+    expected = df["Weather_Condition"].apply(weather_risk)
+    np.testing.assert_array_equal(np.asarray(WEATHER_RISK(df)), expected.to_numpy())
+
+
+def test_damage_class_matches_row_wise():
+    df = pd.DataFrame({"Damage_clean": [
+        np.nan, None, "non renseigné", "no damage", "0", "n.i.", "minor scratches", "light damage",
+        "hull breach", "propeller damage", "fire on deck", "severe flooding", "sinking", "total loss",
+        "major", "unknown", "", "Minor"
+    ]})
+    expected = df["Damage_clean"].apply(classify_damage)
+    result = classify(df, DAMAGE_RULES, default=DAMAGE_DEFAULT)
+    pd.testing.assert_series_equal(result, expected, check_dtype=False, check_names=False)
+
+
+def test_isin_and_isna_conditions():
+    df = pd.DataFrame({"x": ["a", "b", None, np.nan, "A", "ab"]})
+    assert list(isin("x", ["a", "b"])(df)) == [True, True, False, False, False, False]
+    assert list(isna("x")(df)) == [False, False, True, True, False, False]
+
+
+def test_contains_any_case_and_missing_values():
+    df = pd.DataFrame({"x": ["Heavy RAIN", "rain", "Fog", None, "a.b"]})
+    assert list(contains_any("x", ["rain"])(df)) == [False, True, False, False, False]
+    assert list(contains_any("x", ["rain"], case=False)(df)) == [True, True, False, False, False]
+    # Les mots-clés sont des littéraux, pas des expressions régulières
+    assert list(contains_any("x", ["."])(df)) == [False, False, False, False, True]
+
+
+def test_ship_size_with_na_label_matches_row_wise():
+    gt = pd.Series([np.nan, 0, 2999.9, 3000, 3001, 14999, 15000, 15001, 1e6])
+    expected = gt.apply(categorize_ship_size)
+    result = bin_thresholds(gt, [3000, 15000], ["Petit", "Moyen", "Grand"], na_label="Inconnu")
+    pd.testing.assert_series_equal(result, expected, check_dtype=False, check_names=False)
+
+
+def test_geo_zones_match_row_wise():
+    lat = pd.Series([np.nan, 50, 55.99, 56, 58.99, 59, 70])
+    lon = pd.Series([np.nan, -5, 11.99, 12, 17.99, 18, 30])
+    pd.testing.assert_series_equal(
+        bin_thresholds(lat, [56, 59], ["Sud", "Centre", "Nord"]), lat.apply(categorize_latitude), check_dtype=False
+    )
+    pd.testing.assert_series_equal(
+        bin_thresholds(lon, [12, 18], ["Ouest", "Centre", "Est"]), lon.apply(categorize_longitude), check_dtype=False
+    )
+
+
+def test_quantile_classes_with_right_bounds_match_row_wise():
+    rng = np.random.default_rng(0)
+    # Scores répétés pour que des valeurs tombent exactement sur les quantiles
+    score = pd.Series(np.round(rng.uniform(0, 10, 500), 1))
+    q = score.quantile([0, 0.25, 0.5, 0.75, 1]).values
+    assert score.isin(q[1:4]).any()
+    expected = score.apply(risk_classification_quantile, q=q)
+    result = bin_thresholds(score, q[1:4], ["Low", "Medium", "High", "Critical"], right=True)
+    pd.testing.assert_series_equal(result, expected, check_dtype=False, check_names=False)
+
+
+def test_bin_thresholds_rejects_wrong_label_count():
+    with pytest.raises(ValueError):
+        bin_thresholds([1, 2], [1, 2], ["a", "b"])
+
+
+def test_map_unique_matches_map():
+    values = pd.Series(["08:30", "23:15", None, "08:30", "n.i.", "23:15"], index=[5, 3, 9, 1, 0, 2])
+    calls = []
+
+    def func(v):
+        calls.append(v)
+        return f"<{v}>"
+
+    expected = values.map(lambda v: f"<{v}>")
+    pd.testing.assert_series_equal(map_unique(values, func), expected)
+    assert len(calls) == values.nunique(dropna=False)